@@ -0,0 +1,112 @@
+"""Concurrent command throughput against a local stub of the PnW GraphQL API.
+
+Runs the same batch of nation lookups two ways:
+  * blocking  - a synchronous HTTP call made inside the event loop (the old behaviour)
+  * async     - awaiting bot.data.GET_NATION_DATA through the shared API client
+  * warm      - the async run again, on the connections the first run left open
+
+Usage: python benchmarks/bench_async_client.py [--commands 20] [--latency 0.2]
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import threading
+import time
+import urllib.parse
+import urllib.request
+
+from aiohttp import web
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bot import data as get_data
+from bot.api import client
+from bot.ratelimit import limiter
+
+NATION = {
+    "id": "1",
+    "nation_name": "Stub",
+    "leader_name": "Stub",
+    "score": 1000.0,
+    "wars": [],
+}
+
+def make_app(latency: float) -> web.Application:
+    """Create a stub GraphQL server that answers every query after a delay."""
+    async def graphql(request: web.Request) -> web.Response:
+        await asyncio.sleep(latency)
+        return web.json_response({"data": {"nations": {"data": [NATION]}}})
+
+    app = web.Application()
+    app.router.add_route("*", "/graphql", graphql)
+    return app
+
+async def measure_lag(stop: asyncio.Event, samples: list) -> None:
+    """Record how late a 10ms ticker fires, like a gateway heartbeat would."""
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(0.01)
+        samples.append(time.perf_counter() - start - 0.01)
+
+def blocking_lookup(url: str) -> dict:
+    """Fetch a nation the way the synchronous client did."""
+    query = urllib.parse.urlencode({"api_key": "stub", "query": "{ nations { data { id } } }"})
+    with urllib.request.urlopen(f"{url}?{query}") as response:
+        return json.loads(response.read())
+
+async def run(mode: str, url: str, commands: int) -> None:
+    stop = asyncio.Event()
+    lag = []
+    ticker = asyncio.create_task(measure_lag(stop, lag))
+
+    async def command(nation_id: int):
+        if mode == "blocking":
+            return blocking_lookup(url)
+        return await get_data.GET_NATION_DATA(nation_id, "stub")
+
+    start = time.perf_counter()
+    await asyncio.gather(*(command(i) for i in range(commands)))
+    elapsed = time.perf_counter() - start
+
+    stop.set()
+    await ticker
+    print(
+        f"{mode:<9} {commands} commands in {elapsed:6.2f}s | "
+        f"{commands / elapsed:6.1f} cmd/s | max loop lag {max(lag or [0]) * 1000:8.1f}ms"
+    )
+
+def serve(app: web.Application) -> str:
+    """Run the stub server on its own thread and event loop, return its URL."""
+    loop = asyncio.new_event_loop()
+    runner = web.AppRunner(app)
+    loop.run_until_complete(runner.setup())
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    loop.run_until_complete(site.start())
+    port = site._server.sockets[0].getsockname()[1]
+    threading.Thread(target=loop.run_forever, daemon=True).start()
+    return f"http://127.0.0.1:{port}/graphql"
+
+async def main(args: argparse.Namespace, url: str) -> None:
+    client.url = url
+    limiter.configure(per_minute=1e9, burst=1e9)  # The stub has no quota
+    await client.start(pool_size=args.commands)
+    try:
+        await run("blocking", url, args.commands)
+        await run("async", url, args.commands)
+        await run("warm", url, args.commands)
+        timing = client.timing_summary()
+        print(
+            f"connections: {timing['reuse_ratio'] * 100:.0f}% reused | "
+            f"new {timing['avg_new_ms']:.1f}ms avg | reused {timing['avg_reused_ms']:.1f}ms avg"
+        )
+    finally:
+        await client.close()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--commands", type=int, default=20)
+    parser.add_argument("--latency", type=float, default=0.2, help="stub response delay in seconds")
+    args = parser.parse_args()
+    asyncio.run(main(args, serve(make_app(args.latency))))
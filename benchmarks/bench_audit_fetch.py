@@ -0,0 +1,76 @@
+"""Wall time of the per-member fetches an mmr audit makes, sequential vs concurrent vs batched.
+
+A local stub answers nations queries for a synthetic alliance after a fixed
+delay. The sequential run awaits GET_CITY_DATA once per member the way the
+old audit loop did, the concurrent run fans the same lookups out under an
+AUDIT_CONCURRENCY semaphore, and the batched run asks for every member in
+one GET_NATIONS_BATCH request.
+
+Usage: python benchmarks/bench_audit_fetch.py [--members 100] [--latency 0.3] [--concurrency 8]
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+from aiohttp import web
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from bot import data as get_data
+from bot.api import client
+from bot.ratelimit import limiter
+from bench_async_client import serve
+from fixtures import make_alliance
+
+def make_app(members: list, latency: float) -> web.Application:
+    """Create a stub GraphQL server that returns the members asked for by ID."""
+    by_id = {int(member["id"]): member for member in members}
+
+    async def graphql(request: web.Request) -> web.Response:
+        variables = (await request.json()).get("variables") or {}
+        await asyncio.sleep(latency)
+        nations = [by_id[nation_id] for nation_id in variables.get("id", []) if nation_id in by_id]
+        return web.json_response({"data": {"nations": {"data": nations}}})
+
+    app = web.Application()
+    app.router.add_route("*", "/graphql", graphql)
+    return app
+
+async def sequential(ids: list, args: argparse.Namespace) -> int:
+    return sum([bool(await get_data.GET_CITY_DATA(nation_id, "stub")) for nation_id in ids])
+
+async def concurrent(ids: list, args: argparse.Namespace) -> int:
+    semaphore = asyncio.Semaphore(args.concurrency)
+    results = await asyncio.gather(
+        *(get_data.GET_NATIONS_BATCH([nation_id], "stub", "cities", semaphore=semaphore) for nation_id in ids)
+    )
+    return sum(len(result) for result in results)
+
+async def batched(ids: list, args: argparse.Namespace) -> int:
+    return len(await get_data.GET_NATIONS_BATCH(ids, "stub", "cities"))
+
+async def main(args: argparse.Namespace, url: str, ids: list) -> None:
+    client.url = url
+    limiter.configure(per_minute=1e9, burst=1e9)  # The stub has no quota
+    await client.start(pool_size=max(args.concurrency, 10))
+    try:
+        for label, run in (("sequential", sequential), ("concurrent", concurrent), ("batched", batched)):
+            calls = client.stats["calls"]
+            start = time.perf_counter()
+            fetched = await run(ids, args)
+            elapsed = time.perf_counter() - start
+            print(f"{label:<11} {fetched:>5,} of {len(ids):,} members | {client.stats['calls'] - calls:>4} requests | {elapsed:6.2f}s")
+    finally:
+        await client.close()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--members", type=int, default=100)
+    parser.add_argument("--latency", type=float, default=0.3, help="stub response delay in seconds")
+    parser.add_argument("--concurrency", type=int, default=8, help="AUDIT_CONCURRENCY")
+    args = parser.parse_args()
+    members = make_alliance(args.members)
+    asyncio.run(main(args, serve(make_app(members, args.latency)), [int(member["id"]) for member in members]))
@@ -0,0 +1,86 @@
+"""Build plan solver, planner.solve across infrastructure targets, continents and project sets.
+
+Each plan's reported revenue is checked against planner.revenue, which
+scores the plan through economics.evaluate. The first solve for a project
+set also builds its commerce mixes, so it is reported separately from the
+cached solves. Finally a plans.PlanMemo in a temporary directory
+precomputes the infrastructure tiers for one setup per continent and times
+memo lookups against live solves.
+
+Usage: python benchmarks/bench_build.py [--infra 1000 1500 2000 2500 3000 3500 4000] [--land 2000]
+"""
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, "bot"))
+
+from bot import economics
+from bot import planner
+from bot.plans import DEFAULT_TIERS, PlanMemo, make_setup
+
+CONTINENTS = tuple(economics.CONTINENT_RESOURCES)
+PROJECT_SETS = {
+    "none": frozenset(),
+    "green": frozenset({"green_technologies", "recycling_initiative", "mass_irrigation"}),
+    "all": frozenset(economics.PROJECTS),
+}
+# Whale MMR, the default for 15+ cities
+MILITARY = {"factory": 2, "hangar": 5}
+
+def main(args: argparse.Namespace) -> None:
+    cold = {}
+    for name, projects in PROJECT_SETS.items():
+        planner.combos.cache_clear()
+        start = time.perf_counter()
+        planner.solve(args.infra[0], args.land, CONTINENTS[0], projects, MILITARY)
+        cold[name] = (time.perf_counter() - start) * 1000
+
+    for infra in args.infra:
+        times = []
+        for projects in PROJECT_SETS.values():
+            for continent in CONTINENTS:
+                start = time.perf_counter()
+                plan, revenue = planner.solve(infra, args.land, continent, projects, MILITARY)
+                times.append((time.perf_counter() - start) * 1000)
+                expected = planner.revenue(plan, infra, args.land, projects)
+                assert abs(revenue - expected) <= 1e-6 * abs(expected), "solver revenue differs from planner.revenue"
+        print(
+            f"infra {infra:>5,} | {infra // 50:>2} slots | {len(times)} plans | "
+            f"median {statistics.median(times):>5,.1f}ms | max {max(times):>5,.1f}ms"
+        )
+    print("first solve per project set: " + ", ".join(f"{name} {ms:,.1f}ms" for name, ms in cold.items()))
+
+    with tempfile.TemporaryDirectory() as directory:
+        memo = PlanMemo()
+        memo.open(os.path.join(directory, "plans.sqlite"))
+        setups = [make_setup(args.land, continent, PROJECT_SETS["all"], MILITARY, 1000) for continent in CONTINENTS]
+        for setup in setups:
+            memo.remember(setup)
+        start = time.perf_counter()
+        solved = memo.precompute(DEFAULT_TIERS)
+        precompute_ms = (time.perf_counter() - start) * 1000
+
+        start = time.perf_counter()
+        for setup in setups:
+            for infra in DEFAULT_TIERS:
+                plan, memoized = memo.solve(infra, setup)
+                assert memoized, "precomputed plan missing from the memo"
+        lookups = len(setups) * len(DEFAULT_TIERS)
+        lookup_us = (time.perf_counter() - start) * 1e6 / lookups
+        memo.close()
+    print(
+        f"memo: precomputed {solved:,} plans in {precompute_ms:,.0f}ms "
+        f"({precompute_ms / solved:,.1f}ms each) | lookup {lookup_us:,.1f}us"
+    )
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--infra", type=int, nargs="+", default=[1000, 1500, 2000, 2500, 3000, 3500, 4000])
+    parser.add_argument("--land", type=float, default=2000)
+    main(parser.parse_args())
@@ -0,0 +1,93 @@
+"""City economics for a whole alliance, one dict walk per city vs economics.evaluate.
+
+The per-city path applies the references.md formulas to each GET_CITY_DATA
+dict the way the cogs used to. The vectorized path evaluates every city of
+every member in one economics.evaluate call over a CityTable, and its
+results are checked against the per-city ones before timing is reported.
+Per-member calls, which is what /who and /income make, are timed as well.
+
+Usage: python benchmarks/bench_economics.py [--members 100 500 2000] [--repeat 3]
+"""
+import argparse
+import math
+import os
+import sys
+import time
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, "bot"))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from bot import economics
+from bot.models import CityTable
+from fixtures import make_alliance_cities
+
+# Every city is aged the same so both paths skip date parsing
+AGE = 1000
+
+def city_economy(city: dict) -> dict:
+    """Apply the economics formulas to one city dict, without projects."""
+    infra, land = city["infrastructure"], city["land"]
+    commerce = min(sum(city.get(building, 0) * bonus for building, bonus in economics.COMMERCE.items()), 100)
+    pollution = sum(city.get(building, 0) * points for building, points in economics.POLLUTION.items())
+    pollution += city.get("farm", 0) * 2
+    pollution += sum(city.get(building, 0) * points for building, points in economics.MANUFACTURING_POLLUTION.items())
+    pollution -= city.get("subway", 0) * 45 + city.get("recycling_center", 0) * 70
+    pollution = max(pollution, 0)
+
+    base_population = infra * 100
+    density = base_population / land if land else 0
+    disease = ((density ** 2) * 0.01 - 25) / 100 + base_population / 100000 + pollution * 0.05 - city.get("hospital", 0) * 2.5
+    disease = min(max(disease, 0), 100)
+    crime = ((103 - commerce) ** 2 + infra * 100) / 111111 - city.get("police_station", 0) * 2.5
+    crime = min(max(crime, 0), 100)
+    population = (base_population - disease * infra - max((crime / 10) * (100 * infra) - 25, 0)) * (1 + math.log(AGE) / 15)
+
+    production = {resource: city.get(building, 0) * 3 for resource, building in economics.RAW_OUTPUT.items()}
+    production["food"] = city.get("farm", 0) * (land / 500)
+    for resource, (building, output, _, _) in economics.MANUFACTURED_OUTPUT.items():
+        production[resource] = city.get(building, 0) * output
+    return {"commerce": commerce, "pollution": pollution, "disease": disease, "crime": crime,
+            "population": population, "production": production}
+
+def best_of(repeat: int, run) -> tuple:
+    """Run ``run`` ``repeat`` times, returning its last result and the fastest time in ms."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = run()
+        best = min(best, time.perf_counter() - start)
+    return result, best * 1000
+
+def main(args: argparse.Namespace) -> None:
+    for count in args.members:
+        members = make_alliance_cities(count)
+        flat = [city for cities in members for city in cities]
+
+        scalar, scalar_ms = best_of(args.repeat, lambda: [city_economy(city) for city in flat])
+        table, table_ms = best_of(args.repeat, lambda: CityTable(flat))
+        ages = np.full(len(table), AGE, dtype=np.float64)
+        economy, vector_ms = best_of(args.repeat, lambda: economics.evaluate(table, ages=ages))
+        for field in ("commerce", "pollution", "disease", "crime", "population"):
+            assert np.allclose(economy[field], [city[field] for city in scalar]), f"{field} differs"
+        for resource, values in economy["production"].items():
+            assert np.allclose(values, [city["production"][resource] for city in scalar]), f"{resource} differs"
+
+        tables = [CityTable(cities) for cities in members]
+        _, member_ms = best_of(args.repeat, lambda: [
+            economics.evaluate(cities, ages=np.full(len(cities), AGE, dtype=np.float64)) for cities in tables
+        ])
+        print(
+            f"{count:>6,} members, {len(flat):>7,} cities | per city {scalar_ms:>8,.1f}ms | "
+            f"table build {table_ms:>7,.1f}ms + evaluate {vector_ms:>6,.1f}ms | "
+            f"{scalar_ms / vector_ms:>6,.1f}x | per member {member_ms:>7,.1f}ms"
+        )
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--members", type=int, nargs="+", default=[100, 500, 2000])
+    parser.add_argument("--repeat", type=int, default=3)
+    main(parser.parse_args())
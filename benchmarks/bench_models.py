@@ -0,0 +1,56 @@
+"""Memory held by alliance member payloads, raw JSON dicts vs models.Roster, and the Roster build time.
+
+The synthetic GET_ALLIANCE_MEMBERS payload is round-tripped through JSON so
+the dicts look like a decoded API response. The Roster is built from it
+``--repeat`` times untraced for the build time, since tracemalloc slows the
+build down several times over, then once more traced with the raw dicts
+dropped afterwards for the memory.
+
+Usage: python benchmarks/bench_models.py [--nations 10000] [--repeat 3]
+"""
+import argparse
+import gc
+import json
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from bot.models import Roster
+from fixtures import make_alliance
+
+def main(args: argparse.Namespace) -> None:
+    payload = json.dumps(make_alliance(args.nations))
+
+    members = json.loads(payload)
+    elapsed = float("inf")
+    for _ in range(args.repeat):
+        start = time.perf_counter()
+        Roster(members)
+        elapsed = min(elapsed, (time.perf_counter() - start) * 1000)
+    del members
+    gc.collect()
+
+    tracemalloc.start()
+    members = json.loads(payload)
+    raw = tracemalloc.get_traced_memory()[0]
+
+    roster = Roster(members)
+    del members
+    gc.collect()
+    parsed = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+
+    cities = len(roster.cities)
+    print(f"{args.nations:,} nations, {cities:,} cities, built in {elapsed:,.1f}ms ({elapsed * 1000 / cities:,.2f}us/city)")
+    print(f"raw dicts  {raw / 1e6:>8,.1f} MB | {raw / cities:>6,.0f} B/city")
+    print(f"roster     {parsed / 1e6:>8,.1f} MB | {parsed / cities:>6,.0f} B/city | {raw / parsed:,.1f}x smaller")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--nations", type=int, default=10000)
+    parser.add_argument("--repeat", type=int, default=3, help="untraced builds, the fastest is reported")
+    main(parser.parse_args())
@@ -0,0 +1,84 @@
+"""Bytes and wall time of the /raid fetch, full-game crawl vs score-filtered query.
+
+A local stub serves a synthetic world and honours the page, first, min_score,
+max_score and vmode variables. Fields are projected by checking which field
+names appear in the query text, so smaller selections produce smaller bodies.
+
+Usage: python benchmarks/bench_raid_fetch.py [--nations 60000] [--score 1500] [--latency 0.05]
+"""
+import argparse
+import asyncio
+import os
+import re
+import sys
+import time
+
+from aiohttp import web
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from bot import data as get_data
+from bot.api import client
+from bot.ratelimit import limiter
+from bench_async_client import serve
+from fixtures import make_world
+
+def project(nation: dict, query: str) -> dict:
+    """Keep only the fields named in the query."""
+    return {key: value for key, value in nation.items() if re.search(rf"\b{key}\b", query)}
+
+def make_app(world: list, latency: float) -> web.Application:
+    """Create a stub GraphQL server that pages and filters the world."""
+    async def graphql(request: web.Request) -> web.Response:
+        body = await request.json()
+        query, variables = body["query"], body.get("variables") or {}
+        nations = world
+        if "min_score" in variables:
+            nations = [n for n in nations if n["score"] >= variables["min_score"]]
+        if "max_score" in variables:
+            nations = [n for n in nations if n["score"] <= variables["max_score"]]
+        if variables.get("vmode") is False:
+            nations = [n for n in nations if n["vacation_mode_turns"] == 0]
+
+        first, page = variables.get("first", 500), variables.get("page", 1)
+        last_page = max(1, -(-len(nations) // first))
+        chunk = nations[(page - 1) * first:page * first]
+        await asyncio.sleep(latency)
+        return web.json_response({"data": {"nations": {
+            "paginatorInfo": {"lastPage": last_page},
+            "data": [project(n, query) for n in chunk],
+        }}})
+
+    app = web.Application()
+    app.router.add_route("*", "/graphql", graphql)
+    return app
+
+async def measure(label: str, fetch) -> None:
+    calls, received = client.stats["calls"], client.stats["bytes"]
+    start = time.perf_counter()
+    nations = await fetch()
+    elapsed = time.perf_counter() - start
+    print(
+        f"{label:<10} {len(nations or []):>7,} nations | {client.stats['calls'] - calls:>4} requests | "
+        f"{(client.stats['bytes'] - received) / 1024 / 1024:8.2f} MiB | {elapsed:6.2f}s"
+    )
+
+async def main(args: argparse.Namespace, url: str) -> None:
+    client.url = url
+    limiter.configure(per_minute=1e9, burst=1e9)  # The stub has no quota
+    min_score, max_score = args.score * 0.75, args.score * 1.75
+    try:
+        await measure("full game", lambda: get_data.GET_ALL_NATIONS("stub"))
+        await measure("filtered", lambda: get_data.GET_RAID_TARGETS("stub", min_score, max_score, 1))
+    finally:
+        await client.close()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--nations", type=int, default=60000)
+    parser.add_argument("--score", type=float, default=1500.0, help="score of the raiding nation")
+    parser.add_argument("--latency", type=float, default=0.05, help="stub response delay in seconds")
+    args = parser.parse_args()
+    world = make_world(args.nations)
+    asyncio.run(main(args, serve(make_app(world, args.latency))))
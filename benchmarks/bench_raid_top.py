@@ -0,0 +1,76 @@
+"""Time and peak memory of /raid scoring, collect-and-sort vs streaming top-k heap.
+
+Pages of snapshot rows are generated lazily, the way the crawler hands them
+over, so the peak only counts what each scorer keeps between pages. The
+sort collects every page, scores every open nation in range and keeps the
+first ``k`` after sorting; the heap keeps ``k`` targets while pages stream in.
+
+Usage: python benchmarks/bench_raid_top.py [--nations 60000] [--score 1500] [--k 10] [--page 500]
+"""
+import argparse
+import asyncio
+import os
+import random
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from bot import vars as vars
+from bot.raids import score_target, stream_top_targets
+from bot.score_index import is_open
+from bot.snapshot import summarize
+from fixtures import make_nation
+
+async def pages(count: int, size: int):
+    """Yield pages of snapshot rows for a seeded world."""
+    rng = random.Random(1)
+    for start in range(1, count + 1, size):
+        yield [summarize(make_nation(rng, nation_id)) for nation_id in range(start, min(start + size, count + 1))]
+        await asyncio.sleep(0)
+
+async def collect_and_sort(args, min_score: float, max_score: float) -> list:
+    """The old /raid path: every page kept, every candidate scored, then sorted."""
+    nations = []
+    async for page in pages(args.nations, args.page):
+        nations.extend(page)
+    targets = [
+        target for target in (
+            score_target(nation) for nation in nations
+            if is_open(nation) and min_score <= nation["score"] <= max_score
+        )
+        if target is not None
+    ]
+    targets.sort(key=lambda target: target["profit"], reverse=True)
+    return targets[:args.k]
+
+async def streaming(args, min_score: float, max_score: float) -> list:
+    top = await stream_top_targets(pages(args.nations, args.page), min_score, max_score, args.k)
+    return top.best()
+
+def measure(label: str, run) -> list:
+    tracemalloc.start()
+    start = time.perf_counter()
+    targets = asyncio.run(run())
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"{label:<18} {elapsed:6.2f}s | peak {peak / 1024 / 1024:8.2f} MiB | best profit ${targets[0]['profit'] if targets else 0:,.0f}")
+    return targets
+
+def main(args: argparse.Namespace) -> None:
+    min_score, max_score = args.score * vars.WAR_RANGE[0], args.score * vars.WAR_RANGE[1]
+    print(f"{args.nations:,} nations in pages of {args.page}, war range {min_score:,.0f}-{max_score:,.0f}, top {args.k}")
+    sorted_targets = measure("collect and sort", lambda: collect_and_sort(args, min_score, max_score))
+    streamed = measure("streaming heap", lambda: streaming(args, min_score, max_score))
+    assert [target["id"] for target in sorted_targets] == [target["id"] for target in streamed]
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--nations", type=int, default=60000)
+    parser.add_argument("--score", type=float, default=1500.0, help="score of the raiding nation")
+    parser.add_argument("--k", type=int, default=10, help="targets to keep")
+    parser.add_argument("--page", type=int, default=500, help="nations per page")
+    main(parser.parse_args())
@@ -0,0 +1,88 @@
+"""War range queries over the nation snapshot, linear scan vs sorted score index.
+
+Each query runs the /raid filter (in range, not beige, open defensive slot,
+not in vacation mode, not in the raider's alliance) for a spread of raider
+scores, the /purge filter (the same plus color) and the /counters filter (alliance members that can declare on a
+target) for the same scores.
+
+Usage: python benchmarks/bench_score_index.py [--nations 60000] [--queries 1000]
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from bot import vars as vars
+from bot.score_index import ScoreIndex, is_beige
+from bot.snapshot import summarize
+from fixtures import make_world
+
+def scan_in_range(nations: list, score: float, alliance_id: int) -> list:
+    """The /raid filter as a scan over every nation."""
+    low, high = score * vars.WAR_RANGE[0], score * vars.WAR_RANGE[1]
+    return [
+        n for n in nations
+        if low <= n["score"] <= high
+        and n["alliance_id"] != alliance_id
+        and not is_beige(n)
+        and n["defensive_wars_count"] < vars.MAX_DEFENSIVE_WARS
+        and n["vacation_mode_turns"] == 0
+    ]
+
+def scan_can_declare_on(nations: list, score: float, alliance_id: int) -> list:
+    """The /counters filter as a scan over every nation."""
+    low, high = score / vars.WAR_RANGE[1], score / vars.WAR_RANGE[0]
+    return [
+        n for n in nations
+        if low <= n["score"] <= high
+        and n["alliance_id"] == alliance_id
+        and n["vacation_mode_turns"] == 0
+    ]
+
+def measure(label: str, queries: list, run) -> list:
+    start = time.perf_counter()
+    results = [run(score, alliance_id) for score, alliance_id in queries]
+    elapsed = (time.perf_counter() - start) / len(queries) * 1e6
+    matched = sum(len(result) for result in results) / len(queries)
+    print(f"{label:<28} {elapsed:>10,.1f} us/query | {matched:>8,.1f} matches avg")
+    return results
+
+def main(args: argparse.Namespace) -> None:
+    nations = [summarize(nation) for nation in make_world(args.nations)]
+    rng = random.Random(2)
+    queries = [(rng.choice(nations)["score"], rng.randint(1, 200)) for _ in range(args.queries)]
+
+    start = time.perf_counter()
+    index = ScoreIndex(nations)
+    print(f"Built index over {len(index):,} nations in {(time.perf_counter() - start) * 1000:,.1f}ms")
+
+    scanned = measure("raid targets (scan)", queries, lambda s, a: scan_in_range(nations, s, a))
+    indexed = measure(
+        "raid targets (index)", queries,
+        lambda s, a: index.in_range_of(s, exclude_alliance_id=a, beige=False, open_slots=True)
+    )
+    assert [sorted(n["id"] for n in r) for r in scanned] == [sorted(n["id"] for n in r) for r in indexed]
+
+    scanned = measure(
+        "purge targets (scan)", queries,
+        lambda s, a: [n for n in scan_in_range(nations, s, a) if n["color"] == "purple"]
+    )
+    indexed = measure(
+        "purge targets (index)", queries,
+        lambda s, a: index.in_range_of(s, color="purple", exclude_alliance_id=a, beige=False, open_slots=True)
+    )
+    assert [sorted(n["id"] for n in r) for r in scanned] == [sorted(n["id"] for n in r) for r in indexed]
+
+    scanned = measure("counters (scan)", queries, lambda s, a: scan_can_declare_on(nations, s, a))
+    indexed = measure("counters (index)", queries, lambda s, a: index.can_declare_on(s, alliance_id=a))
+    assert [sorted(n["id"] for n in r) for r in scanned] == [sorted(n["id"] for n in r) for r in indexed]
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--nations", type=int, default=60000)
+    parser.add_argument("--queries", type=int, default=1000)
+    main(parser.parse_args())
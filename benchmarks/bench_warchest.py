@@ -0,0 +1,73 @@
+"""Alliance warchest audit, one calculate.warchest call per member vs calculate.warchest_batch.
+
+Both paths start from the same synthetic GET_ALLIANCE_MEMBERS payload, so
+the batch time is end to end: building the models.Roster plus the batch
+itself, which are also shown apart. The batch results are checked against
+the per-member results before timing is reported. Cities are aged at a
+fixed time and their founding dates are parsed once per city ID, so the
+first scalar run pays for parsing and the fastest of the repeats does not.
+Finally a WarchestCache is rerun from the payload after changing every
+20th member.
+
+Usage: python benchmarks/bench_warchest.py [--members 100 1000 10000] [--repeat 3]
+"""
+import argparse
+import os
+import sys
+import time
+from datetime import datetime, timezone
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, "bot"))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from bot import calculate
+from bot import vars as vars
+from bot.models import Roster
+from fixtures import make_alliance
+
+# Fixed so every run ages the cities the same way
+AS_OF = datetime(2026, 10, 18, tzinfo=timezone.utc)
+
+def best_of(repeat: int, run) -> tuple:
+    """Run ``run`` ``repeat`` times, returning its last result and the fastest time in ms."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = run()
+        best = min(best, time.perf_counter() - start)
+    return result, best * 1000
+
+def main(args: argparse.Namespace) -> None:
+    for count in args.members:
+        members = make_alliance(count)
+        scalar, scalar_ms = best_of(
+            args.repeat, lambda: [calculate.warchest(member, vars.COSTS, vars.MILITARY_COSTS, AS_OF) for member in members]
+        )
+        batch, batch_ms = best_of(
+            args.repeat, lambda: calculate.warchest_batch(members, vars.COSTS, vars.MILITARY_COSTS, AS_OF)
+        )
+        assert batch == scalar, "warchest_batch differs from warchest"
+        roster, roster_ms = best_of(args.repeat, lambda: Roster(members))
+        _, kernel_ms = best_of(args.repeat, lambda: calculate.warchest_batch(roster, vars.COSTS, vars.MILITARY_COSTS, AS_OF))
+        print(
+            f"{count:>7,} members | scalar {scalar_ms:>9,.1f}ms | batch end to end {batch_ms:>8,.1f}ms | "
+            f"{scalar_ms / batch_ms:>5,.1f}x | roster build {roster_ms:>7,.1f}ms + batch {kernel_ms:>6,.1f}ms"
+        )
+
+        # A rerun after a few members changed only recomputes those members, still from the payload
+        cache = calculate.WarchestCache()
+        cache.run(members, vars.COSTS, vars.MILITARY_COSTS, AS_OF)
+        for member in members[::args.changed_every]:
+            member["soldiers"] += 1
+        results, rerun_ms = best_of(1, lambda: cache.run(members, vars.COSTS, vars.MILITARY_COSTS, AS_OF))
+        assert results == calculate.warchest_batch(members, vars.COSTS, vars.MILITARY_COSTS, AS_OF)
+        print(f"{'':>15} | incremental rerun {rerun_ms:>7,.1f}ms, recomputed {cache.recomputed:,} of {count:,}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--members", type=int, nargs="+", default=[100, 1000, 10000])
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--changed-every", type=int, default=20, help="change every Nth member before the incremental rerun")
+    main(parser.parse_args())
@@ -0,0 +1,145 @@
+"""Synthetic Politics and War payloads for the benchmarks.
+
+Every generator is seeded so repeated runs produce the same data.
+"""
+import random
+from typing import Dict, List
+
+COLORS = ["aqua", "beige", "black", "blue", "brown", "gray", "green", "lime", "maroon",
+          "olive", "orange", "pink", "purple", "red", "white", "yellow"]
+
+def make_city(rng: random.Random) -> Dict:
+    """Build a city with the infrastructure shape returned by GET_ALL_NATIONS."""
+    return {"infrastructure": round(rng.uniform(500, 3000), 2)}
+
+def make_nation(rng: random.Random, nation_id: int, alliances: int = 200) -> Dict:
+    """Build a nation shaped like a GET_ALL_NATIONS result."""
+    num_cities = max(1, min(70, int(rng.lognormvariate(2.3, 0.7))))
+    soldiers = rng.randint(0, num_cities * 15000)
+    tanks = rng.randint(0, num_cities * 1250)
+    aircraft = rng.randint(0, num_cities * 75)
+    ships = rng.randint(0, num_cities * 15)
+    score = round(
+        num_cities * 75 + soldiers * 0.0004 + tanks * 0.025 + aircraft * 0.3 + ships * 1 + rng.uniform(0, 200),
+        2
+    )
+    alliance_id = rng.randint(1, alliances) if rng.random() < 0.6 else None
+    return {
+        "id": str(nation_id),
+        "nation_name": f"Nation {nation_id}",
+        "leader_name": f"Leader {nation_id}",
+        "score": score,
+        "num_cities": num_cities,
+        "population": num_cities * rng.randint(50000, 250000),
+        "color": rng.choice(COLORS),
+        "vacation_mode_turns": 0 if rng.random() < 0.95 else rng.randint(1, 200),
+        "beige_turns": 0 if rng.random() < 0.9 else rng.randint(1, 24),
+        "defensive_wars_count": rng.choice([0, 0, 0, 1, 2, 3]),
+        "last_active": f"2026-10-{rng.randint(1, 18):02d}T{rng.randint(0, 23):02d}:00:00+00:00",
+        "soldiers": soldiers,
+        "tanks": tanks,
+        "aircraft": aircraft,
+        "ships": ships,
+        "alliance_id": str(alliance_id) if alliance_id else "0",
+        "alliance": {"id": str(alliance_id), "name": f"Alliance {alliance_id}"} if alliance_id else None,
+        "cities": [make_city(rng) for _ in range(num_cities)],
+        "offensive_wars_count": rng.choice([0, 0, 1, 2, 3, 4, 5]),
+    }
+
+def make_world(count: int, seed: int = 1) -> List[Dict]:
+    """Build ``count`` nations shaped like GET_ALL_NATIONS."""
+    rng = random.Random(seed)
+    return [make_nation(rng, nation_id) for nation_id in range(1, count + 1)]
+
+RESOURCES = ["money", "coal", "oil", "uranium", "iron", "bauxite", "lead",
+             "gasoline", "munitions", "steel", "aluminum", "food", "credits"]
+BUILDING_CAPS = {
+    "coal_power": 2, "oil_power": 2, "nuclear_power": 2, "wind_power": 2, "farm": 20,
+    "uranium_mine": 5, "iron_mine": 10, "coal_mine": 10, "oil_well": 10, "bauxite_mine": 10,
+    "lead_mine": 10, "oil_refinery": 5, "steel_mill": 5,
+    "aluminum_refinery": 5, "munitions_factory": 5, "police_station": 5, "hospital": 5,
+    "recycling_center": 3, "subway": 1, "supermarket": 4, "bank": 5, "shopping_mall": 4,
+    "stadium": 3, "barracks": 5, "factory": 5, "hangar": 5, "drydock": 3,
+}
+
+def make_member_city(rng: random.Random, city_id: int) -> Dict:
+    """Build a city with the buildings returned by GET_ALLIANCE_MEMBERS."""
+    city = {
+        "id": str(city_id),
+        "name": f"City {city_id}",
+        "date": f"{rng.randint(2015, 2026)}-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}",
+        "infrastructure": round(rng.uniform(500, 3000), 2),
+    }
+    city.update({building: rng.randint(0, cap) for building, cap in BUILDING_CAPS.items()})
+    return city
+
+def make_member(rng: random.Random, nation_id: int) -> Dict:
+    """Build an alliance member shaped like a GET_ALLIANCE_MEMBERS result."""
+    member = make_nation(rng, nation_id)
+    member["cities"] = [make_member_city(rng, nation_id * 100 + index) for index in range(member["num_cities"])]
+    member.update({resource: round(rng.uniform(0, 5_000_000 if resource == "money" else 20_000), 2)
+                   for resource in RESOURCES})
+    member["credits"] = rng.randint(0, 3)
+    member["spies"] = rng.randint(0, 60)
+    member["central_intelligence_agency"] = rng.random() < 0.5
+    member["discord"] = f"member{nation_id}"
+    member["alliance_position"] = rng.choice(["MEMBER", "MEMBER", "MEMBER", "OFFICER", "APPLICANT"])
+    return member
+
+def make_alliance(count: int, seed: int = 1) -> List[Dict]:
+    """Build ``count`` members shaped like GET_ALLIANCE_MEMBERS."""
+    rng = random.Random(seed)
+    return [make_member(rng, nation_id) for nation_id in range(1, count + 1)]
+
+def make_city_data(rng: random.Random, city_id: int) -> Dict:
+    """Build a city shaped like a GET_CITY_DATA result."""
+    city = make_member_city(rng, city_id)
+    city.update({
+        "land": round(rng.uniform(500, 4000), 2),
+        **{mine: rng.randint(0, 10) for mine in ("oil_well", "bauxite_mine", "lead_mine")},
+    })
+    return city
+
+def make_alliance_cities(count: int, seed: int = 1) -> List[List[Dict]]:
+    """Build the GET_CITY_DATA cities of ``count`` alliance members."""
+    rng = random.Random(seed)
+    return [
+        [make_city_data(rng, nation_id * 100 + index) for index in range(rng.randint(5, 40))]
+        for nation_id in range(1, count + 1)
+    ]
+
+CONTINENTS = ["af", "an", "as", "au", "eu", "na", "sa"]
+PROJECTS = [
+    "green_technologies", "mass_irrigation", "recycling_initiative", "international_trade_center",
+    "telecommunications_satellite", "specialized_police_training_program", "clinical_research_center",
+    "bauxite_works", "iron_works", "arms_stockpile", "emergency_gasoline_reserve", "uranium_enrichment_program",
+]
+
+def make_bankrecs(rng: random.Random, nation_id: int, count: int, alliance_id: int = 1) -> List[Dict]:
+    """Build ``count`` bank records shaped like BANK_QUERY, deposits and withdrawals with the alliance."""
+    records = []
+    for index in range(count):
+        deposit = rng.random() < 0.6
+        records.append({
+            "id": str(nation_id * 1000 + index),
+            "date": f"2026-{rng.randint(1, 10):02d}-{rng.randint(1, 28):02d}T{rng.randint(0, 23):02d}:00:00+00:00",
+            "sender_id": str(nation_id if deposit else alliance_id),
+            "sender_type": 1 if deposit else 2,
+            "receiver_id": str(alliance_id if deposit else nation_id),
+            "receiver_type": 2 if deposit else 1,
+            "note": "deposit" if deposit else "withdrawal",
+            **{resource: round(rng.uniform(0, 1_000_000 if resource == "money" else 5_000), 2) if rng.random() < 0.3 else 0
+               for resource in RESOURCES[:-1]},
+        })
+    return records
+
+def make_build_request(rng: random.Random) -> Dict:
+    """Build the inputs of one /build request: city, continent, projects and MMR buildings."""
+    return {
+        "infra": rng.choice(range(1000, 4001, 250)),
+        "land": round(rng.uniform(1000, 4000)),
+        "continent": rng.choice(CONTINENTS),
+        "projects": [project for project in PROJECTS if rng.random() < 0.4],
+        "military": {"barracks": rng.randint(0, 5), "factory": rng.randint(0, 5), "hangar": rng.randint(0, 5), "drydock": rng.randint(0, 3)},
+        "age": rng.randint(30, 3000),
+    }
@@ -0,0 +1,172 @@
+"""Offline benchmark suite for the calculation hot paths at alliance and game scale.
+
+Every calculator runs over seeded synthetic payloads from fixtures.py at each
+size: GET_ALLIANCE_MEMBERS members for calculate.warchest and
+calculate.warchest_batch, BANK_QUERY records for calculate.balance, /build
+requests for planner.solve and GET_ALL_NATIONS nations for the /raid filter.
+Time is the fastest of ``--repeat`` runs; peak memory is traced on one extra
+run and only counts what the calculator allocates, not the fixture. The
+planner is slow per call and independent of alliance size, so it solves one
+plan per nation up to ``--builds`` and reports the mean per solve.
+
+Results can be saved with ``--save`` and later runs checked against them with
+``--compare``, which exits non-zero when a calculator got slower than
+``--tolerance`` times the saved time.
+
+Usage: python benchmarks/suite.py [--sizes 50 500 5000 60000] [--repeat 3] [--save results.json] [--compare results.json]
+"""
+import argparse
+import asyncio
+import gc
+import json
+import os
+import random
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timezone
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, "bot"))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from bot import calculate
+from bot import planner
+from bot import vars as vars
+from bot.raids import TopTargets, stream_top_targets
+from bot.score_index import ScoreIndex
+from bot.snapshot import summarize
+from fixtures import make_alliance, make_bankrecs, make_build_request, make_world
+
+# Fixed so every run ages the cities the same way
+AS_OF = datetime(2026, 10, 18, tzinfo=timezone.utc)
+
+def measure(repeat: int, run) -> tuple:
+    """Get the fastest time of ``run`` in ms and its peak traced allocation in MiB."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        run()
+        best = min(best, time.perf_counter() - start)
+    gc.collect()
+    tracemalloc.start()
+    run()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return best * 1000, peak / 1024 / 1024
+
+def warchest_workloads(count: int) -> dict:
+    members = make_alliance(count)
+    return {
+        "calculate.warchest": (count, lambda: [
+            calculate.warchest(member, vars.COSTS, vars.MILITARY_COSTS, AS_OF) for member in members
+        ]),
+        "calculate.warchest_batch": (count, lambda: calculate.warchest_batch(
+            members, vars.COSTS, vars.MILITARY_COSTS, AS_OF
+        )),
+    }
+
+def balance_workloads(count: int, records: int) -> dict:
+    rng = random.Random(3)
+    nations = [
+        {"id": str(nation_id), "bankrecs": make_bankrecs(rng, nation_id, rng.randint(0, records * 2))}
+        for nation_id in range(1, count + 1)
+    ]
+    return {"calculate.balance": (count, lambda: [calculate.balance(nation) for nation in nations])}
+
+def planner_workloads(count: int, builds: int) -> dict:
+    rng = random.Random(4)
+    requests = [make_build_request(rng) for _ in range(min(count, builds))]
+
+    def run():
+        planner.combos.cache_clear()  # Every run pays for its own commerce mixes
+        return [
+            planner.solve(
+                r["infra"], r["land"], r["continent"], r["projects"], r["military"], age=r["age"]
+            ) for r in requests
+        ]
+
+    return {"planner.solve": (len(requests), run)}
+
+def raid_workloads(count: int, queries: int) -> dict:
+    nations = [summarize(nation) for nation in make_world(count)]
+    rng = random.Random(5)
+    raiders = [(rng.choice(nations)["score"], rng.randint(1, 200)) for _ in range(queries)]
+    index = ScoreIndex(nations)
+
+    def indexed():
+        for score, alliance_id in raiders:
+            top = TopTargets()
+            top.extend(
+                index.in_range_of(score, exclude_alliance_id=alliance_id, beige=False, open_slots=True),
+                score * vars.WAR_RANGE[0], score * vars.WAR_RANGE[1]
+            )
+            top.best()
+
+    async def pages():
+        for start in range(0, len(nations), 500):
+            yield nations[start:start + 500]
+
+    def streamed():
+        score = raiders[0][0]
+        asyncio.run(stream_top_targets(pages(), score * vars.WAR_RANGE[0], score * vars.WAR_RANGE[1]))
+
+    return {
+        "ScoreIndex build": (1, lambda: ScoreIndex(nations)),
+        "raid filter (snapshot)": (len(raiders), indexed),
+        "raid filter (stream)": (1, streamed),
+    }
+
+def main(args: argparse.Namespace) -> int:
+    results = {}
+    print(f"{'nations':>8} | {'calculator':<26} | {'calls':>6} | {'total ms':>10} | {'per call':>10} | {'peak MiB':>9}")
+    for count in args.sizes:
+        sections = (
+            lambda: warchest_workloads(count),
+            lambda: balance_workloads(count, args.records),
+            lambda: planner_workloads(count, args.builds),
+            lambda: raid_workloads(count, args.queries),
+        )
+        for build in sections:
+            # Each section builds and drops its own fixture so sizes do not pile up
+            workloads = build()
+            for name, (calls, run) in workloads.items():
+                total_ms, peak = measure(args.repeat, run)
+                results[f"{count}|{name}"] = {"ms": total_ms, "peak_mib": peak}
+                per_call = total_ms / calls if calls else 0
+                print(f"{count:>8,} | {name:<26} | {calls:>6,} | {total_ms:>10,.1f} | {per_call:>8,.3f}ms | {peak:>9,.2f}")
+            del workloads
+            gc.collect()
+
+    if args.save:
+        with open(args.save, "w") as file:
+            json.dump(results, file, indent=2, sort_keys=True)
+        print(f"Saved {len(results)} results to {args.save}")
+
+    if args.compare:
+        with open(args.compare) as file:
+            baseline = json.load(file)
+        slower = [
+            (key, baseline[key]["ms"], result["ms"]) for key, result in results.items()
+            if key in baseline and result["ms"] > baseline[key]["ms"] * args.tolerance
+        ]
+        for key, before, after in slower:
+            count, name = key.split("|", 1)
+            print(f"REGRESSION {name} at {int(count):,} nations: {before:,.1f}ms -> {after:,.1f}ms ({after / before:,.2f}x)")
+        if slower:
+            return 1
+        print(f"No calculator slower than {args.tolerance:.2f}x of {args.compare}")
+    return 0
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[50, 500, 5000, 60000], help="nations per run")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--records", type=int, default=10, help="average bank records per nation")
+    parser.add_argument("--builds", type=int, default=20, help="most /build requests solved per size")
+    parser.add_argument("--queries", type=int, default=100, help="raiders looked up per size")
+    parser.add_argument("--save", help="write results to this JSON file")
+    parser.add_argument("--compare", help="check results against this JSON file")
+    parser.add_argument("--tolerance", type=float, default=1.25, help="slowdown that counts as a regression")
+    sys.exit(main(parser.parse_args()))
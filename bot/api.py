@@ -0,0 +1,340 @@
+import asyncio
+import json
+import random
+import time
+from typing import Dict, Optional, Any, Tuple
+
+import aiohttp
+
+from bot.handler import debug, info, warning
+from bot.ratelimit import limiter
+
+try:
+    import httpx  # Optional, only needed for HTTP/2
+except ImportError:
+    httpx = None
+
+API_URL = "https://api.politicsandwar.com/graphql"
+
+# Seconds to wait for each endpoint, looked up by request tag and then by its first word
+TIMEOUTS = {
+    "ALLIANCE_MEMBERS": 20,
+    "NATION": 10,
+    "CITY": 10,
+    "BATCH": 20,
+    "WAR": 10,
+    "WARS": 15,
+    "PURGE": 10,
+    "GAME": 10,
+    "BANK": 20,
+}
+DEFAULT_TIMEOUT = 15
+
+class APIError(Exception):
+    """Raised when a request to the API fails at the transport or HTTP level."""
+
+class APITimeout(APIError):
+    """Raised when a request to the API times out."""
+
+class APIUnavailable(APIError):
+    """Raised without calling the API while the circuit breaker is open."""
+
+class APIRateLimited(APIError):
+    """Raised when the API rejects a request for exceeding the rate limit."""
+
+    def __init__(self, message: str, retry_after: Optional[float] = None):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+class CircuitBreaker:
+    """Fail fast while the API keeps failing.
+
+    After ``threshold`` consecutive failures the breaker opens and every call
+    is rejected for ``cooldown`` seconds. Then a single trial call is let
+    through: success closes the breaker, failure opens it again.
+    """
+
+    def __init__(self, threshold: int = 5, cooldown: float = 30.0):
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+        self._trial = False
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return "closed"
+        if time.monotonic() - self.opened_at >= self.cooldown:
+            return "half-open"
+        return "open"
+
+    def check(self) -> bool:
+        """Raise if calls are currently being rejected, otherwise return whether this call is the trial call."""
+        state = self.state
+        if state == "open" or (state == "half-open" and self._trial):
+            retry_in = self.cooldown - (time.monotonic() - self.opened_at)
+            raise APIUnavailable(f"API unavailable, not retrying for {max(retry_in, 0):,.0f}s")
+        if state == "half-open":
+            self._trial = True
+            return True
+        return False
+
+    def release(self) -> None:
+        """End a trial call that neither succeeded nor failed, so the next call can try again."""
+        self._trial = False
+
+    def success(self) -> None:
+        if self.opened_at is not None:
+            info("API recovered, closing circuit breaker", tag="API")
+        self.failures = 0
+        self.opened_at = None
+        self._trial = False
+
+    def failure(self) -> None:
+        self.failures += 1
+        self._trial = False
+        if self.opened_at is not None or self.failures >= self.threshold:
+            if self.opened_at is None:
+                warning(f"API failed {self.failures} times in a row, failing fast for {self.cooldown:,.0f}s", tag="API")
+            self.opened_at = time.monotonic()
+
+class APIClient:
+    """Asynchronous client for the Politics and War GraphQL API.
+
+    One client is shared by the whole bot so every command reuses the same
+    pool of keep-alive connections instead of paying a new TLS handshake.
+    Every request first takes a token from the shared rate limiter, uses the
+    timeout of its endpoint, is retried with jittered backoff on transport
+    errors and goes through a circuit breaker that fails fast while the API
+    is down.
+    """
+
+    def __init__(self, url: str = API_URL):
+        self.url = url
+        self.pool_size = 10
+        self.keepalive = 60.0
+        self.http2 = False
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._http2_client = None
+        self.breaker = CircuitBreaker()
+        self.rate_limit: Dict[str, Optional[float]] = {"limit": None, "remaining": None, "reset": None}
+        self.stats = {
+            "calls": 0,
+            "total_ms": 0.0,
+            "new_connections": 0,
+            "reused_connections": 0,
+            "new_ms": 0.0,
+            "reused_ms": 0.0,
+            "bytes": 0,
+        }
+
+    async def start(self, pool_size: int = 10, keepalive: float = 60.0, http2: bool = False) -> None:
+        """Open the shared connection pool."""
+        await self.close()
+        self.pool_size = pool_size
+        self.keepalive = keepalive
+        self.http2 = http2
+
+        if http2 and httpx is None:
+            warning("HTTP/2 requested but httpx[http2] is not installed, using HTTP/1.1", tag="API")
+            self.http2 = False
+
+        if self.http2:
+            self._http2_client = httpx.AsyncClient(
+                http2=True,
+                limits=httpx.Limits(
+                    max_connections=pool_size,
+                    max_keepalive_connections=pool_size,
+                    keepalive_expiry=keepalive
+                ),
+                headers={"Accept-Encoding": "gzip, deflate"}
+            )
+        else:
+            self._session = self._create_session()
+
+        info(f"API connection pool started (size={pool_size}, keepalive={keepalive}s, http2={self.http2})", tag="API")
+
+    def _create_session(self) -> aiohttp.ClientSession:
+        """Create a pooled aiohttp session that reports connection reuse."""
+        trace = aiohttp.TraceConfig()
+
+        async def on_create(session, ctx, params):
+            ctx.trace_request_ctx["reused"] = False
+
+        async def on_reuse(session, ctx, params):
+            ctx.trace_request_ctx["reused"] = True
+
+        trace.on_connection_create_end.append(on_create)
+        trace.on_connection_reuseconn.append(on_reuse)
+
+        return aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(
+                limit=self.pool_size,
+                keepalive_timeout=self.keepalive,
+                ttl_dns_cache=300
+            ),
+            headers={"Accept-Encoding": "gzip, deflate"},
+            trace_configs=[trace]
+        )
+
+    def session(self) -> aiohttp.ClientSession:
+        """Get the HTTP session, creating it on first use."""
+        if self._session is None or self._session.closed:
+            self._session = self._create_session()
+        return self._session
+
+    async def _send(self, method: str, params: Dict, payload: Optional[Dict], timeout: Optional[float]) -> Tuple[bytes, Optional[bool]]:
+        """Send a request and return the raw body and whether the connection was reused."""
+        if self._http2_client is not None:
+            try:
+                response = await self._http2_client.request(
+                    method, self.url, params=params, json=payload, timeout=timeout
+                )
+                self._check_rate_limit(response.status_code, response.headers)
+                response.raise_for_status()
+                return response.content, None
+            except httpx.TimeoutException as e:
+                raise APITimeout(f"Request timed out: {e}") from e
+            except httpx.HTTPError as e:
+                raise APIError(str(e)) from e
+
+        ctx = {"reused": None}
+        try:
+            async with self.session().request(
+                method,
+                self.url,
+                params=params,
+                json=payload,
+                timeout=aiohttp.ClientTimeout(total=timeout),
+                trace_request_ctx=ctx
+            ) as response:
+                self._check_rate_limit(response.status, response.headers)
+                response.raise_for_status()
+                return await response.read(), ctx["reused"]
+        except asyncio.TimeoutError as e:
+            raise APITimeout("Request timed out") from e
+        except aiohttp.ClientError as e:
+            raise APIError(str(e)) from e
+
+    def _check_rate_limit(self, status: int, headers) -> None:
+        """Record the rate limit headers and raise if the request was throttled."""
+        reported = False
+        for key in ("limit", "remaining", "reset"):
+            value = headers.get(f"X-RateLimit-{key.title()}")
+            if value is not None:
+                try:
+                    self.rate_limit[key] = float(value)
+                    reported = True
+                except ValueError:
+                    pass
+        if reported:
+            limiter.sync(self.rate_limit["remaining"], self.rate_limit["reset"])
+
+        if status == 429:
+            retry_after = headers.get("Retry-After")
+            try:
+                retry_after = float(retry_after) if retry_after is not None else None
+            except ValueError:
+                retry_after = None
+            limiter.pause(retry_after)
+            raise APIRateLimited("API rate limit exceeded", retry_after)
+
+    async def _request(self, method: str, params: Dict, payload: Optional[Dict], timeout: Optional[float], tag: str, retries: int) -> Dict[str, Any]:
+        """Send a request with retries, backing off between failed attempts."""
+        if timeout is None:
+            timeout = TIMEOUTS.get(tag, TIMEOUTS.get(tag.split("_")[0], DEFAULT_TIMEOUT))
+        for attempt in range(retries + 1):
+            try:
+                return await self._attempt(method, params, payload, timeout, tag)
+            except (APIUnavailable, APIRateLimited):
+                raise
+            except APIError as e:
+                if attempt == retries:
+                    raise
+                warning(f"{method} {tag} failed, retrying (Attempt {attempt + 1}/{retries}): {e}", tag="API")
+                await backoff(attempt)
+
+    async def _attempt(self, method: str, params: Dict, payload: Optional[Dict], timeout: float, tag: str) -> Dict[str, Any]:
+        """Send a single request, record its timing and decode the JSON body."""
+        # Check the breaker first so calls it rejects don't spend rate limit tokens
+        trial = self.breaker.check()
+        try:
+            await limiter.acquire()
+            start = time.perf_counter()
+            body, reused = await self._send(method, params, payload, timeout)
+        except APIRateLimited:
+            # The API answered, so it is up even though it turned the call away
+            self.breaker.success()
+            raise
+        except APIError:
+            self.breaker.failure()
+            raise
+        finally:
+            # A cancelled trial call must not keep the breaker half-open forever
+            if trial:
+                self.breaker.release()
+        self.breaker.success()
+        elapsed = (time.perf_counter() - start) * 1000
+
+        self.stats["calls"] += 1
+        self.stats["total_ms"] += elapsed
+        self.stats["bytes"] += len(body)
+        if reused is True:
+            self.stats["reused_connections"] += 1
+            self.stats["reused_ms"] += elapsed
+        elif reused is False:
+            self.stats["new_connections"] += 1
+            self.stats["new_ms"] += elapsed
+
+        connection = {True: "reused", False: "new"}.get(reused, "multiplexed")
+        debug(f"{method} {tag} took {elapsed:,.1f}ms on a {connection} connection ({len(body):,} bytes)", tag="API")
+
+        try:
+            data = json.loads(body)
+        except ValueError as e:
+            raise APIError(f"Invalid JSON in API response: {e}") from e
+
+        # The API can also report an exhausted quota as a GraphQL error
+        if isinstance(data, dict) and "errors" in data:
+            message = str(data["errors"]).lower()
+            if "rate limit" in message or "too many" in message:
+                limiter.pause(None)
+        return data
+
+    async def get(self, api_key: str, query: str, timeout: Optional[float] = None, tag: str = "API", retries: int = 2) -> Dict[str, Any]:
+        """Send a query as URL parameters and return the decoded JSON body."""
+        return await self._request("GET", {"api_key": api_key, "query": query}, None, timeout, tag, retries)
+
+    async def post(self, api_key: str, query: str, variables: Optional[Dict] = None, timeout: Optional[float] = None, tag: str = "API", retries: int = 2) -> Dict[str, Any]:
+        """Send a query as a JSON body and return the decoded JSON body."""
+        return await self._request("POST", {"api_key": api_key}, {"query": query, "variables": variables or {}}, timeout, tag, retries)
+
+    def timing_summary(self) -> Dict[str, float]:
+        """Get average call times for new and reused connections."""
+        new = self.stats["new_connections"]
+        reused = self.stats["reused_connections"]
+        calls = self.stats["calls"]
+        return {
+            "calls": calls,
+            "avg_ms": self.stats["total_ms"] / calls if calls else 0.0,
+            "avg_new_ms": self.stats["new_ms"] / new if new else 0.0,
+            "avg_reused_ms": self.stats["reused_ms"] / reused if reused else 0.0,
+            "reuse_ratio": reused / (new + reused) if new + reused else 0.0,
+        }
+
+    async def close(self) -> None:
+        """Close the shared connection pool."""
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        if self._http2_client is not None:
+            await self._http2_client.aclose()
+        self._session = None
+        self._http2_client = None
+
+async def backoff(attempt: int, base: float = 1.0, cap: float = 30.0) -> None:
+    """Wait a random time up to ``base * 2 ** attempt`` before the next retry, without blocking the event loop."""
+    await asyncio.sleep(random.uniform(0, min(cap, base * 2 ** attempt)))
+
+# Create a global client instance
+client = APIClient()
@@ -0,0 +1,76 @@
+import json
+import os
+import sqlite3
+from typing import Dict, List, Optional, Tuple
+
+from bot.handler import info
+
+def audit_key(type: str, cities: int) -> str:
+    """Get the key runs of an audit type and city limit are stored under."""
+    return f"{type}|{int(cities)}"
+
+def diff(previous: Optional[Dict], latest: Dict) -> Tuple[List[str], List[str]]:
+    """Get the leaders flagged in ``latest`` but not ``previous``, and those no longer flagged."""
+    if previous is None:
+        return [], []
+    before = {result["id"]: result["leader"] for result in previous["results"] if result["attention"]}
+    after = {result["id"]: result["leader"] for result in latest["results"] if result["attention"]}
+    flagged = [leader for nation_id, leader in after.items() if nation_id not in before]
+    resolved = [leader for nation_id, leader in before.items() if nation_id not in after]
+    return flagged, resolved
+
+class AuditStore:
+    """The latest two runs of every audit, kept on disk in SQLite.
+
+    A run holds when it ran and every member's report, so /audit can answer
+    from the last scheduled run without fetching anything and show what
+    changed since the run before it. Runs are keyed by audit type and city
+    limit, since the warchest and deposit audits depend on the limit.
+    """
+
+    def __init__(self, path: str = "data/audits.sqlite"):
+        self.path = path
+        self.runs: Dict[str, List[Dict]] = {}
+        self._db: Optional[sqlite3.Connection] = None
+
+    def open(self, path: Optional[str] = None) -> None:
+        """Open the database and load every stored run into memory."""
+        if path:
+            self.path = path
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        self._db = sqlite3.connect(self.path, check_same_thread=False)
+        self._db.execute("CREATE TABLE IF NOT EXISTS runs (key TEXT, ran_at REAL, run TEXT, PRIMARY KEY (key, ran_at))")
+        self._db.commit()
+
+        self.runs = {}
+        for key, run in self._db.execute("SELECT key, run FROM runs ORDER BY ran_at"):
+            self.runs.setdefault(key, []).append(json.loads(run))
+        info(f"Loaded {sum(map(len, self.runs.values())):,} audit runs from {self.path}", tag="AUDIT")
+
+    def close(self) -> None:
+        """Close the database."""
+        if self._db is not None:
+            self._db.close()
+            self._db = None
+
+    def latest(self, key: str) -> Optional[Dict]:
+        """Get the most recent run, or None if the audit never ran."""
+        runs = self.runs.get(key)
+        return runs[-1] if runs else None
+
+    def previous(self, key: str) -> Optional[Dict]:
+        """Get the run before the most recent one, or None."""
+        runs = self.runs.get(key) or []
+        return runs[-2] if len(runs) > 1 else None
+
+    def save(self, key: str, run: Dict) -> None:
+        """Store a run as the latest, keeping the one it replaces as the previous."""
+        if self._db is None:
+            self.open()
+        self.runs[key] = (self.runs.get(key, []) + [run])[-2:]
+        self._db.execute("INSERT OR REPLACE INTO runs (key, ran_at, run) VALUES (?, ?, ?)", (key, run["ran_at"], json.dumps(run)))
+        self._db.execute("DELETE FROM runs WHERE key = ? AND ran_at < ?", (key, self.runs[key][0]["ran_at"]))
+        self._db.commit()
+
+# Create a global audit store instance
+audit_store = AuditStore()
@@ -0,0 +1,82 @@
+import asyncio
+import time
+from typing import Any, Awaitable, Callable, Dict, Hashable, Tuple
+
+class TTLCache:
+    """In-process cache with per-entry expiry and request coalescing.
+
+    Concurrent lookups for the same key share one in-flight load instead of
+    each calling the loader, and results are kept for ``ttl`` seconds.
+    Failed loads (``None`` or an exception) are never cached.
+    """
+
+    def __init__(self, ttl: float = 60.0):
+        self.ttl = ttl
+        self._entries: Dict[Hashable, Tuple[Any, float, float]] = {}
+        self._inflight: Dict[Hashable, asyncio.Future] = {}
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+
+    async def get(self, key: Hashable, loader: Callable[[], Awaitable[Any]]) -> Tuple[Any, float]:
+        """Get a value and the unix time it was fetched, loading it on a miss."""
+        while True:
+            entry = self._entries.get(key)
+            if entry is not None:
+                value, cached_at, expires = entry
+                if time.monotonic() < expires:
+                    self.hits += 1
+                    return value, cached_at
+                del self._entries[key]
+
+            future = self._inflight.get(key)
+            if future is None:
+                break
+            self.coalesced += 1
+            # Waiting this way leaves the shared load running if only this caller is cancelled
+            await asyncio.wait((future,))
+            if not future.cancelled():
+                return future.result()
+            # The caller doing the load was cancelled, so try again and maybe load it here
+
+        self.misses += 1
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            value = await loader()
+            cached_at = time.time()
+            if value is not None:
+                self._entries[key] = (value, cached_at, time.monotonic() + self.ttl)
+            result = (value, cached_at)
+            future.set_result(result)
+            return result
+        except asyncio.CancelledError:
+            # The cancellation belongs to this caller alone, so don't hand it to the waiters
+            future.cancel()
+            raise
+        except BaseException as e:
+            future.set_exception(e)
+            future.exception()  # Mark as retrieved when nobody else is waiting
+            raise
+        finally:
+            if self._inflight.get(key) is future:
+                del self._inflight[key]
+
+    def invalidate(self, key: Hashable) -> None:
+        """Drop a single entry."""
+        self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        """Drop every entry."""
+        self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """Get hit/miss counters and the current size."""
+        lookups = self.hits + self.misses + self.coalesced
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+            "size": len(self._entries),
+            "hit_rate": (self.hits + self.coalesced) / lookups if lookups else 0.0,
+        }
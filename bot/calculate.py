@@ -1,10 +1,41 @@
 from datetime import datetime, timezone
+from itertools import repeat
 import math
+import re
+
+import numpy as np
 
 import vars as vars
+from bot.models import BUILDING_INDEX, Roster
 from handler import debug, info, success, warning, error, fatal as debug, info, success, warning, error, fatal
 
-def warchest(nation_info, COSTS, MILITARY_COSTS):
+ISO_DATE = re.compile(r"\d{4}-\d{2}-\d{2}")
+
+# Founding dates never change, so each city's date is parsed once and kept by city ID
+city_founded = {}
+
+# The same dates kept by date string, for the batch path which ages cities per distinct date
+date_founded = {}
+
+def founded_on(date):
+    """Parse a city's founding date as UTC, once per distinct date string."""
+    if date in date_founded:
+        return date_founded[date]
+    when = datetime.fromisoformat(date) if ISO_DATE.fullmatch(date) else datetime.strptime(date, "%Y-%m-%d")
+    when = date_founded[date] = when.replace(tzinfo=timezone.utc)
+    return when
+
+def founded(city_id, date):
+    """Get when a city was founded, parsing its date only the first time the city is seen."""
+    city_id = int(city_id or 0)
+    if city_id in city_founded:
+        return city_founded[city_id]
+    when = founded_on(date)
+    if city_id:
+        city_founded[city_id] = when
+    return when
+
+def warchest(nation_info, COSTS, MILITARY_COSTS, as_of=None):
     # Cost constants per turn (calculated from daily cost divided by 12 turns)
     try:
         COSTS = vars.COSTS
@@ -44,6 +75,9 @@ def warchest(nation_info, COSTS, MILITARY_COSTS):
         required_steel = steel_per_turn * 60
         required_aluminum = aluminum_per_turn * 60
 
+        # City ages are measured at as_of, so the same inputs always give the same result
+        as_of = as_of or datetime.now(timezone.utc)
+
         for city in nation_info.get("cities", []):
             infra = city.get("infrastructure", 0)
             # Sum building upkeep per turn from all buildings in the city.
@@ -96,12 +130,7 @@ def warchest(nation_info, COSTS, MILITARY_COSTS):
 
             # Food Consumption: 1 Per Base-Person Per Turn and 1 Per 750 Soldiers
             base_population = int(city.get("infrastructure", 0) * 100)
-            date_format = "%Y-%m-%d"
-            
-            date1 = datetime.now(timezone.utc)
-            date2 = datetime.strptime(city.get("date", "2025-01-01"), date_format).replace(tzinfo=timezone.utc)
-
-            age = (date1 - date2).days
+            age = (as_of - founded(city.get("id"), city.get("date", "2025-01-01"))).days
 
             city_age_modifier = 1 + max(math.log(max(age, 1)) / 15, 0)
 
@@ -220,23 +249,215 @@ def warchest(nation_info, COSTS, MILITARY_COSTS):
 
     return result, excess, supply
 
-def balance(nation_info):
-    money = 0
-    coal = 0
-    oil = 0
-    uranium = 0
-    iron = 0
-    bauxite = 0
-    lead = 0
-    gasoline = 0
-    munitions = 0
-    steel = 0
-    aluminum = 0
-    food = 0
+RESOURCES = ["money", "coal", "oil", "uranium", "iron", "bauxite", "lead",
+             "gasoline", "munitions", "steel", "aluminum", "food", "credits"]
+CITY_FIELDS = ["coal_power", "oil_power", "nuclear_power", "oil_refinery", "steel_mill",
+               "aluminum_refinery", "munitions_factory"]
+
+def warchest_batch(members, COSTS=None, MILITARY_COSTS=None, as_of=None):
+    """Run warchest for every member of a Roster (or list of member dicts) at once, returning its (result, excess, supply) per member in order.
+
+    Gives exactly the same numbers as calling warchest on each member. Cities
+    are laid out as a city slot x resource x members grid and summed one slot
+    at a time, so every member's floating point sums happen in the same order
+    as in the scalar loop. City ages are worked out once per distinct founding
+    date, and parsed dates are kept between calls. A
+    member whose data cannot be parsed gets (None, {}, {}), like warchest.
+    """
+    COSTS = COSTS or vars.COSTS
+    MILITARY_COSTS = MILITARY_COSTS or vars.MILITARY_COSTS
+    roster = members if isinstance(members, Roster) else Roster(members)
+    cities = roster.cities
+    count = len(roster)
+    valid = np.ones(count, dtype=bool)
+
+    # Age every city at as_of the same way warchest does, once per distinct founding date
+    as_of = as_of or datetime.now(timezone.utc)
+    dates = set(cities.dates)
+    modifiers_at = {}
+    for date in dates:
+        try:
+            when = founded_on(date)
+        except Exception as e:
+            error(f"Error in warchest calculation: {e}")
+            continue
+        # Same city-age modifier as warchest, with math.log so every value is bit-for-bit identical
+        modifiers_at[date] = 1 + max(math.log(max((as_of - when).days, 1)) / 15, 0)
+    city_modifiers = np.fromiter(map(modifiers_at.get, cities.dates, repeat(1.0)), dtype=np.float64, count=len(cities))
+
+    rows = roster.owners()
+    failed = dates - modifiers_at.keys()
+    if failed:
+        valid[rows[[index for index, date in enumerate(cities.dates) if date in failed]]] = False
+
+    # Read every nation field once, as one nations x fields array
+    columns = roster.columns((*MILITARY_COSTS, *RESOURCES))
+    units = {unit: columns[:, index] for index, unit in enumerate(MILITARY_COSTS)}
+    stock = {resource: columns[:, len(MILITARY_COSTS) + index] for index, resource in enumerate(RESOURCES)}
+    soldiers, tanks, aircraft, ships = (units[unit] for unit in ("soldiers", "tanks", "aircraft", "ships"))
+
+    # Building upkeep is a whole number, so each member's total can be summed in any order
+    costs = [BUILDING_INDEX[building] for building in COSTS]
+    city_upkeep = cities.buildings[:, costs].astype(np.int64) @ np.array(list(COSTS.values()), dtype=np.int64)
+    running_upkeep = np.concatenate(([0], np.cumsum(city_upkeep)))
+    total_building_upkeep = running_upkeep[roster.offsets[1:]] - running_upkeep[roster.offsets[:-1]]
+
+    # What every city consumes per turn, worked out per city the same way as warchest
+    infra = cities.infrastructure
+    base_population = (infra * 100).astype(np.int64)
+    population = (np.bitwise_xor(base_population, 2) / 125_000_000) + ((base_population * city_modifiers - base_population) / 850)
+    consumption = np.column_stack((
+        cities["coal_power"] * ((infra / 100) * 0.1),
+        cities["oil_power"] * ((infra / 100) * 0.1),
+        cities["nuclear_power"] * ((infra / 1000) * 0.2),
+        cities["steel_mill"] * 0.75,
+        cities["aluminum_refinery"] * 0.75,
+        cities["munitions_factory"] * 1.5,
+        population * 1 + soldiers[rows] / 750,
+    ))
+
+    # Lay the cities out as a city slot x resource x members grid, padded with
+    # empty cities, and add it up one slot at a time so every member's sums
+    # happen in the same order as in warchest. Oil refineries are added after
+    # oil power plants within each city, like warchest does.
+    slots = np.arange(len(cities)) - roster.offsets[rows]
+    width = int(slots.max()) + 1 if len(slots) else 0
+    grid = np.zeros((width, consumption.shape[1], count))
+    grid[slots, :, rows] = consumption
+    refineries = np.zeros((width, count))
+    refineries[slots, rows] = cities["oil_refinery"] * 0.5
+
+    totals = np.zeros((consumption.shape[1], count))
+    for slot in range(width):
+        totals += grid[slot]
+        totals[1] += refineries[slot]
+    coal, oil, uranium, steel_mill, aluminum_bauxite, munitions_lead, food = totals
+
+    required_gasoline = ((soldiers / 5000) + (tanks / 100) + (aircraft / 4) + 2.5) * 60
+    required_munitions = ((soldiers / 5000) + (tanks / 100) + (aircraft / 4) + 2) * 60
+    required_steel = ((tanks / 100) + (ships / 5)) * 60
+    required_aluminum = (aircraft / 4) * 60
+
+    total_military_upkeep = (
+        soldiers * MILITARY_COSTS["soldiers"] + tanks * MILITARY_COSTS["tanks"] +
+        aircraft * MILITARY_COSTS["aircraft"] + ships * MILITARY_COSTS["ships"]
+    )
+    supply = {
+        "money": (total_building_upkeep + total_military_upkeep) * 60,
+        "coal": (coal + steel_mill) * 60,
+        "oil": oil * 60,
+        "uranium": uranium * 60,
+        "iron": steel_mill * 60,
+        "bauxite": aluminum_bauxite * 60,
+        "lead": munitions_lead * 60,
+        "gasoline": required_gasoline,
+        "munitions": required_munitions,
+        "steel": required_steel,
+        "aluminum": required_aluminum,
+        "food": food * 60,
+        "credits": 1 - stock["credits"],
+    }
+
+    deficits = {f"{resource}_deficit": np.maximum(supply[resource] - stock[resource], 0).tolist()
+                for resource in RESOURCES}
+    excess = {resource: np.where(supply[resource] - stock[resource] < 0, np.abs(supply[resource] - stock[resource]), 0).tolist()
+              for resource in RESOURCES[:-1]}
+    supply = {resource: values.tolist() for resource, values in supply.items()}
+
+    return [
+        (dict(zip(deficits, result)), dict(zip(excess, surplus)), dict(zip(supply, required))) if ok else (None, {}, {})
+        for ok, result, surplus, required in zip(
+            valid.tolist(), zip(*deficits.values()), zip(*excess.values()), zip(*supply.values())
+        )
+    ]
+
+# Nation fields a warchest result depends on, besides its cities
+FINGERPRINT_FIELDS = ["soldiers", "tanks", "aircraft", "ships", *RESOURCES]
+
+class WarchestCache:
+    """Warchest results from earlier runs, reused for members whose inputs did not change.
+
+    A member's fingerprint covers its military, its stockpiles and every
+    city's ID, founding date, infrastructure and building counts, plus the
+    UTC day its cities are aged at, since city ages only change at midnight.
+    Every result is dropped when the costs it was worked out with change.
+    """
+
+    def __init__(self):
+        self.results = {}
+        self.costs = None
+        self.recomputed = 0
+
+    @staticmethod
+    def fingerprint(nation, day):
+        cities = nation.cities
+        return hash((
+            day,
+            tuple(getattr(nation, field) for field in FINGERPRINT_FIELDS),
+            cities.ids.tobytes(),
+            tuple(cities.dates),
+            cities.infrastructure.tobytes(),
+            cities.buildings.tobytes(),
+        ))
+
+    def run(self, members, COSTS=None, MILITARY_COSTS=None, as_of=None, current=None):
+        """Get warchest results for every member in order, recomputing only members whose inputs changed.
+
+        Results are kept for the nation IDs in ``current``, or for ``members``
+        when it is not given, so a run over only some of the members does not
+        drop the others.
+        """
+        roster = members if isinstance(members, Roster) else Roster(members)
+        as_of = as_of or datetime.now(timezone.utc)
+        day = as_of.astimezone(timezone.utc).date()
+        COSTS = COSTS or vars.COSTS
+        MILITARY_COSTS = MILITARY_COSTS or vars.MILITARY_COSTS
+        costs = (tuple(sorted(COSTS.items())), tuple(sorted(MILITARY_COSTS.items())))
+        if costs != self.costs:
+            self.results = {}
+            self.costs = costs
+
+        fingerprints = [self.fingerprint(nation, day) for nation in roster]
+        changed = [
+            index for index, (nation, fingerprint) in enumerate(zip(roster, fingerprints))
+            if self.results.get(nation.id, (None,))[0] != fingerprint
+        ]
+        fresh = warchest_batch(roster.select(changed), COSTS, MILITARY_COSTS, as_of) if changed else []
+
+        # Keep only current members, so nations that left do not linger
+        current = {int(nation_id) for nation_id in current} if current is not None else {nation.id for nation in roster}
+        results = {nation_id: result for nation_id, result in self.results.items() if nation_id in current}
+        for index, result in zip(changed, fresh):
+            results[roster.nations[index].id] = (fingerprints[index], result)
+        self.results = results
+        self.recomputed = len(changed)
+        return [results[nation.id][1] for nation in roster]
+
+# Create a global warchest cache instance
+warchest_cache = WarchestCache()
+
+# sender_type and receiver_type of a bank record side that is a nation, not an alliance
+NATION_RECORD = 1
+
+def balance(nation_info, totals=None):
+    # Start from running totals when only new records are being added
+    totals = totals or {}
+    money = totals.get("money", 0)
+    coal = totals.get("coal", 0)
+    oil = totals.get("oil", 0)
+    uranium = totals.get("uranium", 0)
+    iron = totals.get("iron", 0)
+    bauxite = totals.get("bauxite", 0)
+    lead = totals.get("lead", 0)
+    gasoline = totals.get("gasoline", 0)
+    munitions = totals.get("munitions", 0)
+    steel = totals.get("steel", 0)
+    aluminum = totals.get("aluminum", 0)
+    food = totals.get("food", 0)
 
     try:
         for rec in nation_info.get("bankrecs", []):
-            if rec.get("receiver", {}).get("id") == nation_info.get("id"):
+            if int(rec.get("receiver_type") or 0) == NATION_RECORD and str(rec.get("receiver_id")) == str(nation_info.get("id")):
                 money += rec.get("money", 0)
                 coal += rec.get("coal", 0)
                 oil += rec.get("oil", 0)
@@ -249,7 +470,7 @@ def balance(nation_info):
                 steel += rec.get("steel", 0)
                 aluminum += rec.get("aluminum", 0)
                 food += rec.get("food", 0)
-            elif rec.get("sender", {}).get("id") == nation_info.get("id"):
+            elif int(rec.get("sender_type") or 0) == NATION_RECORD and str(rec.get("sender_id")) == str(nation_info.get("id")):
                 money -= rec.get("money", 0)
                 coal -= rec.get("coal", 0)
                 oil -= rec.get("oil", 0)
@@ -265,20 +486,7 @@ def balance(nation_info):
 
     except Exception as e:
         error(f"Error in balance calculation: {e}")
-        return {
-            "money": 0,
-            "coal": 0,
-            "oil": 0,
-            "uranium": 0,
-            "iron": 0,
-            "bauxite": 0,
-            "lead": 0,
-            "gasoline": 0,
-            "munitions": 0,
-            "steel": 0,
-            "aluminum": 0,
-            "food": 0
-        }
+        return {resource: totals.get(resource, 0) for resource in RESOURCES[:-1]}
     return {
         "money": money,
         "coal": coal,
@@ -1,4 +1,5 @@
-from typing import List, Optional, Dict
+from typing import AsyncIterator, List, Optional, Dict, Tuple
+import asyncio
 import discord
 from discord import app_commands
 from discord.ext import commands
@@ -12,6 +13,50 @@ from bot.handler import info, error, warning
 from bot import data as get_data
 from bot import calculate
 from bot import vars as vars
+from bot.models import CityTable, Roster
+from bot.api import APIError
+from bot.audits import audit_store, audit_key, diff
+from bot.ratelimit import current_command
+
+# Resource emojis
+RESOURCE_EMOJIS = {
+    "money": "<:money:1357103044466184412>",
+    "coal": "<:coal:1357102730682040410>",
+    "oil": "<:Oil:1357102740391854140>",
+    "uranium": "<:uranium:1357102742799126558>",
+    "iron": "<:iron:1357102735488581643>",
+    "bauxite": "<:bauxite:1357102729411039254>",
+    "lead": "<:lead:1357102736646209536>",
+    "gasoline": "<:gasoline:1357102734645399602>",
+    "munitions": "<:munitions:1357102777389814012>",
+    "steel": "<:steel:1357105344052072618>",
+    "aluminum": "<:aluminum:1357102728391819356>",
+    "food": "<:food:1357102733571784735>",
+    "credits": "<:credits:1357102732187537459>"
+}
+
+# City limit /audit and the scheduled audits use unless told otherwise
+DEFAULT_CITIES = 100
+
+# Seconds between edits of a live audit paginator
+PROGRESS_INTERVAL = 2.0
+
+# Summary line of each audit type
+AUDIT_SUMMARIES = {
+    "all": "### The Following People Need Attention",
+    "activity": "### The Following People Need To Log In",
+    "warchest": "### The Following People Need To Fix Their Warchests",
+    "spies": "### The Following People Need To Train More Spies",
+    "mmr": "### The Following People Need To Fix Their MMR",
+    "deposit": "### The Following People Need To Deposit Resources",
+}
+
+# Checks the "all" audit runs
+AUDIT_CHECKS = ("activity", "warchest", "spies", "mmr", "deposit")
+
+# Member key the spies and mmr checks read, and the batched nation fields to
+# fetch it with for a member the members payload lacks it for
+AUDIT_FIELDS = {"spies": ("central_intelligence_agency", "spies"), "mmr": ("cities", "cities")}
 
 class AuditCog(commands.Cog):
     """Cog for audit-related commands."""
@@ -90,142 +135,293 @@ class AuditCog(commands.Cog):
         
         return items
     
-    def check_deposit_excess(self, nation: Dict) -> List[str]:
+    def check_deposit_excess(self, nation: Dict, excess_dict: Optional[Dict] = None) -> List[str]:
         """Check if a nation has excess resources that should be deposited."""
         excess = []
         
-        # Resource emojis
-        resource_emojis = {
-            "money": "<:money:1357103044466184412>",
-            "coal": "<:coal:1357102730682040410>",
-            "oil": "<:Oil:1357102740391854140>",
-            "uranium": "<:uranium:1357102742799126558>",
-            "iron": "<:iron:1357102735488581643>",
-            "bauxite": "<:bauxite:1357102729411039254>",
-            "lead": "<:lead:1357102736646209536>",
-            "gasoline": "<:gasoline:1357102734645399602>",
-            "munitions": "<:munitions:1357102777389814012>",
-            "steel": "<:steel:1357105344052072618>",
-            "aluminum": "<:aluminum:1357102728391819356>",
-            "food": "<:food:1357102733571784735>",
-            "credits": "<:credits:1357102732187537459>"
-        }
-        
         # Get warchest calculation to determine required resources for 60 turns
-        _, excess_dict, _ = calculate.warchest(nation, vars.COSTS, vars.MILITARY_COSTS)
+        if excess_dict is None:
+            _, excess_dict, _ = calculate.warchest(nation, vars.COSTS, vars.MILITARY_COSTS)
         
         # Check each resource against its 60-turn requirement
         for resource, excess_amount in excess_dict.items():
             if excess_amount > 0:  # If they have more than 60 turns worth
-                emoji = resource_emojis.get(resource, "")
+                emoji = RESOURCE_EMOJIS.get(resource, "")
                 excess.append(f"{emoji} {format_number(excess_amount)}")
         
         return excess
     
-    async def perform_member_audit(self, member: Dict, audit_results: List[str], needers: List[str]) -> None:
-        """Perform all audits on a single member."""
+    def warchest_deficits(self, wc_result: Dict, wc_supply: Dict) -> List[str]:
+        """List the resources a warchest is short of by more than a quarter of its supply."""
+        deficits = []
+        for resource, emoji in RESOURCE_EMOJIS.items():
+            deficit = wc_result[f"{resource}_deficit"]
+            if resource == "credits":
+                if deficit > 10:
+                    deficits.append(f"{emoji} {deficit:,.2f}")
+            elif deficit > 0.25 * wc_supply[resource]:
+                deficits.append(f"{emoji} {deficit:,.2f}\n")
+        return deficits
+    
+    async def member_data(self, member: Dict, type: str, state: Dict) -> Dict:
+        """Get the nation data a check needs, from the members payload or, when it lacks it, on its own."""
+        key, fields = AUDIT_FIELDS[type]
+        if key in member:
+            return member
         nation_id = int(member['id'])
-        nation_url = f"https://politicsandwar.com/nation/id={nation_id}"
-        header = (
-            f"**Leader:** [{member['leader_name']}]({nation_url})\n"
-            f"**Nation:** {member['nation_name']}\n"
-            f"**Discord:** {member.get('discord', 'N/A')}\n"
-        )
+        batch = state["batch"]
+        if nation_id not in batch:
+            batch.update(await get_data.GET_NATIONS_BATCH([nation_id], self.config.API_KEY, fields, semaphore=state["semaphore"]))
+        if nation_id not in batch:
+            raise APIError(f"could not fetch {fields} data")
+        return batch[nation_id]
+    
+    async def run_check(self, type: str, member: Dict, state: Dict) -> Optional[Tuple[str, bool]]:
+        """Run one audit check on a member.
         
-        # Activity Check
-        last_active_str = member.get("last_active", "1970-01-01T00:00:00+00:00")
-        try:
-            last_active_dt = datetime.fromisoformat(last_active_str.replace("Z", "+00:00"))
-            last_active_unix = last_active_dt.timestamp()
+        Returns the check's section of the member's report and whether they
+        need to act on it, or None when the check does not apply.
+        """
+        if type == "activity":
+            last_active_str = member.get("last_active", "1970-01-01T00:00:00+00:00")
+            try:
+                last_active_unix = datetime.fromisoformat(last_active_str.replace("Z", "+00:00")).timestamp()
+            except ValueError:
+                raise ValueError(f"could not parse last_active {last_active_str!r}")
             
             if (time.time() - last_active_unix) >= 86400:  # 24 hours
-                audit_results.append(
-                    f"{header}\n"
+                return (
                     f"**Last Active:** <t:{int(last_active_unix)}:F>\n"
                     f"**Defensive Wars:** {member['defensive_wars_count']}"
-                )
-                needers.append(f"@{member.get('discord','N/A')}")
-        except ValueError:
-            error(f"Error parsing last_active for {member['leader_name']}", tag="AUDIT")
-        
-        # Warchest Check
-        wc_result, _, wc_supply = calculate.warchest(member, vars.COSTS, vars.MILITARY_COSTS)
-        if wc_result is not None:
-            deficits = []
-            if wc_result['money_deficit'] > 0.25 * wc_supply['money']:
-                deficits.append(f"<:money:1357103044466184412> {wc_result['money_deficit']:,.2f}\n")
-            if wc_result['coal_deficit'] > 0.25 * wc_supply['coal']:
-                deficits.append(f"<:coal:1357102730682040410> {wc_result['coal_deficit']:,.2f}\n")
-            if wc_result['oil_deficit'] > 0.25 * wc_supply['oil']:
-                deficits.append(f"<:Oil:1357102740391854140> {wc_result['oil_deficit']:,.2f}\n")
-            if wc_result['uranium_deficit'] > 0.25 * wc_supply['uranium']:
-                deficits.append(f"<:uranium:1357102742799126558> {wc_result['uranium_deficit']:,.2f}\n")
-            if wc_result['iron_deficit'] > 0.25 * wc_supply['iron']:
-                deficits.append(f"<:iron:1357102735488581643> {wc_result['iron_deficit']:,.2f}\n")
-            if wc_result['bauxite_deficit'] > 0.25 * wc_supply['bauxite']:
-                deficits.append(f"<:bauxite:1357102729411039254> {wc_result['bauxite_deficit']:,.2f}\n")
-            if wc_result['lead_deficit'] > 0.25 * wc_supply['lead']:
-                deficits.append(f"<:lead:1357102736646209536> {wc_result['lead_deficit']:,.2f}\n")
-            if wc_result['gasoline_deficit'] > 0.25 * wc_supply['gasoline']:
-                deficits.append(f"<:gasoline:1357102734645399602> {wc_result['gasoline_deficit']:,.2f}\n")
-            if wc_result['munitions_deficit'] > 0.25 * wc_supply['munitions']:
-                deficits.append(f"<:munitions:1357102777389814012> {wc_result['munitions_deficit']:,.2f}\n")
-            if wc_result['steel_deficit'] > 0.25 * wc_supply['steel']:
-                deficits.append(f"<:steel:1357105344052072618> {wc_result['steel_deficit']:,.2f}\n")
-            if wc_result['aluminum_deficit'] > 0.25 * wc_supply['aluminum']:
-                deficits.append(f"<:aluminum:1357102728391819356> {wc_result['aluminum_deficit']:,.2f}\n")
-            if wc_result['food_deficit'] > 0.25 * wc_supply['food']:
-                deficits.append(f"<:food:1357102733571784735> {wc_result['food_deficit']:,.2f}\n")
-            if wc_result['credits_deficit'] > 10:
-                deficits.append(f"<:credits:1357102732187537459> {wc_result['credits_deficit']:,.2f}")
+                ), True
+        
+        elif type == "warchest":
+            if state["cities"] >= len(member.get("cities", [])):
+                wc_result, _, wc_supply = state["warchests"][int(member['id'])]
+                if wc_result is None:
+                    raise ValueError("could not calculate warchest")
+                deficits = self.warchest_deficits(wc_result, wc_supply)
+                deficits_str = "".join(deficits) if deficits else "**All Good!** No deficits found."
+                return f"**Warchest Deficits:**\n{deficits_str}", bool(deficits)
+        
+        elif type == "spies":
+            # Check if nation has Intelligence Agency project
+            nation_data = await self.member_data(member, type, state)
+            has_intel_agency = bool(nation_data.get('central_intelligence_agency'))
+            required_spies = 60 if has_intel_agency else 50
+            
+            # Check if nation has enough spies
+            if member.get("spies", 0) < required_spies:
+                return (
+                    f"**Current Spies:** {member.get('spies', 0)}\n"
+                    f"**Required Spies:** {required_spies}\n"
+                    f"**Has Intelligence Agency:** {'Yes' if has_intel_agency else 'No'}"
+                ), True
+        
+        elif type == "mmr":
+            city_data = (await self.member_data(member, type, state)).get('cities')
+            if not city_data:
+                raise APIError("could not fetch city data")
+            city_table = CityTable(city_data)
             
-            if deficits:
-                audit_results.append(f"{header}\n**Warchest Deficits:**\n{''.join(deficits)}")
-                needers.append(f"@{member.get('discord','N/A')}")
-        
-        # MMR Check
-        cities = get_data.GET_CITY_DATA(nation_id, self.config.API_KEY)
-        if cities:
-            role = "Whale" if len(cities) >= 15 else "Raider"
+            # Determine role based on city count
+            role = "Whale" if len(city_table) >= 15 else "Raider"
+            requirements = self.mmr_requirements[role]
+            
+            # Check MMR requirements, only formatting the cities that fall short
             mmr_violations = []
-            for city in cities:
-                mmr_status = self.check_city_mmr(city, role)
-                if not all(mmr_status.values()):
-                    city_name = city.get("name", "Unknown")
-                    missing = []
-                    if not mmr_status["barracks"]:
-                        missing.append(f"Barracks: {city.get('barracks', 0)}/{self.mmr_requirements[role]['barracks']}")
-                    if not mmr_status["factory"]:
-                        missing.append(f"Factory: {city.get('factory', 0)}/{self.mmr_requirements[role]['factory']}")
-                    if not mmr_status["hangar"]:
-                        missing.append(f"Hangar: {city.get('hangar', 0)}/{self.mmr_requirements[role]['hangar']}")
-                    if not mmr_status["drydock"]:
-                        missing.append(f"Drydock: {city.get('drydock', 0)}/{self.mmr_requirements[role]['drydock']}")
-                    mmr_violations.append(f"{city_name}: {', '.join(missing)}")
+            for index in city_table.short_of(requirements).tolist():
+                missing = [
+                    f"{label}: {city_table.count(index, building)}/{requirements[building]}"
+                    for building, label in (("barracks", "Barracks"), ("factory", "Factory"), ("hangar", "Hangar"), ("drydock", "Drydock"))
+                    if city_table.count(index, building) < requirements[building]
+                ]
+                mmr_violations.append(f"{city_table.names[index]}: {', '.join(missing)}")
             
             if mmr_violations:
-                audit_results.append(
-                    f"{header}\n"
-                    f"**Role:** {role}\n"
-                    f"**MMR Violations:**\n" + "\n".join(mmr_violations)
-                )
-                needers.append(f"@{member.get('discord','N/A')}")
-        
-        # Deposit Excess Check
-        excess = self.check_deposit_excess(member)
-        if excess:
-            audit_results.append(
-                f"{header}\n"
-                f"**Excess Resources (Should Deposit):**\n" + "\n".join(excess)
+                return f"**Role:** {role}\n**MMR Violations:**\n" + "\n".join(mmr_violations), True
+        
+        elif type == "deposit":
+            # Only check nations with city count <= specified limit
+            if state["cities"] >= len(member.get("cities", [])):
+                excess = self.check_deposit_excess(member, state["warchests"][int(member['id'])][1])
+                if excess:
+                    return "**Excess Resources:**\n" + "\n".join(excess), True
+        
+        return None
+    
+    async def check_member(self, type: str, member: Dict, state: Dict) -> Optional[Tuple[str, bool]]:
+        """Audit a member for one check, or every check when ``type`` is "all".
+        
+        Returns the member's report and whether they need to act on it, or
+        None when there is nothing to report. A single check that fails
+        raises; under "all" a failed check is noted in the report and the
+        other checks still run.
+        """
+        nation_url = f"https://politicsandwar.com/nation/id={member['id']}"
+        header = (
+            f"**Leader:** [{member['leader_name']}]({nation_url})\n"
+            f"**Nation:** {member['nation_name']}\n"
+            f"**Discord:** {member.get('discord', 'N/A')}\n"
+        )
+        
+        if type != "all":
+            check = await self.run_check(type, member, state)
+            if check is None:
+                return None
+            section, needs_attention = check
+            return f"{header}\n{section}", needs_attention
+        
+        # Only checks that need acting on, or failed, make the combined report
+        sections = []
+        for check_type in AUDIT_CHECKS:
+            try:
+                check = await self.run_check(check_type, member, state)
+            except Exception as e:
+                error(f"Error running {check_type} audit for {member['leader_name']}: {e}", tag="AUDIT")
+                sections.append(f"**{check_type.title()} Check Failed:** {e}")
+                continue
+            if check is not None and check[1]:
+                sections.append(check[0])
+        if not sections:
+            return None
+        return f"{header}\n" + "\n\n".join(sections), True
+    
+    def new_run(self, type: str, cities: int, members: List[Dict]) -> Dict:
+        """Start a run of an audit over the alliance members.
+        
+        A run holds when it ran and, for every member with something to
+        report, their report and whether they need to act on it or failed.
+        """
+        return {
+            "type": type,
+            "cities": cities,
+            "ran_at": time.time(),
+            "members": len(members),
+            "recomputed": "",
+            "results": [],
+        }
+    
+    async def stream_audit(self, run: Dict, members: List[Dict]) -> AsyncIterator[Tuple[int, int, Optional[Dict]]]:
+        """Audit the alliance members, filling in ``run`` as each member finishes.
+        
+        Members are checked concurrently and yielded in member order, each as
+        how many members are done, how many are audited and the member's
+        result, or None when there is nothing to report.
+        """
+        type, cities = run["type"], run["cities"]
+        audited = [member for member in members if member.get("alliance_position", "") != "APPLICANT"]
+        checks = AUDIT_CHECKS if type == "all" else (type,)
+        
+        # The members payload carries what the spies and mmr checks need; fetch it
+        # in one batch for any member it is missing from, and members the batch
+        # misses are fetched on their own by their check
+        semaphore = asyncio.Semaphore(self.config.AUDIT_CONCURRENCY)
+        batch = {}
+        for check in checks:
+            if check in AUDIT_FIELDS:
+                key, fields = AUDIT_FIELDS[check]
+                missing = [member['id'] for member in audited if key not in member]
+                if missing:
+                    batch.update(await get_data.GET_NATIONS_BATCH(missing, self.config.API_KEY, fields, semaphore=semaphore))
+        
+        # Run the warchest calculation for every audited member at once, reusing
+        # results from the last audit for members whose inputs did not change
+        warchests = {}
+        if "warchest" in checks or "deposit" in checks:
+            roster = Roster(member for member in audited if cities >= len(member.get("cities", [])))
+            # Keep results for members over the city limit too, so audits with different limits don't evict each other
+            results = calculate.warchest_cache.run(
+                roster, vars.COSTS, vars.MILITARY_COSTS, current=[member['id'] for member in audited]
+            )
+            warchests = {nation.id: wc for nation, wc in zip(roster, results)}
+            run["recomputed"] = f"Recomputed {calculate.warchest_cache.recomputed} of {len(roster)} warchests\n"
+            info(run["recomputed"].strip(), tag="AUDIT")
+        
+        # Check every member concurrently, results come back in member order
+        state = {"cities": cities, "batch": batch, "warchests": warchests, "semaphore": semaphore}
+        tasks = [asyncio.create_task(self.check_member(type, member, state)) for member in audited]
+        done = 0
+        
+        def finished(task: asyncio.Task) -> None:
+            nonlocal done
+            done += 1
+        
+        for task in tasks:
+            task.add_done_callback(finished)
+        try:
+            for index, (member, task) in enumerate(zip(audited, tasks)):
+                try:
+                    check = await task
+                except Exception as e:
+                    check = e
+                result = {"id": int(member['id']), "leader": member['leader_name'], "discord": member.get('discord', 'N/A')}
+                if isinstance(check, Exception):
+                    error(f"Error auditing {member['leader_name']}: {check}", tag="AUDIT")
+                    result.update(report=f"Error auditing {member['leader_name']}: {check}", attention=False, failed=True)
+                elif check is not None:
+                    result.update(report=check[0], attention=check[1], failed=False)
+                else:
+                    result = None
+                if result is not None:
+                    run["results"].append(result)
+                yield max(done, index + 1), len(audited), result
+        finally:
+            for task in tasks:
+                task.cancel()
+    
+    async def run_audit(self, type: str, cities: int, members: List[Dict]) -> Dict:
+        """Audit the alliance members and get the finished run."""
+        run = self.new_run(type, cities, members)
+        async for _ in self.stream_audit(run, members):
+            pass
+        return run
+    
+    async def run_schedule(self, interval: float) -> None:
+        """Run every scheduled audit forever, waiting ``interval`` seconds between rounds."""
+        current_command.set("audit_schedule")
+        while True:
+            try:
+                members = await get_data.GET_ALLIANCE_MEMBERS(self.config.ALLIANCE_ID, self.config.API_KEY)
+                if members is None:
+                    warning("Skipped scheduled audits, could not fetch alliance members", tag="AUDIT")
+                else:
+                    start = time.time()
+                    for type in self.config.AUDIT_SCHEDULE:
+                        audit_store.save(audit_key(type, DEFAULT_CITIES), await self.run_audit(type, DEFAULT_CITIES, members))
+                    info(
+                        f"Ran {len(self.config.AUDIT_SCHEDULE)} scheduled audits for {len(members)} members "
+                        f"in {time.time() - start:,.1f}s",
+                        tag="AUDIT"
+                    )
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                error(f"Error running scheduled audits: {e}", tag="AUDIT")
+            await asyncio.sleep(interval)
+    
+    async def cog_load(self) -> None:
+        """Start the scheduled audits."""
+        if self.config.AUDIT_SCHEDULE:
+            self.schedule_task = asyncio.create_task(self.run_schedule(self.config.AUDIT_REFRESH_MINUTES * 60))
+            info(
+                f"Started scheduled audits ({', '.join(self.config.AUDIT_SCHEDULE)}) every {self.config.AUDIT_REFRESH_MINUTES:g} minutes",
+                tag="AUDIT"
             )
-            needers.append(f"@{member.get('discord','N/A')}")
+    
+    async def cog_unload(self) -> None:
+        """Stop the scheduled audits."""
+        if getattr(self, 'schedule_task', None):
+            self.schedule_task.cancel()
     
     @app_commands.command(name="audit", description="Audit alliance members for various requirements.")
     @app_commands.describe(
         type="Type of audit to perform",
-        cities="Only audit members with ≤ this many cities (for warchest)"
+        cities="Only audit members with ≤ this many cities (for warchest)",
+        fresh="Run the audit now instead of answering from a recent stored run"
     )
     @app_commands.choices(type=[
+        app_commands.Choice(name="all", value="all"),
         app_commands.Choice(name="activity", value="activity"),
         app_commands.Choice(name="warchest", value="warchest"),
         app_commands.Choice(name="spies", value="spies"),
@@ -239,206 +435,118 @@ class AuditCog(commands.Cog):
         self,
         interaction: discord.Interaction,
         type: str,
-        cities: int = 100
+        cities: int = DEFAULT_CITIES,
+        fresh: bool = False
     ):
         """Audit alliance members based on different criteria."""
         await interaction.response.defer()
         
-        members = get_data.GET_ALLIANCE_MEMBERS(self.config.ALLIANCE_ID, self.config.API_KEY)
-        if members is None:
-            await interaction.followup.send(
-                embed=create_embed(
-                    title=":warning: Error Fetching Alliance Members",
-                    description="Failed to fetch alliance members. Please try again later.",
-                    color=discord.Color.red()
-                ),
-                ephemeral=True
-            )
-            return
-            
-        audit_results = []
-        current_time = time.time()
-        one_day_seconds = 86400
         type = type.lower()
+        key = audit_key(type, cities)
+        # Stored runs older than AUDIT_MAX_AGE_MINUTES, e.g. from before downtime, are run again
+        run = None if fresh else audit_store.latest(key)
+        if run is not None and time.time() - run["ran_at"] > self.config.AUDIT_MAX_AGE_MINUTES * 60:
+            run = None
+        if run is None:
+            members = await get_data.GET_ALLIANCE_MEMBERS(self.config.ALLIANCE_ID, self.config.API_KEY)
+            if members is None:
+                await interaction.followup.send(
+                    embed=create_embed(
+                        title=":warning: Error Fetching Alliance Members",
+                        description="Failed to fetch alliance members. Please try again later.",
+                        color=discord.Color.red()
+                    ),
+                    ephemeral=True
+                )
+                return
+            
+            info(f"Starting Audit For {len(members)} Members Of Alliance: https://politicsandwar.com/alliance/id={self.config.ALLIANCE_ID}")
+            run = self.new_run(type, cities, members)
+            await self.stream_to(interaction, run, members)
+            audit_store.save(key, run)
+            info(f"Audit completed for {len(members)} members of alliance: {self.config.ALLIANCE_ID}", tag="AUDIT")
+        else:
+            info(f"Answered {type} audit from the run at {datetime.fromtimestamp(run['ran_at'], timezone.utc):%H:%M} UTC", tag="AUDIT")
+            
+            # Use paginator to display results
+            paginator = ActivityPaginator([result["report"] for result in run["results"]])
+            await interaction.followup.send(embed=paginator.get_embed(), view=paginator)
         
-        info(f"Starting Audit For {len(members)} Members Of Alliance: https://politicsandwar.com/alliance/id={self.config.ALLIANCE_ID}")
-        
-        need_login = []
-        needers = []
-        summary = []
+        needers = [f"@{result['discord']}" for result in run["results"] if result["attention"]]
+        failed = [result["leader"] for result in run["results"] if result["failed"]]
+        failures = f"Failed to audit {len(failed)} members: {', '.join(failed)}\n" if failed else ""
+        await interaction.followup.send(
+            self.run_status(run, audit_store.previous(key))
+            + f"\n```{AUDIT_SUMMARIES.get(type, '')}\n{run['recomputed']}{failures}"
+            + f"{needers or ['No Violators!']}```".replace("'", "").replace("[", "").replace("]", "").replace(",", "")
+        )
+    
+    async def stream_to(self, interaction: discord.Interaction, run: Dict, members: List[Dict]) -> None:
+        """Run an audit, showing results in a paginator that extends itself as members finish.
         
-        for member in members:
-            if member.get("alliance_position", "") != "APPLICANT":
-                if type == "activity":
-                    summary = "### The Following People Need To Log In"
-                    
-                    last_active_str = member.get("last_active", "1970-01-01T00:00:00+00:00")
+        The paginator is posted once its first page is full, or sooner if
+        that takes a while, and then edited at most every PROGRESS_INTERVAL
+        seconds with the new results and how many members are done. The
+        streaming view never times out, since an audit can outlast it; once
+        the audit finishes it is swapped for a normal paginator. A progress
+        edit that Discord rejects is skipped, and if the final edit fails the
+        results are posted to the channel instead.
+        """
+        paginator = ActivityPaginator([], timeout=None, progress=(0, 0))
+        message = None
+        started = last_edit = time.monotonic()
+        stream = self.stream_audit(run, members)
+        try:
+            async for done, total, result in stream:
+                if result is not None:
+                    paginator.add([result["report"]])
+                paginator.progress = (done, total)
+                now = time.monotonic()
+                if message is None:
+                    if len(paginator.results) >= paginator.items_per_page or now - started >= PROGRESS_INTERVAL:
+                        message = await interaction.followup.send(embed=paginator.get_embed(), view=paginator, wait=True)
+                        last_edit = now
+                elif now - last_edit >= PROGRESS_INTERVAL:
+                    last_edit = now
                     try:
-                        last_active_dt = datetime.fromisoformat(last_active_str.replace("Z", "+00:00"))
-                        last_active_unix = last_active_dt.timestamp()
-                        
-                        if (current_time - last_active_unix) >= one_day_seconds:
-                            nation_url = f"https://politicsandwar.com/nation/id={member['id']}"
-                            discord_username = member.get("discord", "N/A")
-                            result = (
-                                f"**Leader:** [{member['leader_name']}]({nation_url})\n"
-                                f"**Nation:** {member['nation_name']}\n"
-                                f"**Last Active:** <t:{int(last_active_unix)}:F>\n"
-                                f"**Defensive Wars:** {member['defensive_wars_count']}\n"
-                                f"**Discord:** {discord_username}"
-                            )
-                            audit_results.append(result)
-                            needers.append(f"@{member.get('discord','N/A')}")
-                    except ValueError:
-                        error(f"Error parsing last_active for {member['leader_name']}", tag="AUDIT")
-                        audit_results.append(f"Error parsing last_active for {member['leader_name']}")
-                
-                elif type == "warchest":
-                    summary = "### The Following People Need To Fix Their Warchests"
-                    
-                    if cities >= len(member.get("cities", [])):
-                        wc_result, _, wc_supply = calculate.warchest(member, vars.COSTS, vars.MILITARY_COSTS)
-                        if wc_result is None:
-                            audit_results.append(f"Error calculating warchest for {member['leader_name']}")
-                            continue
-                        
-                        nation_url = f"https://politicsandwar.com/nation/id={member['id']}"
-                        header = (
-                            f"**Leader:** [{member['leader_name']}]({nation_url})\n"
-                            f"**Nation:** {member['nation_name']}\n"
-                            f"**Discord:** {member.get('discord', 'N/A')}\n"
-                        )
-                        
-                        deficits = []
-                        if wc_result['money_deficit'] > 0.25 * wc_supply['money']:
-                            deficits.append(f"<:money:1357103044466184412> {wc_result['money_deficit']:,.2f}\n")
-                        if wc_result['coal_deficit'] > 0.25 * wc_supply['coal']:
-                            deficits.append(f"<:coal:1357102730682040410> {wc_result['coal_deficit']:,.2f}\n")
-                        if wc_result['oil_deficit'] > 0.25 * wc_supply['oil']:
-                            deficits.append(f"<:Oil:1357102740391854140> {wc_result['oil_deficit']:,.2f}\n")
-                        if wc_result['uranium_deficit'] > 0.25 * wc_supply['uranium']:
-                            deficits.append(f"<:uranium:1357102742799126558> {wc_result['uranium_deficit']:,.2f}\n")
-                        if wc_result['iron_deficit'] > 0.25 * wc_supply['iron']:
-                            deficits.append(f"<:iron:1357102735488581643> {wc_result['iron_deficit']:,.2f}\n")
-                        if wc_result['bauxite_deficit'] > 0.25 * wc_supply['bauxite']:
-                            deficits.append(f"<:bauxite:1357102729411039254> {wc_result['bauxite_deficit']:,.2f}\n")
-                        if wc_result['lead_deficit'] > 0.25 * wc_supply['lead']:
-                            deficits.append(f"<:lead:1357102736646209536> {wc_result['lead_deficit']:,.2f}\n")
-                        if wc_result['gasoline_deficit'] > 0.25 * wc_supply['gasoline']:
-                            deficits.append(f"<:gasoline:1357102734645399602> {wc_result['gasoline_deficit']:,.2f}\n")
-                        if wc_result['munitions_deficit'] > 0.25 * wc_supply['munitions']:
-                            deficits.append(f"<:munitions:1357102777389814012> {wc_result['munitions_deficit']:,.2f}\n")
-                        if wc_result['steel_deficit'] > 0.25 * wc_supply['steel']:
-                            deficits.append(f"<:steel:1357105344052072618> {wc_result['steel_deficit']:,.2f}\n")
-                        if wc_result['aluminum_deficit'] > 0.25 * wc_supply['aluminum']:
-                            deficits.append(f"<:aluminum:1357102728391819356> {wc_result['aluminum_deficit']:,.2f}\n")
-                        if wc_result['food_deficit'] > 0.25 * wc_supply['food']:
-                            deficits.append(f"<:food:1357102733571784735> {wc_result['food_deficit']:,.2f}\n")
-                        if wc_result['credits_deficit'] > 10:
-                            deficits.append(f"<:credits:1357102732187537459> {wc_result['credits_deficit']:,.2f}")
-                        
-                        if deficits:
-                            deficits_str = "".join(deficits)
-                            needers.append(f"@{member.get('discord','N/A')}")
-                        else:
-                            deficits_str = "**All Good!** No deficits found."
-                        
-                        result = header + f"**Warchest Deficits:**\n{deficits_str}"
-                        audit_results.append(result)
-                
-                elif type == "spies":
-                    summary = "### The Following People Need To Train More Spies"
-                    
-                    # Get nation data to check for Intelligence Agency project
-                    nation_id = int(member['id'])
-                    nation_data = get_data.GET_NATION_DATA(nation_id, self.config.API_KEY)
-                    
-                    # Check if nation has Intelligence Agency project
-                    has_intel_agency = any(project.get('name') == 'Intelligence Agency' for project in nation_data.get('projects', []))
-                    required_spies = 60 if has_intel_agency else 50
-                    
-                    # Check if nation has enough spies
-                    if member.get("spies", 0) < required_spies:
-                        nation_url = f"https://politicsandwar.com/nation/id={member['id']}"
-                        result = (
-                            f"**Leader:** [{member['leader_name']}]({nation_url})\n"
-                            f"**Nation:** {member['nation_name']}\n"
-                            f"**Discord:** {member.get('discord', 'N/A')}\n\n"
-                            f"**Current Spies:** {member.get('spies', 0)}\n"
-                            f"**Required Spies:** {required_spies}\n"
-                            f"**Has Intelligence Agency:** {'Yes' if has_intel_agency else 'No'}"
-                        )
-                        audit_results.append(result)
-                        needers.append(f"@{member.get('discord','N/A')}")
-                
-                elif type == "mmr":
-                    summary = "### The Following People Need To Fix Their MMR"
-                    
-                    # Get city data for MMR check
-                    nation_id = int(member['id'])  # Convert to integer
-                    cities = get_data.GET_CITY_DATA(nation_id, self.config.API_KEY)
-                    if not cities:
-                        audit_results.append(f"Error fetching city data for {member['leader_name']}")
-                        continue
-                    
-                    # Determine role based on city count
-                    role = "Whale" if len(cities) >= 15 else "Raider"
-                    
-                    # Check MMR requirements
-                    mmr_violations = []
-                    for city in cities:
-                        mmr_status = self.check_city_mmr(city, role)
-                        if not all(mmr_status.values()):
-                            city_name = city.get("name", "Unknown")
-                            missing = []
-                            if not mmr_status["barracks"]:
-                                missing.append(f"Barracks: {city.get('barracks', 0)}/{self.mmr_requirements[role]['barracks']}")
-                            if not mmr_status["factory"]:
-                                missing.append(f"Factory: {city.get('factory', 0)}/{self.mmr_requirements[role]['factory']}")
-                            if not mmr_status["hangar"]:
-                                missing.append(f"Hangar: {city.get('hangar', 0)}/{self.mmr_requirements[role]['hangar']}")
-                            if not mmr_status["drydock"]:
-                                missing.append(f"Drydock: {city.get('drydock', 0)}/{self.mmr_requirements[role]['drydock']}")
-                            mmr_violations.append(f"{city_name}: {', '.join(missing)}")
-                    
-                    if mmr_violations:
-                        nation_url = f"https://politicsandwar.com/nation/id={nation_id}"
-                        result = (
-                            f"**Leader:** [{member['leader_name']}]({nation_url})\n"
-                            f"**Nation:** {member['nation_name']}\n"
-                            f"**Role:** {role}\n"
-                            f"**Discord:** {member.get('discord', 'N/A')}\n\n"
-                            + "\n".join(mmr_violations)
-                        )
-                        audit_results.append(result)
-                        needers.append(f"@{member.get('discord','N/A')}")
-                
-                elif type == "deposit":
-                    summary = "### The Following People Need To Deposit Resources"
-                    
-                    # Only check nations with city count <= specified limit
-                    if cities >= len(member.get("cities", [])):
-                        excess = self.check_deposit_excess(member)
-                        if excess:
-                            nation_url = f"https://politicsandwar.com/nation/id={member['id']}"
-                            result = (
-                                f"**Leader:** [{member['leader_name']}]({nation_url})\n"
-                                f"**Nation:** {member['nation_name']}\n"
-                                f"**Discord:** {member.get('discord', 'N/A')}\n\n"
-                                f"**Excess Resources:**\n" + "\n".join(excess)
-                            )
-                            audit_results.append(result)
-                            needers.append(f"@{member.get('discord','N/A')}")
-        
-        # Use paginator to display results
-        paginator = ActivityPaginator(audit_results)
-        await interaction.followup.send(embed=paginator.get_embed(), view=paginator)
+                        await message.edit(embed=paginator.get_embed(), view=paginator)
+                    except discord.HTTPException as e:
+                        warning(f"Skipped an audit progress update: {e}", tag="AUDIT")
+        finally:
+            # Cancel the member checks still running if the audit stops early
+            await stream.aclose()
+            paginator.stop()
         
-        await interaction.followup.send(
-            f"```{summary}\n" + f"{needers or ['No Violators!']}```".replace("'", "").replace("[", "").replace("]", "").replace(",", "")
-        )
+        # Show the finished audit in a view that times out like any other
+        current_page = paginator.current_page
+        paginator = ActivityPaginator(paginator.results)
+        paginator.current_page = min(current_page, len(paginator.pages) - 1)
+        if message is None:
+            await interaction.followup.send(embed=paginator.get_embed(), view=paginator)
+            return
+        try:
+            await message.edit(embed=paginator.get_embed(), view=paginator)
+        except discord.HTTPException as e:
+            # The interaction token expires after 15 minutes, but the channel still works
+            warning(f"Could not update the audit message, posting the results instead: {e}", tag="AUDIT")
+            await interaction.channel.send(embed=paginator.get_embed(), view=paginator)
+    
+    def run_status(self, run: Dict, previous: Optional[Dict]) -> str:
+        """Describe when a run happened and who changed since the run before it."""
+        def leaders(names: List[str]) -> str:
+            shown = ", ".join(names[:20])
+            return f"{shown} and {len(names) - 20} more" if len(names) > 20 else shown
         
-        info(f"Audit completed for {len(members)} members of alliance: {self.config.ALLIANCE_ID}", tag="AUDIT")
+        status = f"**Results from <t:{int(run['ran_at'])}:R>** ({run['members']} members)"
+        if previous is not None:
+            flagged, resolved = diff(previous, run)
+            changes = []
+            if flagged:
+                changes.append(f"{len(flagged)} newly flagged: {leaders(flagged)}")
+            if resolved:
+                changes.append(f"{len(resolved)} resolved: {leaders(resolved)}")
+            status += f"\n**Since <t:{int(previous['ran_at'])}:R>:** " + ("; ".join(changes) or "No changes")
+        return status
     
     @app_commands.command(name="audit_member", description="Audit a specific alliance member for all requirements.")
     @app_commands.describe(nation_id="The ID of the nation to audit.")
@@ -447,7 +555,17 @@ class AuditCog(commands.Cog):
         await interaction.response.defer()
         
         # Get alliance members
-        members = get_data.GET_ALLIANCE_MEMBERS(self.config.ALLIANCE_ID, self.config.API_KEY)
+        members = await get_data.GET_ALLIANCE_MEMBERS(self.config.ALLIANCE_ID, self.config.API_KEY)
+        if members is None:
+            await interaction.followup.send(
+                embed=create_embed(
+                    title=":warning: Error Fetching Alliance Members",
+                    description="Failed to fetch alliance members. Please try again later.",
+                    color=discord.Color.red()
+                ),
+                ephemeral=True
+            )
+            return
         
         # Find the specific member
         member = next((m for m in members if int(m['id']) == nation_id), None)
@@ -455,24 +573,24 @@ class AuditCog(commands.Cog):
             await interaction.followup.send("Nation not found in alliance.", ephemeral=True)
             return
         
-        audit_results = []
-        needers = []
-        
-        # Perform all audits on the member
-        await self.perform_member_audit(member, audit_results, needers)
-        
-        if not audit_results:
+        # Run every check the way /audit type:all does, with no city limit
+        state = {
+            "cities": len(member.get("cities", [])),
+            "batch": {},
+            "warchests": {nation_id: calculate.warchest(member, vars.COSTS, vars.MILITARY_COSTS)},
+            "semaphore": asyncio.Semaphore(self.config.AUDIT_CONCURRENCY),
+        }
+        check = await self.check_member("all", member, state)
+        if check is None:
             await interaction.followup.send("No issues found for this nation.", ephemeral=True)
             return
         
         # Use paginator to display results
-        paginator = ActivityPaginator(audit_results)
+        paginator = ActivityPaginator([check[0]])
         await interaction.followup.send(embed=paginator.get_embed(), view=paginator)
-        
-        if needers:
-            await interaction.followup.send(
-                f"```The Following Issues Need Attention:\n{needers[0]}```"
-            )
+        await interaction.followup.send(
+            f"```The Following Issues Need Attention:\n@{member.get('discord', 'N/A')}```"
+        )
         
         info(f"Member audit completed for nation {nation_id} by {interaction.user}", tag="AUDIT")
 
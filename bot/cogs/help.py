@@ -93,6 +93,12 @@ class HelpCog(commands.Cog):
   - List of active wars
   - Basic war information
   - War status and control
+
+`/purge` - Find purple nations within your war range
+- **Parameters:**
+  - `nation_id` - Optional nation ID to search from (defaults to your registered nation)
+- **Shows:**
+  - Purple nations you can declare on, excluding beige nations and full defensive slots
 """)
         
         if category in ["all", "military"]:
@@ -114,6 +120,12 @@ class HelpCog(commands.Cog):
   - Required MMR based on city count
   - Current MMR status
   - Missing buildings
+
+`/counters` - Find alliance members that can declare on a nation
+- **Parameters:**
+  - `nation_id` - Nation ID to counter
+- **Shows:**
+  - Members in range with a free offensive slot, strongest air force first
 """)
         
         if category in ["all", "bank"]:
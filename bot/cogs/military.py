@@ -5,11 +5,14 @@ from datetime import datetime, timezone
 from typing import Dict, List, Optional
 
 from bot.utils.config import config
-from bot.utils.helpers import create_embed, format_number
+from bot.utils.helpers import create_embed, format_number, format_age
 from bot.utils.paginator import GridPaginator, PaginatorView
 from bot.handler import info, error, warning
 from bot import data as get_data
 from bot import vars as vars
+from bot.snapshot import snapshot, summarize
+from bot.score_index import ScoreIndex
+from bot.models import CityTable
 
 class MilitaryCog(commands.Cog):
     """Cog for military-related commands."""
@@ -34,23 +37,14 @@ class MilitaryCog(commands.Cog):
             }
         }
     
-    def calculate_military_capacity(self, cities: List[Dict]) -> Dict[str, int]:
+    def calculate_military_capacity(self, cities: CityTable) -> Dict[str, int]:
         """Calculate total military capacity from cities and research."""
-        capacity = {
-            "soldiers": 0,
-            "tanks": 0,
-            "aircraft": 0,
-            "ships": 0
+        return {
+            "soldiers": cities.total("barracks") * 3000,
+            "tanks": cities.total("factory") * 250,
+            "aircraft": cities.total("hangar") * 15,
+            "ships": cities.total("drydock") * 5
         }
-        
-        # Calculate from cities
-        for city in cities:
-            capacity["soldiers"] += city.get("barracks", 0) * 3000
-            capacity["tanks"] += city.get("factory", 0) * 250
-            capacity["aircraft"] += city.get("hangar", 0) * 15
-            capacity["ships"] += city.get("drydock", 0) * 5
-        
-        return capacity
     
     def calculate_military_usage(self, nation: Dict) -> Dict[str, int]:
         """Get current military usage."""
@@ -124,26 +118,25 @@ class MilitaryCog(commands.Cog):
                     else:
                         await ctx.send(msg)
                     return
-            nation = get_data.GET_NATION_DATA(nation_id, self.config.API_KEY)
+            nation, cached_at = await get_data.GET_NATION_DATA_CACHED(nation_id, self.config.API_KEY, "military")
             if not nation:
                 if interaction:
                     await interaction.followup.send("Nation not found.", ephemeral=True)
                 else:
                     await ctx.send("Nation not found.")
                 return
-            cities = get_data.GET_CITY_DATA(nation_id, self.config.API_KEY)
+            cities = await get_data.GET_CITY_DATA(nation_id, self.config.API_KEY)
             if not cities:
                 if interaction:
                     await interaction.followup.send("Could not fetch city data.", ephemeral=True)
                 else:
                     await ctx.send("Could not fetch city data.")
                 return
+            cities = CityTable(cities)
             capacity = self.calculate_military_capacity(cities)
             usage = self.calculate_military_usage(nation)
             city_links = []
-            for city in cities:
-                city_id = city.get("id")
-                city_name = city.get("name", "Unknown")
+            for city_id, city_name in zip(cities.ids.tolist(), cities.names):
                 if city_id:
                     city_links.append(f"[{city_name}](https://politicsandwar.com/city/id={city_id})")
             embed = create_embed(
@@ -178,7 +171,8 @@ class MilitaryCog(commands.Cog):
                         ),
                         "inline": True
                     }
-                ]
+                ],
+                footer=f"Data fetched {format_age(cached_at)}"
             )
             if interaction:
                 await interaction.followup.send(embed=embed)
@@ -217,14 +211,14 @@ class MilitaryCog(commands.Cog):
                     else:
                         await ctx.send(msg)
                     return
-            nation = get_data.GET_NATION_DATA(nation_id, self.config.API_KEY)
+            nation, cached_at = await get_data.GET_NATION_DATA_CACHED(nation_id, self.config.API_KEY, "mmr")
             if not nation:
                 if interaction:
                     await interaction.followup.send("Nation not found.", ephemeral=True)
                 else:
                     await ctx.send("Nation not found.")
                 return
-            cities = get_data.GET_CITY_DATA(nation_id, self.config.API_KEY)
+            cities = await get_data.GET_CITY_DATA(nation_id, self.config.API_KEY)
             if not cities:
                 if interaction:
                     await interaction.followup.send("Could not fetch city data.", ephemeral=True)
@@ -270,6 +264,93 @@ class MilitaryCog(commands.Cog):
     async def mmr_prefix(self, ctx, nation_id: int = None):
         await self.mmr_logic(None, nation_id, ctx=ctx)
 
+    async def counters_logic(self, interaction, nation_id: int, ctx=None):
+        """Find alliance members that can declare war on a nation."""
+        try:
+            if interaction:
+                await interaction.response.defer()
+            target, cached_at = await get_data.GET_NATION_DATA_CACHED(nation_id, self.config.API_KEY, "counters")
+            if not target:
+                if interaction:
+                    await interaction.followup.send("Nation not found.", ephemeral=True)
+                else:
+                    await ctx.send("Nation not found.")
+                return
+
+            # Members in range with a free offensive slot, strongest air force first, from the snapshot when it is fresh
+            alliance_id = int(self.config.ALLIANCE_ID)
+            if snapshot.is_fresh(self.config.SNAPSHOT_MAX_AGE_MINUTES * 60):
+                index = snapshot.index
+                source = f"Snapshot refreshed {format_age(snapshot.updated_at)}"
+            else:
+                nations = await get_data.GET_ALLIANCE_NATIONS(self.config.API_KEY, alliance_id)
+                if nations is None:
+                    msg = "Could not fetch alliance members. Please try again later."
+                    if interaction:
+                        await interaction.followup.send(msg, ephemeral=True)
+                    else:
+                        await ctx.send(msg)
+                    return
+                index = ScoreIndex(summarize(nation) for nation in nations)
+                source = "Fetched live"
+            members = index.can_declare_on(float(target.get('score', 0)), alliance_id=alliance_id)
+            counters = [
+                member for member in members
+                if member['offensive_wars_count'] < vars.MAX_OFFENSIVE_WARS
+                and member['alliance_position'] != "APPLICANT"
+            ]
+            counters.sort(key=lambda member: (member['aircraft'], member['tanks'], member['soldiers']), reverse=True)
+
+            if not counters:
+                msg = "No alliance members can declare on this nation right now."
+                if interaction:
+                    await interaction.followup.send(msg, ephemeral=True)
+                else:
+                    await ctx.send(msg)
+                return
+
+            output = []
+            for member in counters[:10]:
+                output.append(
+                    f"**[{member['nation_name']}](https://politicsandwar.com/nation/id={member['id']})** "
+                    f"({member['leader_name']})\n"
+                    f"Score: {member['score']:.2f} | Cities: {member['num_cities']} | "
+                    f"Slots: {vars.MAX_OFFENSIVE_WARS - member['offensive_wars_count']}\n"
+                    f"Military: 🪖{format_number(member['soldiers'])} "
+                    f"🚜{format_number(member['tanks'])} "
+                    f"✈️{format_number(member['aircraft'])} "
+                    f"🚢{format_number(member['ships'])}"
+                )
+            embed = create_embed(
+                title=f"Counters for {target.get('nation_name', 'Unknown')} ({float(target.get('score', 0)):.2f})",
+                description="\n\n".join(output),
+                color=discord.Color.red(),
+                footer=f"{len(counters)} members in range • {source}"
+            )
+            if interaction:
+                await interaction.followup.send(embed=embed)
+            else:
+                await ctx.send(embed=embed)
+            info(f"Counters command executed for nation {nation_id} by {interaction.user if interaction else ctx.author}", tag="COUNTERS")
+        except Exception as e:
+            error(f"Error in counters command: {e}", tag="COUNTERS")
+            msg = "An error occurred while finding counters."
+            if interaction and interaction.response.is_done():
+                await interaction.followup.send(msg, ephemeral=True)
+            elif interaction:
+                await interaction.response.send_message(msg, ephemeral=True)
+            else:
+                await ctx.send(msg)
+
+    @app_commands.command(name="counters", description="Find alliance members that can declare war on a nation.")
+    @app_commands.describe(nation_id="The ID of the nation to counter")
+    async def counters(self, interaction: discord.Interaction, nation_id: int):
+        await self.counters_logic(interaction, nation_id)
+
+    @commands.command(name="counters")
+    async def counters_prefix(self, ctx, nation_id: int):
+        await self.counters_logic(None, nation_id, ctx=ctx)
+
 async def setup(bot: commands.Bot):
     """Set up the military cog."""
     await bot.add_cog(MilitaryCog(bot)) 
\ No newline at end of file
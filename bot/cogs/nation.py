@@ -4,14 +4,24 @@ from discord.ext import commands
 from datetime import datetime, timezone
 import math
 import json
+import time
 from typing import Optional
 
+import numpy as np
+
 from bot.utils.config import config
-from bot.utils.helpers import create_embed, format_number
-from bot.handler import info, error, warning
+from bot.utils.helpers import create_embed, format_number, format_age
+from bot.handler import info, error, warning, debug
 from bot import data as get_data
 from bot import calculate
 from bot import vars as vars
+from bot.snapshot import snapshot, summarize
+from bot.raids import TopTargets, stream_top_targets
+from bot.models import CityTable
+from bot.ledger import ledger
+from bot.api import APIError
+from bot import economics
+from bot.plans import plan_memo, make_setup, setup_age, slot_infra
 
 class NationCog(commands.Cog):
     """Cog for nation-related commands."""
@@ -46,7 +56,7 @@ class NationCog(commands.Cog):
                     else:
                         await ctx.send(msg)
                     return
-            nation_info = get_data.GET_NATION_DATA(nation_id, self.config.API_KEY)
+            nation_info, cached_at = await get_data.GET_NATION_DATA_CACHED(nation_id, self.config.API_KEY, "warchest")
             info(f"Starting Warchest Calculation For: {nation_info.get('nation_name', 'N/A')} || https://politicsandwar.com/nation/id={nation_id} || By {interaction.user if interaction else ctx.author} In {interaction.channel if interaction else ctx.channel}")
             result, excess, _ = calculate.warchest(nation_info, vars.COSTS, vars.MILITARY_COSTS)
             if result is None:
@@ -87,7 +97,7 @@ class NationCog(commands.Cog):
                 fields=[
                     {"name": "Required On-Hand", "value": txt, "inline": False},
                 ],
-                footer="Maintained By Ivy"
+                footer=f"Maintained By Ivy • Data fetched {format_age(cached_at)}"
             )
             if deposit_url:
                 embed.add_field(name="", value=f"[Deposit Excess]({deposit_url})", inline=False)
@@ -122,7 +132,18 @@ class NationCog(commands.Cog):
     @app_commands.describe(nation_id="Nation ID to check.")
     async def bank(self, interaction: discord.Interaction, nation_id: int):
         """Check the bank balance of a nation."""
-        nation = get_data.GET_NATION_DATA(nation_id, self.config.API_KEY)
+        # Only records newer than the ledger's cursor for this nation are fetched
+        try:
+            nation, account, fetched = await ledger.sync(nation_id, self.config.API_KEY)
+        except APIError as e:
+            error(f"Error fetching bank records for nation ID {nation_id}: {e}", tag="BANK")
+            await interaction.response.send_message(
+                "Failed to fetch bank records from the API. Please try again later.", ephemeral=True
+            )
+            return
+        if not nation:
+            await interaction.response.send_message("Nation not found.", ephemeral=True)
+            return
         nation_name = nation.get("nation_name", "N/A")
         alliance = nation.get("alliance", {})
         alliance_name = alliance.get("name", "None")
@@ -135,7 +156,7 @@ class NationCog(commands.Cog):
             f"{'-'*85}\n"
         )
         
-        bank_balance = nation.get("bank_balance", {})
+        bank_balance = ledger.balance(account)
         bank_text = "\n".join([f"{key}: {value}" for key, value in bank_balance.items() if value > 0])
         
         if not bank_text:
@@ -147,7 +168,8 @@ class NationCog(commands.Cog):
         await interaction.response.send_message(
             embed=create_embed(
                 description=output,
-                color=discord.Color.purple()
+                color=discord.Color.purple(),
+                footer=f"Ledger: {account['records']:,} records, {fetched:,} new | Data fetched {format_age(account['updated_at'])}"
             )
         )
     
@@ -167,7 +189,7 @@ class NationCog(commands.Cog):
                     else:
                         await ctx.send(msg)
                     return
-            nation = get_data.GET_NATION_DATA(nation_id, self.config.API_KEY)
+            nation, cached_at = await get_data.GET_NATION_DATA_CACHED(nation_id, self.config.API_KEY, "wars")
             nation_name = nation.get("nation_name", "N/A")
             alliance = nation.get("alliance", {})
             alliance_name = alliance.get("name", "None")
@@ -246,7 +268,7 @@ class NationCog(commands.Cog):
                 return "\n".join(lines)
             off_text = build_section(offensive_wars, True, "Offensive Wars")
             def_text = build_section(defensive_wars, False, "Defensive Wars")
-            output = header_info + "\n" + off_text + "\n\n" + def_text
+            output = header_info + "\n" + off_text + "\n\n" + def_text + f"\n\nData fetched {format_age(cached_at)}"
             output = "\n" + output + "\n"
             if interaction:
                 await interaction.response.send_message(f"```\n{output}\n```")
@@ -343,7 +365,7 @@ class NationCog(commands.Cog):
                         await ctx.send(embed=msg_embed)
                     return
             # Get nation data
-            nation = get_data.GET_NATION_DATA(nation_id, self.config.API_KEY)
+            nation, cached_at = await get_data.GET_NATION_DATA_CACHED(nation_id, self.config.API_KEY, "who")
             if not nation:
                 if interaction:
                     await interaction.followup.send("Nation not found.", ephemeral=True)
@@ -351,45 +373,20 @@ class NationCog(commands.Cog):
                     await ctx.send("Nation not found.")
                 return
             # Get city data
-            cities = get_data.GET_CITY_DATA(nation_id, self.config.API_KEY)
+            cities = await get_data.GET_CITY_DATA(nation_id, self.config.API_KEY)
             if not cities:
                 if interaction:
                     await interaction.followup.send("Could not fetch city data.", ephemeral=True)
                 else:
                     await ctx.send("Could not fetch city data.")
                 return
+            cities = CityTable(cities)
             # Calculate total infrastructure and land
-            total_infra = sum(city.get('infrastructure', 0) for city in cities)
-            total_land = sum(city.get('land', 0) for city in cities)
-            # Get continent resources
-            continent = nation.get('continent', '').lower()
-            continent_resources = {
-                'africa': {'oil': 3, 'bauxite': 3, 'uranium': 3},
-                'antarctica': {'oil': 3, 'coal': 3, 'uranium': 3},
-                'asia': {'oil': 3, 'iron': 3, 'uranium': 3},
-                'australia': {'coal': 3, 'bauxite': 3, 'lead': 3},
-                'europe': {'coal': 3, 'iron': 3, 'lead': 3},
-                'north america': {'coal': 3, 'iron': 3, 'uranium': 3},
-                'south america': {'oil': 3, 'bauxite': 3, 'lead': 3}
-            }
-            # Calculate resource production from buildings and continent
-            resource_production = {
-                'coal': sum(city.get('coal_mine', 0) * 3 for city in cities),
-                'oil': sum(city.get('oil_refinery', 0) * 3 for city in cities),
-                'uranium': sum(city.get('uranium_mine', 0) * 3 for city in cities),
-                'iron': sum(city.get('iron_mine', 0) * 3 for city in cities),
-                'bauxite': sum(city.get('bauxite_mine', 0) * 3 for city in cities),
-                'lead': sum(city.get('lead_mine', 0) * 3 for city in cities),
-                'gasoline': sum(city.get('oil_refinery', 0) * 6 for city in cities),
-                'munitions': sum(city.get('munitions_factory', 0) * 18 for city in cities),
-                'steel': sum(city.get('steel_mill', 0) * 9 for city in cities),
-                'aluminum': sum(city.get('aluminum_refinery', 0) * 9 for city in cities),
-                'food': sum(city.get('farm', 0) * (city.get('land', 0) / 500) for city in cities)
-            }
-            # Add continent resource production
-            if continent in continent_resources:
-                for resource, amount in continent_resources[continent].items():
-                    resource_production[resource] += amount * len(cities)
+            total_infra = cities.total('infrastructure')
+            total_land = cities.total('land')
+            # Calculate resource production from buildings and projects
+            economy = economics.evaluate(cities, economics.projects_of(nation))
+            resource_production = economics.totals(economy)
             # Get top 3 resource productions
             top_resources = sorted(resource_production.items(), key=lambda x: x[1], reverse=True)[:3]
             # Get color block based on color
@@ -444,6 +441,7 @@ class NationCog(commands.Cog):
                 title=f"Nation Information",
                 description="\n".join(nation_info),
                 color=discord.Color.blue(),
+                footer=f"Data fetched {format_age(cached_at)}"
             )
             if nation.get('flag'):
                 embed.set_thumbnail(url=nation['flag'])
@@ -505,60 +503,40 @@ class NationCog(commands.Cog):
                     return
             
             # Get nation data
-            nation = get_data.GET_NATION_DATA(nation_id, self.config.API_KEY)
+            nation, cached_at = await get_data.GET_NATION_DATA_CACHED(nation_id, self.config.API_KEY, "income")
             if not nation:
                 await interaction.followup.send("Nation not found.", ephemeral=True)
                 return
             
             # Get city data
-            cities = get_data.GET_CITY_DATA(nation_id, self.config.API_KEY)
+            cities = await get_data.GET_CITY_DATA(nation_id, self.config.API_KEY)
             if not cities:
                 await interaction.followup.send("Could not fetch city data.", ephemeral=True)
                 return
             
+            cities = CityTable(cities)
+            
             # Calculate total infrastructure and land
-            total_infra = sum(city.get('infrastructure', 0) for city in cities)
-            total_land = sum(city.get('land', 0) for city in cities)
+            total_infra = cities.total('infrastructure')
+            total_land = cities.total('land')
             
-            # Calculate resource production from buildings
-            resource_production = {
-                'coal': sum(city.get('coal_mine', 0) * 3 for city in cities),  # 3 per day per mine
-                'oil': sum(city.get('oil_refinery', 0) * 3 for city in cities),  # 3 per day per refinery
-                'uranium': sum(city.get('uranium_mine', 0) * 3 for city in cities),  # 3 per day per mine
-                'iron': sum(city.get('iron_mine', 0) * 3 for city in cities),  # 3 per day per mine
-                'bauxite': sum(city.get('bauxite_mine', 0) * 3 for city in cities),  # 3 per day per mine
-                'lead': sum(city.get('lead_mine', 0) * 3 for city in cities),  # 3 per day per mine
-                'gasoline': sum(city.get('oil_refinery', 0) * 6 for city in cities),  # 6 per day per refinery
-                'munitions': sum(city.get('munitions_factory', 0) * 18 for city in cities),  # 18 per day per factory
-                'steel': sum(city.get('steel_mill', 0) * 9 for city in cities),  # 9 per day per mill
-                'aluminum': sum(city.get('aluminum_refinery', 0) * 9 for city in cities),  # 9 per day per refinery
-                'food': sum(city.get('farm', 0) * (city.get('land', 0) / 500) for city in cities)  # Land/500 per farm
-            }
+            # Calculate commerce, civil stats and resource production for every city
+            economy = economics.evaluate(cities, economics.projects_of(nation))
+            resource_production = economics.totals(economy)
             
             # Calculate commerce income
-            commerce_income = 0
-            commerce_bonus = 0
+            # Base commerce income is $2 per infrastructure
+            base_income = cities.infrastructure * 2
             
-            for city in cities:
-                infra = city.get('infrastructure', 0)
-                # Base commerce income is $2 per infrastructure
-                base_income = infra * 2
-                
-                # Calculate improvement bonuses
-                improvement_bonus = (
-                    city.get('supermarket', 0) * 0.03 +  # +3% per supermarket
-                    city.get('bank', 0) * 0.05 +        # +5% per bank
-                    city.get('shopping_mall', 0) * 0.09 +  # +9% per mall
-                    city.get('stadium', 0) * 0.12 +     # +12% per stadium
-                    city.get('subway', 0) * 0.08        # +8% per subway
-                )
-                
-                # Add city's commerce income with its bonuses
-                commerce_income += base_income * (1 + improvement_bonus)
-                commerce_bonus += improvement_bonus
+            # Add each city's commerce income with its capped commerce bonus
+            improvement_bonus = economy['commerce'] / 100
+            commerce_income = float((base_income * (1 + improvement_bonus)).sum())
             
-            # Calculate average commerce bonus
-            avg_commerce_bonus = commerce_bonus / len(cities) if cities else 0
+            # Calculate average commerce bonus and civil stats
+            avg_commerce_bonus = float(improvement_bonus.mean()) if len(cities) else 0
+            avg_disease = float(economy['disease'].mean()) if len(cities) else 0
+            avg_crime = float(economy['crime'].mean()) if len(cities) else 0
+            avg_pollution = float(economy['pollution'].mean()) if len(cities) else 0
             
             # Format economic info
             economic_info = [
@@ -572,6 +550,9 @@ class NationCog(commands.Cog):
                 f"<:money:1357103044466184412> Average Commerce Bonus: +{avg_commerce_bonus*100:.1f}%",
                 f"<:money:1357103044466184412> Total Commerce: ${format_number(commerce_income)}/day",
                 "",
+                f"**City Averages:**",
+                f"Disease: {avg_disease:.2f}% | Crime: {avg_crime:.2f}% | Pollution: {avg_pollution:,.0f}",
+                "",
                 f"**Resource Production:**",
                 f"<:coal:1357102730682040410> Coal: {format_number(resource_production['coal'])}/day",
                 f"<:Oil:1357102740391854140> Oil: {format_number(resource_production['oil'])}/day",
@@ -590,7 +571,8 @@ class NationCog(commands.Cog):
             embed = create_embed(
                 title=f"Economic Information",
                 description="\n".join(economic_info),
-                color=discord.Color.green()
+                color=discord.Color.green(),
+                footer=f"Data fetched {format_age(cached_at)}"
             )
             
             await interaction.followup.send(embed=embed)
@@ -644,78 +626,25 @@ class NationCog(commands.Cog):
                     ephemeral=True
                 )
                 return
-        nation = get_data.GET_NATION_DATA(nation_id, self.config.API_KEY)
+        nation, cached_at = await get_data.GET_NATION_DATA_CACHED(nation_id, self.config.API_KEY, "build")
         if not nation:
             await interaction.followup.send("Nation not found.", ephemeral=True)
             return
-        cities = get_data.GET_CITY_DATA(nation_id, self.config.API_KEY)
+        cities = await get_data.GET_CITY_DATA(nation_id, self.config.API_KEY)
         if not cities:
             await interaction.followup.send("Could not fetch city data.", ephemeral=True)
             return
 
-        # --- Define infra and land from the first city ---
-        infra = cities[0].get('infrastructure', 0)
-        land = cities[0].get('land', 0)
-
-        # --- Now parse projects, set variables, and define helper functions as before ---
-        projects = nation.get('projects', [])
-        project_names = [ (p.get('name') or '').lower() for p in projects ]
-        has_gt = 'green technologies' in project_names
-        has_mass_irrigation = 'mass irrigation' in project_names
-        has_recycling_initiative = 'recycling initiative' in project_names
-        has_itc = 'international trade center' in project_names
-        has_telecom = 'telecommunications satellite' in project_names
-        has_police_training = 'specialized police training program' in project_names
-        has_clinical_research = 'clinical research center' in project_names
-        # Resource/Manufacturing boosters (for output, not slot allocation)
-        has_bauxiteworks = 'bauxiteworks' in project_names
-        has_ironworks = 'ironworks' in project_names
-        has_arms_stockpile = 'arms stockpile' in project_names
-        has_gas_reserve = 'emergency gasoline reserve' in project_names
-        has_uranium_enrichment = 'uranium enrichment program' in project_names
-
-        # --- Define police_effect and hospital_effect based on projects ---
-        police_effect = 3.5 if has_police_training else 2.5
-        hospital_effect = 3.5 if has_clinical_research else 2.5
-
-        # --- Define max_hospitals based on projects ---
-        max_hospitals = 6 if has_clinical_research else 5
-
-        # --- Define max_recycling based on projects ---
-        max_recycling = 4 if has_recycling_initiative else 3
-
-        # Set all relevant caps/bonuses and pollution variables before calc_pollution
-        farm_pollution = 1 if has_gt else 2
-        subway_pollution = 70 if has_gt else 45
-        recycling_pollution = 75 if has_recycling_initiative else 70
-        manuf_pollution_mult = 0.75 if has_gt else 1.0
-
-        # --- Pollution calculation helper and dependencies (move to top) ---
-        def calc_pollution(plan):
-            pollution = 0
-            pollution += plan.get('imp_coalpower', 0) * 8
-            pollution += plan.get('imp_oilpower', 0) * 6
-            pollution += plan.get('imp_coalmine', 0) * 12
-            pollution += plan.get('imp_ironmine', 0) * 12
-            pollution += plan.get('imp_uramine', 0) * 20
-            pollution += plan.get('imp_leadmine', 0) * 12
-            pollution += plan.get('imp_farm', 0) * farm_pollution
-            pollution += plan.get('imp_policestation', 0) * 1
-            pollution += plan.get('imp_hospital', 0) * 4
-            pollution += plan.get('imp_stadium', 0) * 5
-            pollution += plan.get('imp_mall', 0) * 2
-            pollution += int(plan.get('imp_gasrefinery', 0) * 32 * manuf_pollution_mult)
-            pollution += int(plan.get('imp_steelmill', 0) * 40 * manuf_pollution_mult)
-            pollution += int(plan.get('imp_aluminumrefinery', 0) * 40 * manuf_pollution_mult)
-            pollution += int(plan.get('imp_munitionsfactory', 0) * 32 * manuf_pollution_mult)
-            pollution -= plan.get('imp_subway', 0) * subway_pollution
-            pollution -= plan.get('imp_recyclingcenter', 0) * recycling_pollution
-            return pollution
+        # --- Plan around the first city's land and age ---
+        first_city = CityTable(cities[:1])
+        land = first_city.total('land')
+        age = float(economics.city_ages(first_city)[0])
+        projects = economics.projects_of(nation)
 
         try:
-            # Set default infra target to first city's infra if not specified
+            # Default to the first city's infra, rounded down to a whole improvement slot
             if infra_target is None and cities:
-                infra_target = cities[0].get('infrastructure', 2000)
+                infra_target = slot_infra(cities[0].get('infrastructure', 2000))
             
             # Define default military configurations
             default_military = {
@@ -736,269 +665,44 @@ class NationCog(commands.Cog):
                 mmr_type = 'raider'
             
             military_config = default_military.get(mmr_type, default_military['default'])
-            
-            # Get continent and determine natural resources
-            continent = nation.get('continent', '').lower()
-            continent_resources = {
-                'na': {'coal': 3, 'iron': 3, 'uranium': 3},
-                'sa': {'oil': 3, 'bauxite': 3, 'lead': 3},
-                'as': {'oil': 3, 'iron': 3, 'uranium': 3},
-                'an': {'oil': 3, 'coal': 3, 'uranium': 3},
-                'eu': {'coal': 3, 'iron': 3, 'lead': 3},
-                'af': {'oil': 3, 'bauxite': 3, 'uranium': 3},
-                'au': {'coal': 3, 'bauxite': 3, 'lead': 3}
+            military = {
+                "barracks": barracks if barracks is not None else military_config['barracks'],
+                "factory": factories if factories is not None else military_config['factories'],
+                "hangar": hangars if hangars is not None else military_config['hangars'],
+                "drydock": drydocks if drydocks is not None else military_config['drydocks']
             }
             
-            # Calculate improvements needed based on infrastructure
-            imp_total = infra_target // 50  # 1 improvement per 50 infrastructure
-            
-            # Initialize build plan and improvement counter
-            build_plan = {
-                "infra_needed": infra_target,
-                "imp_total": imp_total,
-                "imp_coalpower": 0,
-                "imp_oilpower": 0,
-                "imp_windpower": 0,
-                "imp_nuclearpower": 0,
-                "imp_coalmine": 0,
-                "imp_oilwell": 0,
-                "imp_uramine": 0,
-                "imp_leadmine": 0,
-                "imp_ironmine": 0,
-                "imp_bauxitemine": 0,
-                "imp_farm": 0,
-                "imp_gasrefinery": 0,
-                "imp_aluminumrefinery": 0,
-                "imp_munitionsfactory": 0,
-                "imp_steelmill": 0,
-                "imp_policestation": 0,
-                "imp_hospital": 0,
-                "imp_recyclingcenter": 0,
-                "imp_subway": 0,
-                "imp_supermarket": 0,
-                "imp_stadium": 0,
-                "imp_bank": 0,
-                "imp_mall": 0,
-                "imp_barracks": barracks if barracks is not None else military_config['barracks'],
-                "imp_factory": factories if factories is not None else military_config['factories'],
-                "imp_hangars": hangars if hangars is not None else military_config['hangars'],
-                "imp_drydock": drydocks if drydocks is not None else military_config['drydocks']
-            }
-            
-            # Track used improvements separately
-            used_improvements = 0
-            
-            # Validate military building counts
-            build_plan["imp_barracks"] = max(0, min(5, build_plan["imp_barracks"]))
-            build_plan["imp_factory"] = max(0, min(5, build_plan["imp_factory"]))
-            build_plan["imp_hangars"] = max(0, min(5, build_plan["imp_hangars"]))
-            build_plan["imp_drydock"] = max(0, min(3, build_plan["imp_drydock"]))
-            
-            # Add military improvements to used count
-            used_improvements += (
-                build_plan["imp_barracks"] +
-                build_plan["imp_factory"] +
-                build_plan["imp_hangars"] +
-                build_plan["imp_drydock"]
+            # Look up the plan with the best net revenue, solving it only if it was never saved
+            imp_total = int(infra_target // 50)  # 1 improvement per 50 infrastructure
+            setup = make_setup(land, nation.get('continent'), projects, military, age)
+            start = time.perf_counter()
+            solved, memoized = plan_memo.solve(infra_target, setup)
+            elapsed = (time.perf_counter() - start) * 1000
+            if solved is None:
+                await interaction.followup.send(
+                    f"{imp_total} improvement slots can't fit the power plants and military improvements.",
+                    ephemeral=True
+                )
+                return
+            buildings, revenue = solved
+            
+            # Output the plan in the in-game build JSON schema and order
+            build_plan = {"infra_needed": infra_target, "imp_total": imp_total}
+            build_plan.update((key, buildings[building]) for key, building in economics.PLAN_BUILDINGS.items())
+            economy = economics.evaluate(
+                economics.plan_table(build_plan, infra_target, setup['land']), projects,
+                ages=np.array([setup_age(setup)])
             )
-            
-            # Calculate required power and uranium
-            power_needed = (infra_target + 1999) // 2000  # Each power plant provides 2000 infra
-            uranium_needed = power_needed * 2  # 2 uranium mines needed per nuclear power plant
-            
-            # Power plants (always use nuclear)
-            build_plan["imp_nuclearpower"] = power_needed
-            used_improvements += power_needed
-            
-            # Calculate remaining improvements
-            remaining_imp = imp_total - used_improvements
-            
-            # --- Step 9: Calculate Commerce Improvements First ---
-            # Calculate commerce improvements with proper caps
-            max_commerce = 1.0  # 100% commerce cap
-            current_commerce = 0
-            
-            # Prioritize stadiums (12% commerce)
-            if current_commerce < max_commerce:
-                stadiums = min(remaining_imp, 3)  # Max 3 stadiums
-                stadium_bonus = stadiums * 0.12
-                if current_commerce + stadium_bonus > max_commerce:
-                    stadiums = int((max_commerce - current_commerce) / 0.12)
-                build_plan["imp_stadium"] = stadiums
-                remaining_imp -= stadiums
-                used_improvements += stadiums
-                current_commerce += stadium_bonus
-            
-            # Then malls (8% commerce)
-            if remaining_imp > 0 and current_commerce < max_commerce:
-                malls = min(remaining_imp, 4)  # Max 4 malls
-                mall_bonus = malls * 0.08
-                if current_commerce + mall_bonus > max_commerce:
-                    malls = int((max_commerce - current_commerce) / 0.08)
-                build_plan["imp_mall"] = malls
-                remaining_imp -= malls
-                used_improvements += malls
-                current_commerce += mall_bonus
-            
-            # Then banks (5% commerce)
-            if remaining_imp > 0 and current_commerce < max_commerce:
-                banks = min(remaining_imp, 5)  # Max 5 banks
-                bank_bonus = banks * 0.05
-                if current_commerce + bank_bonus > max_commerce:
-                    banks = int((max_commerce - current_commerce) / 0.05)
-                build_plan["imp_bank"] = banks
-                remaining_imp -= banks
-                used_improvements += banks
-                current_commerce += bank_bonus
-            
-            # Then supermarkets (3% commerce)
-            if remaining_imp > 0 and current_commerce < max_commerce:
-                markets = min(remaining_imp, 4)  # Max 4 supermarkets
-                market_bonus = markets * 0.03
-                if current_commerce + market_bonus > max_commerce:
-                    markets = int((max_commerce - current_commerce) / 0.03)
-                build_plan["imp_supermarket"] = markets
-                remaining_imp -= markets
-                used_improvements += markets
-                current_commerce += market_bonus
-            
-            # Then subways (8% commerce)
-            if remaining_imp > 0 and current_commerce < max_commerce:
-                subways = min(remaining_imp, 1)  # Max 1 subway
-                subway_bonus = subways * 0.08
-                if current_commerce + subway_bonus > max_commerce:
-                    subways = int((max_commerce - current_commerce) / 0.08)
-                build_plan["imp_subway"] = subways
-                remaining_imp -= subways
-                used_improvements += subways
-                current_commerce += subway_bonus
-
-            # --- Step 10: Fill with Raw Resources ---
-            # List of all possible raw resources in order of priority
-            raw_resources = []
-            for res in allowed_resources:
-                key = f'imp_{res}mine' if res != 'oil' else 'imp_oilwell'
-                raw_resources.append((key, resource_caps[res]))
-            
-            # Fill raw resources first
-            for key, cap in raw_resources:
-                while build_plan.get(key, 0) < cap and used_improvements < imp_total:
-                    build_plan[key] = build_plan.get(key, 0) + 1
-                    used_improvements += 1
-                    print(f"[DEBUG] Filling raw: {key} now {build_plan[key]}")
-                    
-                    # Check civil needs after each addition
-                    pollution = calc_pollution(build_plan)
-                    base_pop = infra * 100
-                    pop_density = base_pop / land if land else 0
-                    
-                    # Calculate disease with more accurate formula
-                    disease = ((((pop_density ** 2) * 0.01) - 25) / 100) + (base_pop / 100000) + (pollution * 0.05)
-                    hospital_mod = build_plan['imp_hospital'] * hospital_effect
-                    disease -= hospital_mod
-                    
-                    # Only add hospitals if disease > 5.0 (much higher threshold)
-                    while disease > 5.0 and build_plan['imp_hospital'] < max_hospitals and used_improvements < imp_total:
-                        build_plan['imp_hospital'] += 1
-                        used_improvements += 1
-                        print(f"[DEBUG] Adding hospital, now {build_plan['imp_hospital']}")
-                        hospital_mod = build_plan['imp_hospital'] * hospital_effect
-                        disease -= hospital_effect
-                    
-                    # Only add recycling if pollution > 200 (much higher threshold)
-                    while pollution > 200 and build_plan['imp_recyclingcenter'] < max_recycling and used_improvements < imp_total:
-                        build_plan['imp_recyclingcenter'] += 1
-                        used_improvements += 1
-                        print(f"[DEBUG] Adding recycling center, now {build_plan['imp_recyclingcenter']}")
-                        pollution = calc_pollution(build_plan)
-                    
-                    # Only add police if crime > 5.0 (much higher threshold)
-                    police_mod = build_plan['imp_policestation'] * police_effect
-                    crime = ((103 - (current_commerce * 100)) ** 2 + (infra * 100)) / 111111 - police_mod
-                    while crime > 5.0 and build_plan['imp_policestation'] < 5 and used_improvements < imp_total:
-                        build_plan['imp_policestation'] += 1
-                        used_improvements += 1
-                        print(f"[DEBUG] Adding police station, now {build_plan['imp_policestation']}")
-                        police_mod = build_plan['imp_policestation'] * police_effect
-                        crime = ((103 - (current_commerce * 100)) ** 2 + (infra * 100)) / 111111 - police_mod
-
-            # --- Step 11: Fill with Manufacturing if we have the raw resources ---
-            if used_improvements < imp_total:
-                # Prioritize manufacturing based on available raw resources
-                if build_plan["imp_oilwell"] == 10:  # If we have max oil wells
-                    refineries = min(remaining_imp, 5)
-                    build_plan["imp_gasrefinery"] = refineries
-                    remaining_imp -= refineries
-                    used_improvements += refineries
-                
-                if remaining_imp > 0 and build_plan["imp_ironmine"] == 10 and build_plan["imp_coalmine"] == 10:
-                    mills = min(remaining_imp, 5)
-                    build_plan["imp_steelmill"] = mills
-                    remaining_imp -= mills
-                    used_improvements += mills
-                
-                if remaining_imp > 0 and build_plan["imp_bauxitemine"] == 10:
-                    refineries = min(remaining_imp, 5)
-                    build_plan["imp_aluminumrefinery"] = refineries
-                    remaining_imp -= refineries
-                    used_improvements += refineries
-                
-                if remaining_imp > 0 and build_plan["imp_leadmine"] == 10:
-                    factories = min(remaining_imp, 5)
-                    build_plan["imp_munitionsfactory"] = factories
-                    remaining_imp -= factories
-                    used_improvements += factories
-
-            # --- Step 12: Output Build Plan in Exact Schema/Order ---
-            schema_keys = [
-                "infra_needed",
-                "imp_total",
-                "imp_coalpower",
-                "imp_oilpower",
-                "imp_windpower",
-                "imp_nuclearpower",
-                "imp_coalmine",
-                "imp_oilwell",
-                "imp_uramine",
-                "imp_leadmine",
-                "imp_ironmine",
-                "imp_bauxitemine",
-                "imp_farm",
-                "imp_gasrefinery",
-                "imp_aluminumrefinery",
-                "imp_munitionsfactory",
-                "imp_steelmill",
-                "imp_policestation",
-                "imp_hospital",
-                "imp_recyclingcenter",
-                "imp_subway",
-                "imp_supermarket",
-                "imp_stadium",
-                "imp_bank",
-                "imp_mall",
-                "imp_barracks",
-                "imp_factory",
-                "imp_hangars",
-                "imp_drydock"
-            ]
-            output_plan = {}
-            output_plan["infra_needed"] = infra_target
-            output_plan["imp_total"] = imp_total
-            for key in schema_keys[2:]:
-                output_plan[key] = build_plan.get(key, 0)
-            total_used = sum(output_plan.get(k, 0) for k in schema_keys[2:])
-            print(f"[DEBUG] Total improvement slots used: {total_used} / {imp_total}")
-            print(f"[DEBUG] Final build plan: {json.dumps(output_plan, indent=2)}")
-            build_plan = output_plan
+            debug(f"Build plan for nation {nation_id} {'found' if memoized else 'solved'} in {elapsed:,.1f}ms", tag="BUILD")
 
             # --- Always send a Discord message ---
             income_info = [
                 f"**Commerce Improvements:**",
-                f"Supermarkets: {build_plan['imp_supermarket']} (+{build_plan['imp_supermarket']*3}%)",
-                f"Banks: {build_plan['imp_bank']} (+{build_plan['imp_bank']*5}%)",
-                f"Shopping Malls: {build_plan['imp_mall']} (+{build_plan['imp_mall']*8}%)",
-                f"Stadiums: {build_plan['imp_stadium']} (+{build_plan['imp_stadium']*12}%)",
-                f"Subways: {build_plan['imp_subway']} (+{build_plan['imp_subway']*8}%)",
+                f"Supermarkets: {build_plan['imp_supermarket']} (+{build_plan['imp_supermarket']*economics.COMMERCE['supermarket']}%)",
+                f"Banks: {build_plan['imp_bank']} (+{build_plan['imp_bank']*economics.COMMERCE['bank']}%)",
+                f"Shopping Malls: {build_plan['imp_mall']} (+{build_plan['imp_mall']*economics.COMMERCE['shopping_mall']}%)",
+                f"Stadiums: {build_plan['imp_stadium']} (+{build_plan['imp_stadium']*economics.COMMERCE['stadium']}%)",
+                f"Subways: {build_plan['imp_subway']} (+{build_plan['imp_subway']*economics.COMMERCE['subway']}%)",
                 "",
                 f"**Resource Production:**"
             ]
@@ -1008,11 +712,20 @@ class NationCog(commands.Cog):
             for manu in ['imp_gasrefinery','imp_steelmill','imp_aluminumrefinery','imp_munitionsfactory']:
                 if build_plan[manu] > 0:
                     income_info.append(f"{manu.replace('imp_','').replace('refinery',' Refinery').replace('mill',' Mill').replace('factory',' Factory').title()}: {build_plan[manu]}")
-            income_info.extend(["", f"**MMR Type:** {mmr_type.upper() if isinstance(mmr_type, str) and mmr_type != 'default' else mmr_type}"])
+            income_info.extend([
+                "",
+                f"**City Stats:**",
+                f"Commerce: {economy['commerce'][0]:.0f}% | Pollution: {economy['pollution'][0]:,.0f}",
+                f"Disease: {economy['disease'][0]:.2f}% | Crime: {economy['crime'][0]:.2f}%",
+                f"Net Revenue: ${format_number(revenue)}/day",
+                "",
+                f"**MMR Type:** {mmr_type.upper() if isinstance(mmr_type, str) and mmr_type != 'default' else mmr_type}"
+            ])
             embed = create_embed(
                 title=f"Build Plan",
                 description="\n".join(income_info),
-                color=discord.Color.blue()
+                color=discord.Color.blue(),
+                footer=f"{'Saved plan' if memoized else 'Solved'} in {elapsed:,.1f}ms | Data fetched {format_age(cached_at)}"
             )
             embed.add_field(
                 name="Build Plan JSON",
@@ -1079,7 +792,7 @@ class NationCog(commands.Cog):
                 else:
                     await ctx.send(embed=msg_embed)
                 return
-        nation = get_data.GET_NATION_DATA(nation_id, self.config.API_KEY)
+        nation, cached_at = await get_data.GET_NATION_DATA_CACHED(nation_id, self.config.API_KEY, "chest")
         if not nation:
             if interaction:
                 await interaction.response.send_message("Nation not found.", ephemeral=True)
@@ -1109,7 +822,8 @@ class NationCog(commands.Cog):
         embed = create_embed(
             title=f"Resource Chest for {nation.get('nation_name', 'N/A')}",
             description="\n".join(lines),
-            color=discord.Color.gold()
+            color=discord.Color.gold(),
+            footer=f"Data fetched {format_age(cached_at)}"
         )
         if interaction:
             await interaction.response.send_message(embed=embed)
@@ -1139,7 +853,7 @@ class NationCog(commands.Cog):
                     return
 
             # Get the nation's data
-            nation = get_data.GET_NATION_DATA(nation_id, self.config.API_KEY)
+            nation, cached_at = await get_data.GET_NATION_DATA_CACHED(nation_id, self.config.API_KEY, "raid")
             if not nation:
                 if interaction:
                     await interaction.response.send_message("Nation not found.", ephemeral=True)
@@ -1149,102 +863,72 @@ class NationCog(commands.Cog):
 
             # Calculate war range
             score = float(nation.get('score', 0))
-            min_score = score * 0.75
-            max_score = score * 1.75
-
-            # Get all nations in range
-            nations = get_data.GET_ALL_NATIONS(self.config.API_KEY)
-            if not nations:
-                msg = "Could not fetch nations data. Please try again later."
+            min_score = score * vars.WAR_RANGE[0]
+            max_score = score * vars.WAR_RANGE[1]
+
+            # Keep the best targets in range, from the local snapshot when it is fresh
+            alliance_id = int((nation.get('alliance') or {}).get('id') or 0)
+            title = f"Raid Targets for {nation.get('nation_name', 'N/A')}"
+            message = None
+            if snapshot.is_fresh(self.config.SNAPSHOT_MAX_AGE_MINUTES * 60):
+                top = TopTargets()
+                top.extend(
+                    snapshot.index.in_range_of(score, exclude_alliance_id=alliance_id, beige=False, open_slots=True),
+                    min_score, max_score
+                )
+                source = f"Targets from snapshot refreshed {format_age(snapshot.updated_at)}"
+            else:
+                # Crawling takes a while, so show the best targets found so far as pages arrive
                 if interaction:
-                    await interaction.response.send_message(msg, ephemeral=True)
-                else:
-                    await ctx.send(msg)
-                return
+                    await interaction.response.defer()
+
+                async def pages():
+                    async for page in get_data.STREAM_RAID_TARGETS(self.config.API_KEY, min_score, max_score, alliance_id or None):
+                        yield [summarize(target) for target in page if target]
+
+                async def show(targets, done):
+                    nonlocal message
+                    embed = self._raid_embed(title, targets, f"Searching... {done:,} pages scanned")
+                    if message is not None:
+                        await message.edit(embed=embed)
+                    elif interaction:
+                        message = await interaction.followup.send(embed=embed, wait=True)
+                    else:
+                        message = await ctx.send(embed=embed)
 
-            # Filter and sort potential targets
-            targets = []
-            for target in nations:
-                if not target:  # Skip if target data is None
-                    continue
-                    
-                target_score = float(target.get('score', 0))
-                if min_score <= target_score <= max_score:
-                    # Skip if in same alliance
-                    if target.get('alliance', {}).get('id') == nation.get('alliance', {}).get('id'):
-                        continue
-                    
-                    # Calculate income potential
-                    cities = target.get('cities', [])
-                    if not cities:  # Skip if no city data
-                        continue
-                        
-                    infra = sum(city.get('infrastructure', 0) for city in cities)
-                    income = infra * 2  # Base income per infra
-                    
-                    # Calculate military strength
-                    soldiers = target.get('soldiers', 0)
-                    tanks = target.get('tanks', 0)
-                    aircraft = target.get('aircraft', 0)
-                    ships = target.get('ships', 0)
-                    
-                    # Skip if too strong
-                    if soldiers > 100000 or tanks > 1000 or aircraft > 100 or ships > 50:
-                        continue
-                    
-                    # Calculate profit potential (income * 0.1 for 10% loot)
-                    profit = income * 0.1
-                    
-                    targets.append({
-                        'id': target.get('id'),
-                        'name': target.get('nation_name'),
-                        'leader': target.get('leader_name'),
-                        'score': target_score,
-                        'cities': len(cities),
-                        'infra': infra,
-                        'income': income,
-                        'profit': profit,
-                        'soldiers': soldiers,
-                        'tanks': tanks,
-                        'aircraft': aircraft,
-                        'ships': ships
-                    })
+                try:
+                    top = await stream_top_targets(pages(), min_score, max_score, on_update=show)
+                except Exception as e:
+                    error(f"Error streaming raid targets: {e}", tag="RAID")
+                    msg = "Could not fetch nations data. Please try again later."
+                    if message is not None:
+                        await message.edit(content=msg, embed=None)
+                    elif interaction:
+                        await interaction.followup.send(msg, ephemeral=True)
+                    else:
+                        await ctx.send(msg)
+                    return
+                source = f"Targets fetched live ({top.seen:,} scanned)"
 
-            # Sort by profit potential
-            targets.sort(key=lambda x: x['profit'], reverse=True)
-            
-            # Take top 10 targets
-            targets = targets[:10]
-            
+            targets = top.best()
             if not targets:
-                if interaction:
-                    await interaction.response.send_message("No suitable targets found in your war range.", ephemeral=True)
+                msg = "No suitable targets found in your war range."
+                if message is not None:
+                    await message.edit(content=msg, embed=None)
+                elif interaction and interaction.response.is_done():
+                    await interaction.followup.send(msg, ephemeral=True)
+                elif interaction:
+                    await interaction.response.send_message(msg, ephemeral=True)
                 else:
-                    await ctx.send("No suitable targets found in your war range.")
+                    await ctx.send(msg)
                 return
 
-            # Format output
-            output = []
-            for target in targets:
-                output.append(
-                    f"**[{target['name']}](https://politicsandwar.com/nation/id={target['id']})** "
-                    f"({target['leader']})\n"
-                    f"Score: {target['score']:.2f} | Cities: {target['cities']} | "
-                    f"Income: ${format_number(target['income'])}/day | "
-                    f"Profit: ${format_number(target['profit'])}/day\n"
-                    f"Military: 🪖{format_number(target['soldiers'])} "
-                    f"🚜{format_number(target['tanks'])} "
-                    f"✈️{format_number(target['aircraft'])} "
-                    f"🚢{format_number(target['ships'])}"
-                )
-
-            embed = create_embed(
-                title=f"Raid Targets for {nation.get('nation_name', 'N/A')}",
-                description="\n\n".join(output),
-                color=discord.Color.red()
-            )
-            
-            if interaction:
+            embed = self._raid_embed(title, targets, f"Nation data fetched {format_age(cached_at)} • {source}")
+            if message is not None:
+                await message.edit(embed=embed)
+            elif interaction and interaction.response.is_done():
+                await interaction.followup.send(embed=embed)
+            elif interaction:
                 await interaction.response.send_message(embed=embed)
             else:
                 await ctx.send(embed=embed)
@@ -1258,11 +942,35 @@ class NationCog(commands.Cog):
                 f"**Error Message:** {e}\n\n"
                 f"Detailed error information has been logged internally. Please contact <@860564164828725299> if this issue persists."
             )
-            if interaction:
+            if interaction and interaction.response.is_done():
+                await interaction.followup.send(msg, ephemeral=True)
+            elif interaction:
                 await interaction.response.send_message(msg, ephemeral=True)
             else:
                 await ctx.send(msg)
 
+    def _raid_embed(self, title: str, targets, footer: str) -> discord.Embed:
+        """Build the raid targets embed."""
+        output = []
+        for target in targets:
+            output.append(
+                f"**[{target['name']}](https://politicsandwar.com/nation/id={target['id']})** "
+                f"({target['leader']})\n"
+                f"Score: {target['score']:.2f} | Cities: {target['cities']} | "
+                f"Income: ${format_number(target['income'])}/day | "
+                f"Profit: ${format_number(target['profit'])}/day\n"
+                f"Military: 🪖{format_number(target['soldiers'])} "
+                f"🚜{format_number(target['tanks'])} "
+                f"✈️{format_number(target['aircraft'])} "
+                f"🚢{format_number(target['ships'])}"
+            )
+        return create_embed(
+            title=title,
+            description="\n\n".join(output),
+            color=discord.Color.red(),
+            footer=footer
+        )
+
     @app_commands.command(name="raid", description="Find profitable raid targets within your war range.")
     @app_commands.describe(nation_id="The ID of the nation to check (optional if you're registered)")
     async def raid(self, interaction: discord.Interaction, nation_id: int = None):
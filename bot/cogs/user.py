@@ -55,7 +55,7 @@ class UserCog(commands.Cog):
         
         try:
             # Get nation data to verify the nation exists
-            nation = get_data.GET_NATION_DATA(nation_id, self.config.API_KEY)
+            nation, _ = await get_data.GET_NATION_DATA_CACHED(nation_id, self.config.API_KEY, "register")
             if not nation:
                 await interaction.followup.send(
                     embed=create_embed(
@@ -4,8 +4,12 @@ from discord.ext import commands
 from datetime import datetime, timezone
 
 from bot.utils.config import config
-from bot.utils.helpers import create_embed
+from bot.utils.helpers import create_embed, format_age
 from bot.handler import info, error, warning
+from bot.api import client as api_client
+from bot.data import nation_cache
+from bot.snapshot import snapshot
+from bot.ratelimit import limiter
 
 class UtilityCog(commands.Cog):
     """Cog for utility commands."""
@@ -19,12 +23,38 @@ class UtilityCog(commands.Cog):
         """Check the bot's latency."""
         try:
             latency = self.bot.latency * 1000
+            timing = api_client.timing_summary()
+            cache = nation_cache.stats()
+            snapshot_age = f"refreshed {format_age(snapshot.updated_at)}" if snapshot.updated_at else "not built yet"
+            budget = limiter.stats()
+            quota = api_client.rate_limit
+            if quota["remaining"] is not None:
+                reset = f", resets <t:{int(quota['reset'])}:R>" if quota["reset"] else ""
+                api_quota = f"{quota['remaining']:,.0f}/{quota['limit'] or 0:,.0f} left{reset}"
+            else:
+                api_quota = "not reported yet"
+            paused = f", paused for {budget['paused_for']:,.0f}s" if budget["paused_for"] else ""
+            top_commands = ", ".join(f"{name} {count:,}" for name, count in budget["usage"][:5]) or "none yet"
             info(f"Ping command executed by {interaction.user} in {interaction.channel}", tag="PING")
             
             await interaction.response.send_message(
                 embed=create_embed(
                     title="Pong! 🏓",
-                    description=f"Latency: {latency:,.2f} ms",
+                    description=(
+                        f"Latency: {latency:,.2f} ms\n"
+                        f"API Calls: {timing['calls']:,} ({timing['avg_ms']:,.2f} ms avg)\n"
+                        f"API Connections: {timing['reuse_ratio'] * 100:.1f}% reused "
+                        f"({timing['avg_new_ms']:,.2f} ms new / {timing['avg_reused_ms']:,.2f} ms reused)\n"
+                        f"Nation Cache: {cache['hits']:,} hits / {cache['misses']:,} misses / "
+                        f"{cache['coalesced']:,} shared ({cache['hit_rate'] * 100:.1f}% hit rate, {cache['size']:,} cached)\n"
+                        f"Nation Snapshot: {len(snapshot.nations):,} nations, {snapshot_age}"
+                        f"{' (refreshing)' if snapshot.refreshing else ''}\n"
+                        f"API Quota: {api_quota}\n"
+                        f"API Budget: {budget['tokens']:,.1f}/{budget['capacity']:,.0f} tokens, "
+                        f"{budget['queued']:,} calls queued ({budget['avg_wait_ms']:,.0f} ms avg wait)"
+                        f"{paused}\n"
+                        f"API Calls By Command: {top_commands}"
+                    ),
                     color=discord.Color.green()
                 ),
                 ephemeral=True
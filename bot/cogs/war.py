@@ -5,10 +5,12 @@ from discord.ext import commands
 from datetime import datetime, timezone, timedelta
 
 from bot.utils.config import config
-from bot.utils.paginator import ActivityPaginator
-from bot.utils.helpers import create_embed, format_number
+from bot.utils.paginator import ActivityPaginator, PaginatorView
+from bot.utils.helpers import create_embed, format_number, format_age
 from bot.handler import info, error, warning
 from bot import data as get_data
+from bot.snapshot import snapshot, summarize
+from bot.score_index import ScoreIndex
 
 class WarCog(commands.Cog):
     """Cog for war-related commands."""
@@ -17,6 +19,16 @@ class WarCog(commands.Cog):
         self.bot = bot
         self.config = config
     
+    def get_user_nation(self, user_id: int) -> Optional[int]:
+        """Get a user's registered nation ID."""
+        try:
+            user_cog = self.bot.get_cog("UserCog")
+            if user_cog:
+                return user_cog.get_user_nation(user_id)
+        except Exception as e:
+            error(f"Error getting user nation: {e}", tag="PURGE")
+        return None
+    
     def format_war_info(self, war: Dict) -> str:
         """Format war information into a compact string."""
         attacker = war.get('attacker', {})
@@ -59,7 +71,7 @@ class WarCog(commands.Cog):
             "first": 50
         }
         
-        wars = get_data.GET_WARS(params, self.config.API_KEY)
+        wars = await get_data.GET_WARS(params, self.config.API_KEY)
         if not wars:
             await interaction.followup.send("No active wars found for this nation.", ephemeral=True)
             return
@@ -73,6 +85,71 @@ class WarCog(commands.Cog):
         
         info(f"War lookup completed by {interaction.user}", tag="WAR")
 
+    @app_commands.command(name="purge", description="Find purple nations within your war range.")
+    @app_commands.describe(
+        nation_id="The ID of the nation to search from (optional if you're registered)"
+    )
+    async def purge(
+        self,
+        interaction: discord.Interaction,
+        nation_id: int = None
+    ):
+        """Find purple nations within your war range."""
+        await interaction.response.defer()
+        
+        if nation_id is None:
+            nation_id = self.get_user_nation(interaction.user.id)
+            if nation_id is None:
+                await interaction.followup.send(
+                    "Please provide a nation ID or register your nation using `/register`.", ephemeral=True
+                )
+                return
+        
+        nation, _ = await get_data.GET_NATION_DATA_CACHED(nation_id, self.config.API_KEY, "purge")
+        if not nation:
+            await interaction.followup.send("Nation not found.", ephemeral=True)
+            return
+        
+        # Purple nations in range that can still be hit, from the snapshot when it is fresh
+        score = float(nation.get('score', 0))
+        filters = {
+            'color': "purple",
+            'exclude_alliance_id': int((nation.get('alliance') or {}).get('id') or 0),
+            'beige': False,
+            'open_slots': True
+        }
+        if snapshot.is_fresh(self.config.SNAPSHOT_MAX_AGE_MINUTES * 60):
+            targets = snapshot.index.in_range_of(score, **filters)
+            source = f"Snapshot refreshed {format_age(snapshot.updated_at)}"
+        else:
+            purple = await get_data.GET_PURGE_NATIONS(self.config.API_KEY) or []
+            targets = ScoreIndex(summarize(target) for target in purple).in_range_of(score, **filters)
+            source = "Fetched live"
+        
+        if not targets:
+            await interaction.followup.send("No purple nations found in your war range.", ephemeral=True)
+            return
+        
+        results = [
+            f"**[{target['nation_name']}](https://politicsandwar.com/nation/id={target['id']})** "
+            f"({target['leader_name']}) | Score: {target['score']:.2f} | "
+            f"Alliance: {target['alliance_name'] or 'None'}"
+            for target in sorted(targets, key=lambda target: target['score'], reverse=True)
+        ]
+        embeds = [
+            create_embed(
+                title=f"Purge Targets for {nation.get('nation_name', 'N/A')}",
+                description="\n".join(results[i:i + 10]),
+                color=discord.Color.purple(),
+                footer=f"{len(targets)} purple nations in range • {source}"
+            )
+            for i in range(0, len(results), 10)
+        ]
+        
+        await interaction.followup.send(embed=embeds[0], view=PaginatorView(embeds))
+        
+        info(f"Purge search completed by {interaction.user}", tag="PURGE")
+
 async def setup(bot: commands.Bot):
     """Set up the war cog."""
     await bot.add_cog(WarCog(bot)) 
\ No newline at end of file
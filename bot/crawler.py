@@ -0,0 +1,144 @@
+import asyncio
+import random
+import time
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+
+from bot.api import client, backoff, APIError, APIRateLimited
+from bot.handler import error, warning
+
+class NationCrawler:
+    """Fetch every page of a nations query with bounded parallelism.
+
+    Page 1 is fetched first to learn how many pages there are, the rest are
+    fetched concurrently and handed out as soon as each one arrives. The delay
+    between requests adapts to the API: it grows when we get rate limited and
+    shrinks again while requests succeed. A page that still fails after its
+    retries is recorded in ``failed_pages`` instead of aborting the crawl.
+    """
+
+    def __init__(
+        self,
+        api_key: str,
+        fields: str,
+        arguments: Optional[Dict[str, Tuple[str, Any]]] = None,
+        per_page: int = 500,
+        concurrency: int = 4,
+        max_retries: int = 3,
+        min_delay: float = 0.0,
+        max_delay: float = 30.0,
+        tag: str = "CRAWL"
+    ):
+        self.api_key = api_key
+        self.fields = fields
+        self.arguments = arguments or {}
+        self.per_page = per_page
+        self.concurrency = concurrency
+        self.max_retries = max_retries
+        self.min_delay = min_delay
+        self.max_delay = max_delay
+        self.tag = tag
+        self.delay = min_delay
+        self.failed_pages: List[int] = []
+        self.last_page: Optional[int] = None
+        self.query = self._build_query()
+
+    def _build_query(self) -> str:
+        """Build the paginated query with every filter passed as a variable."""
+        names = ["first", "page"] + list(self.arguments)
+        types = {"first": "Int", "page": "Int", **{name: kind for name, (kind, _) in self.arguments.items()}}
+        signature = ", ".join(f"${name}: {types[name]}" for name in names)
+        call = ", ".join(f"{name}: ${name}" for name in names)
+        return (
+            f"query Nations({signature}) {{ nations({call}) {{ "
+            f"paginatorInfo {{ lastPage }} "
+            f"data {{ {self.fields} }} }} }}"
+        )
+
+    def _variables(self, page: int) -> Dict[str, Any]:
+        """Get the query variables for a page."""
+        return {
+            "first": self.per_page,
+            "page": page,
+            **{name: value for name, (_, value) in self.arguments.items()}
+        }
+
+    def _slow_down(self, retry_after: Optional[float] = None) -> None:
+        """Back off after being rate limited."""
+        self.delay = min(max(self.delay * 2, retry_after or 1.0), self.max_delay)
+        warning(f"Rate limited, waiting {self.delay:.1f}s between requests", tag=self.tag)
+
+    def _speed_up(self) -> None:
+        """Ease the delay back down after a success, respecting the remaining quota."""
+        self.delay = max(self.delay * 0.75, self.min_delay)
+        remaining = client.rate_limit.get("remaining")
+        reset = client.rate_limit.get("reset")
+        if remaining is not None and reset is not None and remaining < self.concurrency * 2:
+            # Spread what is left of the budget over the time until it resets
+            self.delay = min(max(self.delay, (reset - time.time()) / max(remaining, 1)), self.max_delay)
+
+    async def _fetch_page(self, page: int) -> Optional[Tuple[List[Dict], Optional[int]]]:
+        """Fetch a single page with retries, returning its nations and the last page number."""
+        for attempt in range(self.max_retries):
+            if self.delay > 0:
+                await asyncio.sleep(self.delay * random.uniform(0.5, 1.0))
+            try:
+                data = await client.post(self.api_key, self.query, self._variables(page), timeout=30, tag=self.tag, retries=0)
+            except APIRateLimited as e:
+                self._slow_down(e.retry_after)
+                continue
+            except APIError as e:
+                error(f"Page {page} failed (Attempt {attempt + 1}/{self.max_retries}): {e}", tag=self.tag)
+                await backoff(attempt)
+                continue
+
+            if "errors" in data:
+                message = str(data["errors"])
+                if "rate" in message.lower() or "too many" in message.lower():
+                    self._slow_down()
+                else:
+                    error(f"API Error on page {page} (Attempt {attempt + 1}/{self.max_retries}): {message}", tag=self.tag)
+                    await backoff(attempt)
+                continue
+
+            self._speed_up()
+            nations = data.get("data", {}).get("nations") or {}
+            last_page = (nations.get("paginatorInfo") or {}).get("lastPage")
+            return nations.get("data") or [], last_page
+
+        error(f"Giving up on page {page} after {self.max_retries} attempts", tag=self.tag)
+        return None
+
+    async def pages(self) -> AsyncIterator[Tuple[int, List[Dict]]]:
+        """Yield ``(page, nations)`` as each page finishes downloading."""
+        first = await self._fetch_page(1)
+        if first is None:
+            self.failed_pages.append(1)
+            return
+
+        nations, self.last_page = first
+        queue: asyncio.Queue = asyncio.Queue()
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        async def worker(page: int) -> None:
+            result = None
+            try:
+                async with semaphore:
+                    result = await self._fetch_page(page)
+            except Exception as e:
+                error(f"Unexpected error on page {page}: {e}", tag=self.tag)
+            finally:
+                queue.put_nowait((page, result))
+
+        # Start the remaining pages before handing out page 1
+        tasks = [asyncio.create_task(worker(page)) for page in range(2, (self.last_page or 1) + 1)]
+        try:
+            yield 1, nations
+            for _ in tasks:
+                page, result = await queue.get()
+                if result is None:
+                    self.failed_pages.append(page)
+                    continue
+                yield page, result[0]
+        finally:
+            for task in tasks:
+                task.cancel()
@@ -1,12 +1,16 @@
-import requests
+import asyncio
 import json
-from typing import Dict, List, Optional, Any
+from typing import Dict, List, Optional, Any, AsyncIterator, Tuple
 from datetime import datetime, timezone
 import pytz
 from bot.handler import error
-import time
+from bot.api import client, backoff, APIError
+from bot.cache import TTLCache
+from bot.crawler import NationCrawler
+from bot.queries import BANK_QUERY, nation_query
+from bot.snapshot import SNAPSHOT_FIELDS
 
-def GET_ALLIANCE_MEMBERS(ALLIANCE_ID: int, API_KEY: str, max_retries: int = 3):
+async def GET_ALLIANCE_MEMBERS(ALLIANCE_ID: int, API_KEY: str, max_retries: int = 3):
     """Get alliance members from the API with retry logic."""
     query = f"""{{
     nations(first:500, vmode: false, alliance_id:{ALLIANCE_ID}) {{data {{
@@ -36,6 +40,7 @@ def GET_ALLIANCE_MEMBERS(ALLIANCE_ID: int, API_KEY: str, max_retries: int = 3):
         discord
         alliance_position
         spies
+        central_intelligence_agency
 
         military_research {{
             ground_capacity
@@ -49,6 +54,8 @@ def GET_ALLIANCE_MEMBERS(ALLIANCE_ID: int, API_KEY: str, max_retries: int = 3):
         }}
 
         cities {{
+            id
+            name
             date
             infrastructure
             coal_power
@@ -59,6 +66,9 @@ def GET_ALLIANCE_MEMBERS(ALLIANCE_ID: int, API_KEY: str, max_retries: int = 3):
             uranium_mine
             iron_mine
             coal_mine
+            oil_well
+            bauxite_mine
+            lead_mine
             oil_refinery
             steel_mill
             aluminum_refinery
@@ -78,13 +88,9 @@ def GET_ALLIANCE_MEMBERS(ALLIANCE_ID: int, API_KEY: str, max_retries: int = 3):
         }}
     }}}}}}"""
     
-    url = f"https://api.politicsandwar.com/graphql?api_key={API_KEY}&query={query}"
-    
     for attempt in range(max_retries):
         try:
-            response = requests.get(url, timeout=10)
-            response.raise_for_status()
-            data = response.json()
+            data = await client.get(API_KEY, query, tag="ALLIANCE_MEMBERS")
             
             # Check for API errors
             if "errors" in data:
@@ -95,7 +101,7 @@ def GET_ALLIANCE_MEMBERS(ALLIANCE_ID: int, API_KEY: str, max_retries: int = 3):
                 if error_type == "internal":
                     if attempt < max_retries - 1:
                         error(f"Internal server error, retrying... (Attempt {attempt + 1}/{max_retries})", tag="ALLIANCE_MEMBERS")
-                        time.sleep(2 ** attempt)  # Exponential backoff
+                        await backoff(attempt)  # Exponential backoff
                         continue
                     else:
                         error(f"Internal server error after {max_retries} attempts", tag="ALLIANCE_MEMBERS")
@@ -111,14 +117,10 @@ def GET_ALLIANCE_MEMBERS(ALLIANCE_ID: int, API_KEY: str, max_retries: int = 3):
                 
             return members
             
-        except requests.exceptions.RequestException as e:
-            if attempt < max_retries - 1:
-                error(f"API request failed, retrying... (Attempt {attempt + 1}/{max_retries}): {e}", tag="ALLIANCE_MEMBERS")
-                time.sleep(2 ** attempt)  # Exponential backoff
-                continue
-            else:
-                error(f"API request failed after {max_retries} attempts: {e}", tag="ALLIANCE_MEMBERS")
-                return None
+        except APIError as e:
+            # The client has already retried transport errors
+            error(f"API request failed: {e}", tag="ALLIANCE_MEMBERS")
+            return None
                 
         except (ValueError, KeyError, TypeError) as e:
             error(f"Error parsing API response: {e}", tag="ALLIANCE_MEMBERS")
@@ -127,101 +129,10 @@ def GET_ALLIANCE_MEMBERS(ALLIANCE_ID: int, API_KEY: str, max_retries: int = 3):
     return None
 
 
-def GET_NATION_DATA(nation_id: int, api_key: str) -> Optional[Dict]:
-    """Get nation data from the API."""
-    query = """
-    {
-        nations(id: %d) { 
-            data {
-                last_active
-                flag
-                id
-                score
-                color
-                population
-                nation_name
-                leader_name
-                soldiers
-                tanks
-                aircraft
-                ships
-                money
-                coal
-                oil
-                uranium
-                iron
-                bauxite
-                lead
-                gasoline
-                munitions
-                steel
-                aluminum
-                food
-                credits
-                continent
-                discord
-                spies_today
-                
-                alliance {
-                    id
-                    name
-                }
-                
-                wars {
-                    id
-                    attacker {
-                        id
-                        nation_name
-                        leader_name
-                        soldiers
-                        tanks
-                        aircraft
-                        ships
-                        alliance {
-                            id
-                            name
-                        }
-                    }
-                    defender {
-                        id
-                        nation_name
-                        leader_name
-                        soldiers
-                        tanks
-                        aircraft
-                        ships
-                        alliance {
-                            id
-                            name
-                        }
-                    }
-                    war_type
-                    turns_left
-                    att_points
-                    def_points
-                    att_peace
-                    def_peace
-                    att_resistance
-                    def_resistance
-                    att_fortify
-                    def_fortify
-                    ground_control
-                    air_superiority
-                    naval_blockade
-                }
-            }
-        }
-    }
-    """ % nation_id
-    
+async def GET_NATION_DATA(nation_id: int, api_key: str, fields: str = "nation") -> Optional[Dict]:
+    """Get nation data from the API, selecting only the fields registered under ``fields``."""
     try:
-        response = requests.post(
-            "https://api.politicsandwar.com/graphql",
-            json={"query": query, "variables": {"id": [nation_id]}},
-            params={"api_key": api_key}
-        )
-        response.raise_for_status()
-        data = response.json()
+        data = await client.post(api_key, nation_query(fields), {"id": [int(nation_id)]}, tag=f"NATION_{fields.upper()}")
         
         if "errors" in data:
             error(f"API Error in GET_NATION_DATA: {data['errors']}", tag="NATION")
@@ -235,53 +146,34 @@ def GET_NATION_DATA(nation_id: int, api_key: str) -> Optional[Dict]:
         return None
 
 
-def GET_CITY_DATA(nation_id: int, api_key: str) -> Optional[List[Dict]]:
-    """Get city data for a nation from the API."""
-    query = """
-    {
-        nations(id:%d) { data {
-            cities {
-                name
-                id
-                date
-                infrastructure
-                land
-                coal_power
-                oil_power
-                nuclear_power
-                wind_power
-                farm
-                uranium_mine
-                iron_mine
-                coal_mine
-                oil_refinery
-                steel_mill
-                aluminum_refinery
-                munitions_factory
-                police_station
-                hospital
-                recycling_center
-                subway
-                supermarket
-                bank
-                shopping_mall
-                stadium
-                barracks
-                factory
-                hangar
-                drydock
-            }
-        }}
-    }
-    """ % nation_id
+# Shared nation cache, the TTL is configured at startup
+nation_cache = TTLCache(ttl=60)
+
+async def GET_NATION_DATA_CACHED(nation_id: int, api_key: str, fields: str = "nation") -> Tuple[Optional[Dict], float]:
+    """Get nation data through the shared cache, with the time it was fetched."""
+    return await nation_cache.get((int(nation_id), fields), lambda: GET_NATION_DATA(nation_id, api_key, fields))
+
+
+async def GET_BANK_RECORDS(nation_id: int, api_key: str, min_id: Optional[int] = None) -> Optional[Dict]:
+    """Get a nation's header and its bank records with an ID of at least ``min_id``.
     
+    Returns None if the nation does not exist and raises APIError if the
+    request fails, so callers can tell the two apart.
+    """
+    data = await client.post(api_key, BANK_QUERY, {"id": [int(nation_id)], "min_id": min_id}, tag="BANK")
+    
+    if "errors" in data:
+        error(f"API Error in GET_BANK_RECORDS: {data['errors']}", tag="BANK")
+        raise APIError(f"bank records query failed: {data['errors']}")
+        
+    nations = data.get("data", {}).get("nations", {}).get("data", [])
+    return nations[0] if nations else None
+
+
+async def GET_CITY_DATA(nation_id: int, api_key: str) -> Optional[List[Dict]]:
+    """Get city data for a nation from the API."""
     try:
-        response = requests.get(
-            "https://api.politicsandwar.com/graphql",
-            params={"api_key": api_key, "query": query}
-        )
-        response.raise_for_status()
-        data = response.json()
+        data = await client.post(api_key, nation_query("cities"), {"id": [int(nation_id)]}, tag="CITY")
         
         if "errors" in data:
             print(f"API Error: {data['errors']}")
@@ -295,7 +187,46 @@ def GET_CITY_DATA(nation_id: int, api_key: str) -> Optional[List[Dict]]:
         return None
 
 
-def GET_PURGE_NATIONS(API_KEY: str):
+# Most nations the API returns for one page of a nations query
+BATCH_SIZE = 500
+
+async def GET_NATIONS_BATCH(
+    nation_ids: List[int],
+    api_key: str,
+    fields: str = "nation",
+    chunk_size: int = BATCH_SIZE,
+    semaphore: Optional[asyncio.Semaphore] = None
+) -> Dict[int, Dict]:
+    """Get many nations with one request per chunk of IDs, keyed by nation ID.
+
+    Chunks are fetched concurrently, at most as many at once as ``semaphore``
+    allows when one is given. Nations that were not returned, or whose chunk
+    failed, are missing from the result.
+    """
+    ids = list(dict.fromkeys(int(nation_id) for nation_id in nation_ids))
+    chunks = [ids[i:i + chunk_size] for i in range(0, len(ids), chunk_size)]
+    semaphore = semaphore or asyncio.Semaphore(max(len(chunks), 1))
+
+    async def fetch(chunk: List[int]) -> List[Dict]:
+        try:
+            async with semaphore:
+                data = await client.post(
+                    api_key, nation_query(fields), {"id": chunk, "first": len(chunk)}, tag=f"BATCH_{fields.upper()}"
+                )
+        except APIError as e:
+            error(f"Batch of {len(chunk)} nations failed: {e}", tag="BATCH")
+            return []
+        if "errors" in data:
+            error(f"API Error in GET_NATIONS_BATCH: {data['errors']}", tag="BATCH")
+            return []
+        return data.get("data", {}).get("nations", {}).get("data") or []
+
+    results = await asyncio.gather(*(fetch(chunk) for chunk in chunks))
+    return {int(nation["id"]): nation for nations in results for nation in nations}
+
+
+async def GET_PURGE_NATIONS(API_KEY: str) -> Optional[List[Dict]]:
+    """Get purple nations under 2,000 score, or None on failure."""
     query = f'''
         {{
         nations(max_score: 2000, color: "purple") {{ data {{
@@ -312,31 +243,28 @@ def GET_PURGE_NATIONS(API_KEY: str):
         }}}}
         }}
     '''
-    url = f"https://api.politicsandwar.com/graphql?api_key={API_KEY}&query={query}"
     try:
-        response = requests.get(url, timeout=10)
-        response.raise_for_status()
-    except requests.exceptions.RequestException as e:
-        print(f"API request failed: {e}")
-        return
+        data = await client.get(API_KEY, query, tag="PURGE")
+    except APIError as e:
+        error(f"API request failed: {e}", tag="PURGE")
+        return None
 
-    try:
-        nation = response.json()
-        nation_list = nation.get("data", {}).get("nations", {}).get("data", [])
-        if not nation_list:
-            print("No nations found in the API response.")
-            return
+    if "errors" in data:
+        error(f"API Error in GET_PURGE_NATIONS: {data['errors']}", tag="PURGE")
+        return None
 
-        return nation_list
+    nation_list = ((data.get("data") or {}).get("nations") or {}).get("data") or []
+    if not nation_list:
+        error("No nations found in the API response.", tag="PURGE")
+        return None
 
-    except Exception as e:
-        print(f"Error parsing API response: {e}")
-        return
+    return nation_list
 
 
 
 
-def GET_GAME_DATA(API_KEY: str):
+async def GET_GAME_DATA(API_KEY: str) -> Optional[Dict]:
+    """Get the game date and radiation levels, or None on failure."""
     query = f"""
     {{
     game_info {{
@@ -355,25 +283,19 @@ def GET_GAME_DATA(API_KEY: str):
     }}
     }}
     """
-    url = f"https://api.politicsandwar.com/graphql?api_key={API_KEY}&query={query}"
-    
     try:
-        response = requests.get(url, timeout=10)
-        response.raise_for_status()
-    except requests.exceptions.RequestException as e:
-        print(f"API request failed: {e}")
-        return
+        data = await client.get(API_KEY, query, tag="GAME")
+    except APIError as e:
+        error(f"API request failed: {e}", tag="GAME")
+        return None
     
-    try:
-        game_info = response.json()
-        game_data = game_info.get("data", {}).get("game_info", {})
-    except Exception as e:
-        print(f"Error parsing API response: {e}")
-        return
+    if "errors" in data:
+        error(f"API Error in GET_GAME_DATA: {data['errors']}", tag="GAME")
+        return None
     
-    return game_data
+    return (data.get("data") or {}).get("game_info") or None
 
-def GET_WAR_DATA(war_id: int, api_key: str) -> Optional[Dict]:
+async def GET_WAR_DATA(war_id: int, api_key: str) -> Optional[Dict]:
     """Get war data from the API."""
     query = """
     {
@@ -423,12 +345,7 @@ def GET_WAR_DATA(war_id: int, api_key: str) -> Optional[Dict]:
     """ % war_id
     
     try:
-        response = requests.get(
-            "https://api.politicsandwar.com/graphql",
-            params={"api_key": api_key, "query": query}
-        )
-        response.raise_for_status()
-        data = response.json()
+        data = await client.get(api_key, query, tag="WAR")
         
         if "errors" in data:
             print(f"API Error: {data['errors']}")
@@ -441,7 +358,7 @@ def GET_WAR_DATA(war_id: int, api_key: str) -> Optional[Dict]:
         print(f"Error fetching war data: {e}")
         return None
 
-def GET_WARS(params: Dict, api_key: str) -> List[Dict]:
+async def GET_WARS(params: Dict, api_key: str) -> List[Dict]:
     """Get war data from the API."""
     query = """
     query Wars($id: [Int], $min_id: Int, $max_id: Int, $before: DateTime, $after: DateTime, 
@@ -529,13 +446,7 @@ def GET_WARS(params: Dict, api_key: str) -> List[Dict]:
     """
     
     try:
-        response = requests.post(
-            "https://api.politicsandwar.com/graphql",
-            json={"query": query, "variables": params},
-            params={"api_key": api_key}
-        )
-        response.raise_for_status()
-        data = response.json()
+        data = await client.post(api_key, query, params, tag="WARS")
         
         if "errors" in data:
             error(f"API Error: {data['errors']}", tag="WARS")
@@ -546,68 +457,115 @@ def GET_WARS(params: Dict, api_key: str) -> List[Dict]:
         error(f"Error fetching war data: {e}", tag="WARS")
         return []
 
-def GET_ALL_NATIONS(api_key: str) -> Optional[List[Dict]]:
+# Fields fetched for every nation by GET_ALL_NATIONS
+ALL_NATIONS_FIELDS = """
+    id
+    nation_name
+    leader_name
+    score
+    population
+    soldiers
+    tanks
+    aircraft
+    ships
+    alliance {
+        id
+        name
+    }
+    cities {
+        infrastructure
+    }
+"""
+
+async def STREAM_ALL_NATIONS(api_key: str, concurrency: int = 4) -> AsyncIterator[List[Dict]]:
+    """Stream every nation in the game one page of 500 at a time, as pages arrive."""
+    crawler = NationCrawler(api_key, ALL_NATIONS_FIELDS, concurrency=concurrency, tag="NATIONS")
+    async for _, nations in crawler.pages():
+        yield nations
+    if crawler.failed_pages:
+        error(f"Failed to fetch nation pages: {sorted(crawler.failed_pages)}", tag="NATIONS")
+
+async def GET_ALL_NATIONS(api_key: str) -> Optional[List[Dict]]:
     """Get all nations from the API in chunks of 500."""
     all_nations = []
-    page = 1
-    
-    while True:
-        query = """
-        {{
-            nations(first: 500, page: %d) {{ 
-                data {{
-                    id
-                    nation_name
-                    leader_name
-                    score
-                    population
-                    soldiers
-                    tanks
-                    aircraft
-                    ships
-                    alliance {{
-                        id
-                        name
-                    }}
-                    cities {{
-                        infrastructure
-                    }}
-                }
-            }}
-        }}
-        """ % page
-        
-        try:
-            response = requests.get(
-                "https://api.politicsandwar.com/graphql",
-                params={"api_key": api_key, "query": query},
-                timeout=30  # Add timeout
-            )
-            response.raise_for_status()
-            data = response.json()
-            
-            if "errors" in data:
-                error(f"API Error in GET_ALL_NATIONS: {data['errors']}", tag="NATIONS")
-                return None
-                
-            nations = data.get("data", {}).get("nations", {}).get("data", [])
-            if not nations:  # No more nations to fetch
-                break
-                
+    try:
+        async for nations in STREAM_ALL_NATIONS(api_key):
             all_nations.extend(nations)
-            page += 1
-            
-            # Add a small delay between requests to avoid rate limiting
-            time.sleep(0.5)
-            
-        except requests.exceptions.Timeout:
-            error("Timeout while fetching nations data", tag="NATIONS")
-            return None
-        except requests.exceptions.RequestException as e:
-            error(f"Request error while fetching nations: {e}", tag="NATIONS")
-            return None
-        except Exception as e:
-            error(f"Unexpected error in GET_ALL_NATIONS: {e}", tag="NATIONS")
-            return None
+    except Exception as e:
+        error(f"Unexpected error in GET_ALL_NATIONS: {e}", tag="NATIONS")
     
-    return all_nations if all_nations else None
\ No newline at end of file
+    return all_nations if all_nations else None
+
+# Fields fetched for each raid candidate, only what the raid scoring uses
+RAID_TARGET_FIELDS = """
+    id
+    nation_name
+    leader_name
+    score
+    num_cities
+    alliance_id
+    color
+    beige_turns
+    defensive_wars_count
+    soldiers
+    tanks
+    aircraft
+    ships
+    cities {
+        infrastructure
+    }
+"""
+
+async def STREAM_RAID_TARGETS(api_key: str, min_score: float, max_score: float, exclude_alliance_id: Optional[int] = None, concurrency: int = 4) -> AsyncIterator[List[Dict]]:
+    """Stream nations inside a score range that are not in vacation mode, one page at a time."""
+    crawler = NationCrawler(
+        api_key,
+        RAID_TARGET_FIELDS,
+        arguments={
+            "min_score": ("Float", min_score),
+            "max_score": ("Float", max_score),
+            "vmode": ("Boolean", False),
+        },
+        concurrency=concurrency,
+        tag="RAID"
+    )
+    async for _, nations in crawler.pages():
+        # The API can only filter alliances by inclusion, so exclusion happens here
+        if exclude_alliance_id is not None:
+            nations = [n for n in nations if str(n.get("alliance_id")) != str(exclude_alliance_id)]
+        yield nations
+    if crawler.failed_pages:
+        error(f"Failed to fetch raid target pages: {sorted(crawler.failed_pages)}", tag="RAID")
+
+async def GET_RAID_TARGETS(api_key: str, min_score: float, max_score: float, exclude_alliance_id: Optional[int] = None) -> Optional[List[Dict]]:
+    """Get every nation a raider can hit, filtered by score range on the API side."""
+    targets = []
+    try:
+        async for nations in STREAM_RAID_TARGETS(api_key, min_score, max_score, exclude_alliance_id):
+            targets.extend(nations)
+    except Exception as e:
+        error(f"Unexpected error in GET_RAID_TARGETS: {e}", tag="RAID")
+        return None
+    
+    return targets
+
+async def GET_ALLIANCE_NATIONS(api_key: str, alliance_id: int) -> Optional[List[Dict]]:
+    """Get one alliance's nations with the snapshot fields, or None on failure."""
+    crawler = NationCrawler(
+        api_key,
+        SNAPSHOT_FIELDS,
+        arguments={"alliance_id": ("[Int]", [alliance_id])},
+        tag="ALLIANCE"
+    )
+    nations = []
+    try:
+        async for _, page in crawler.pages():
+            nations.extend(page)
+    except Exception as e:
+        error(f"Unexpected error in GET_ALLIANCE_NATIONS: {e}", tag="ALLIANCE")
+        return None
+    if crawler.failed_pages:
+        error(f"Failed to fetch alliance nation pages: {sorted(crawler.failed_pages)}", tag="ALLIANCE")
+        return None
+
+    return nations
@@ -0,0 +1,190 @@
+from datetime import datetime, timezone
+from typing import Dict, FrozenSet, Iterable, Optional, Tuple
+
+import numpy as np
+
+from bot.models import CityTable
+from bot.queries import PROJECTS
+
+# Raw resources each continent can mine, keyed by the continent code the API returns
+CONTINENT_RESOURCES: Dict[str, Tuple[str, ...]] = {
+    "af": ("oil", "bauxite", "uranium"),
+    "an": ("oil", "coal", "uranium"),
+    "as": ("oil", "iron", "uranium"),
+    "au": ("coal", "bauxite", "lead"),
+    "eu": ("coal", "iron", "lead"),
+    "na": ("coal", "iron", "uranium"),
+    "sa": ("oil", "bauxite", "lead"),
+}
+CONTINENT_CODES = {
+    "africa": "af", "antarctica": "an", "asia": "as", "australia": "au",
+    "europe": "eu", "north america": "na", "south america": "sa",
+}
+
+# Commerce added by each improvement, in percent
+COMMERCE = {"supermarket": 3, "bank": 5, "shopping_mall": 9, "stadium": 12, "subway": 8}
+
+# Pollution index points per improvement; manufacturing is scaled by Green Technologies
+POLLUTION = {
+    "coal_power": 8, "oil_power": 6, "coal_mine": 12, "iron_mine": 12, "uranium_mine": 20,
+    "oil_well": 12, "bauxite_mine": 12, "lead_mine": 12, "police_station": 1, "hospital": 4,
+    "shopping_mall": 2, "stadium": 5,
+}
+MANUFACTURING_POLLUTION = {"oil_refinery": 32, "steel_mill": 40, "aluminum_refinery": 40, "munitions_factory": 32}
+
+# Daily output per building
+RAW_OUTPUT = {
+    "coal": "coal_mine", "oil": "oil_well", "uranium": "uranium_mine",
+    "iron": "iron_mine", "bauxite": "bauxite_mine", "lead": "lead_mine",
+}
+MANUFACTURED_OUTPUT = {
+    "gasoline": ("oil_refinery", 6, "emergency_gasoline_reserve", 2.0),
+    "munitions": ("munitions_factory", 18, "arms_stockpile", 1.2),
+    "steel": ("steel_mill", 9, "iron_works", 1.36),
+    "aluminum": ("aluminum_refinery", 9, "bauxite_works", 1.36),
+}
+
+# Buildings named by the keys of the in-game build JSON
+PLAN_BUILDINGS = {
+    "imp_coalpower": "coal_power", "imp_oilpower": "oil_power", "imp_windpower": "wind_power",
+    "imp_nuclearpower": "nuclear_power", "imp_coalmine": "coal_mine", "imp_oilwell": "oil_well",
+    "imp_uramine": "uranium_mine", "imp_leadmine": "lead_mine", "imp_ironmine": "iron_mine",
+    "imp_bauxitemine": "bauxite_mine", "imp_farm": "farm", "imp_gasrefinery": "oil_refinery",
+    "imp_aluminumrefinery": "aluminum_refinery", "imp_munitionsfactory": "munitions_factory",
+    "imp_steelmill": "steel_mill", "imp_policestation": "police_station", "imp_hospital": "hospital",
+    "imp_recyclingcenter": "recycling_center", "imp_subway": "subway", "imp_supermarket": "supermarket",
+    "imp_stadium": "stadium", "imp_bank": "bank", "imp_mall": "shopping_mall",
+    "imp_barracks": "barracks", "imp_factory": "factory", "imp_hangars": "hangar", "imp_drydock": "drydock",
+}
+
+def continent_code(continent: Optional[str]) -> str:
+    """Normalize a continent name or code to the code the API returns."""
+    continent = (continent or "").strip().lower()
+    return CONTINENT_CODES.get(continent, continent)
+
+def continent_resources(continent: Optional[str]) -> Tuple[str, ...]:
+    """Get the raw resources a continent can mine."""
+    return CONTINENT_RESOURCES.get(continent_code(continent), ())
+
+def projects_of(nation: Dict) -> FrozenSet[str]:
+    """Get the economic projects a nation has built."""
+    return frozenset(project for project in PROJECTS if nation.get(project))
+
+def caps(projects: Iterable[str] = ()) -> Dict[str, int]:
+    """Get the most of each improvement a city can hold."""
+    projects = frozenset(projects)
+    return {
+        "coal_mine": 10, "oil_well": 10, "iron_mine": 10, "bauxite_mine": 10, "lead_mine": 10,
+        "uranium_mine": 5, "farm": 20, "oil_refinery": 5, "steel_mill": 5, "aluminum_refinery": 5,
+        "munitions_factory": 5, "police_station": 5,
+        "hospital": 6 if "clinical_research_center" in projects else 5,
+        "recycling_center": 4 if "recycling_initiative" in projects else 3,
+        "subway": 1, "supermarket": 4,
+        "bank": 6 if "international_trade_center" in projects else 5,
+        "shopping_mall": 5 if "telecommunications_satellite" in projects else 4,
+        "stadium": 3, "barracks": 5, "factory": 5, "hangar": 5, "drydock": 3,
+    }
+
+def max_commerce(projects: Iterable[str] = ()) -> float:
+    """Get the commerce cap in percent."""
+    projects = frozenset(projects)
+    if "telecommunications_satellite" in projects:
+        return 125.0
+    if "international_trade_center" in projects:
+        return 115.0
+    return 100.0
+
+def plan_table(plan: Dict[str, int], infrastructure: float, land: float) -> CityTable:
+    """Get a one-city table for a build plan."""
+    city = {building: plan.get(key, 0) for key, building in PLAN_BUILDINGS.items()}
+    return CityTable([{**city, "infrastructure": infrastructure, "land": land}])
+
+def city_ages(cities: CityTable, as_of: Optional[datetime] = None) -> np.ndarray:
+    """Get every city's age in days at ``as_of``."""
+    from bot.calculate import founded
+
+    as_of = as_of or datetime.now(timezone.utc)
+    return np.array(
+        [(as_of - founded(city_id, date)).days for city_id, date in zip(cities.ids.tolist(), cities.dates)],
+        dtype=np.float64
+    )
+
+def evaluate(
+    cities: CityTable,
+    projects: Iterable[str] = (),
+    ages: Optional[np.ndarray] = None,
+    as_of: Optional[datetime] = None
+) -> Dict[str, np.ndarray]:
+    """Compute commerce, pollution, disease, crime, population and daily production for every city.
+
+    Each value is an array with one entry per city, using the formulas in
+    references.md. Pass ``ages`` in days to skip reading founding dates.
+    """
+    projects = frozenset(projects)
+    infra = cities.infrastructure
+    land = cities.land
+    count = lambda building: cities[building].astype(np.float64)
+
+    # Commerce (%), with the project bonuses and the cap
+    commerce = sum(count(building) * bonus for building, bonus in COMMERCE.items())
+    commerce = commerce + (
+        1 * ("international_trade_center" in projects)
+        + 2 * ("telecommunications_satellite" in projects)
+        + 4 * ("specialized_police_training_program" in projects)
+    )
+    commerce = np.minimum(commerce, max_commerce(projects))
+
+    # Pollution index
+    green = "green_technologies" in projects
+    pollution = sum(count(building) * points for building, points in POLLUTION.items())
+    pollution = pollution + count("farm") * (1 if green else 2)
+    pollution = pollution + sum(count(building) * points for building, points in MANUFACTURING_POLLUTION.items()) * (0.75 if green else 1.0)
+    pollution = pollution - count("subway") * (70 if green else 45)
+    pollution = pollution - count("recycling_center") * (75 if "recycling_initiative" in projects else 70)
+    pollution = np.maximum(pollution, 0)
+
+    # Disease and crime rates (%), both kept within 0-100
+    base_population = infra * 100
+    density = np.divide(base_population, land, out=np.zeros_like(base_population), where=land > 0)
+    hospital_effect = 3.5 if "clinical_research_center" in projects else 2.5
+    police_effect = 3.5 if "specialized_police_training_program" in projects else 2.5
+    disease = (((density ** 2) * 0.01) - 25) / 100 + base_population / 100000 + pollution * 0.05 - count("hospital") * hospital_effect
+    disease = np.clip(disease, 0, 100)
+    crime = ((103 - commerce) ** 2 + infra * 100) / 111111 - count("police_station") * police_effect
+    crime = np.clip(crime, 0, 100)
+
+    # Population after disease and crime deaths, grown by city age
+    if ages is None:
+        ages = city_ages(cities, as_of)
+    disease_deaths = disease * infra
+    crime_deaths = np.maximum((crime / 10) * (100 * infra) - 25, 0)
+    population = (base_population - disease_deaths - crime_deaths) * age_modifier(ages)
+
+    # Daily production from raw, food and manufacturing improvements
+    production = {resource: count(building) * 3 for resource, building in RAW_OUTPUT.items()}
+    if "uranium_enrichment_program" in projects:
+        production["uranium"] = production["uranium"] * 2
+    production["food"] = count("farm") * (land / (400 if "mass_irrigation" in projects else 500))
+    for resource, (building, output, project, boost) in MANUFACTURED_OUTPUT.items():
+        production[resource] = count(building) * output * (boost if project in projects else 1)
+
+    return {
+        "commerce": commerce,
+        "pollution": pollution,
+        "disease": disease,
+        "crime": crime,
+        "population": population,
+        "production": production,
+    }
+
+def age_modifier(ages) -> np.ndarray:
+    """Get the population growth from city age in days."""
+    return 1 + np.maximum(np.log(np.maximum(ages, 1)) / 15, 0)
+
+def gross_income(commerce, population) -> np.ndarray:
+    """Get daily gross income from commerce (%) and population."""
+    return ((np.asarray(commerce) / 50) * 0.725 + 0.725) * population
+
+def totals(economy: Dict[str, np.ndarray]) -> Dict[str, float]:
+    """Sum daily production over every city."""
+    return {resource: float(values.sum()) for resource, values in economy["production"].items()}
@@ -0,0 +1,116 @@
+import asyncio
+import os
+import sqlite3
+import time
+from typing import Dict, List, Optional, Tuple
+
+from bot import calculate
+from bot import data as get_data
+from bot.handler import info
+from bot.queries import RESOURCES
+
+# Resources that move through the bank, in table order
+BALANCE = RESOURCES[:-1]
+
+# Bumped whenever the way records are counted changes, so stored totals are rebuilt
+VERSION = 2
+
+class BankLedger:
+    """Running bank totals per nation, kept on disk in SQLite.
+
+    Each nation has a cursor at the highest bank record ID already counted.
+    A lookup only fetches records past the cursor and adds them to the stored
+    totals with ``calculate.balance``, so a nation's full history is fetched
+    once and never replayed.
+    """
+
+    def __init__(self, path: str = "data/ledger.sqlite"):
+        self.path = path
+        self.accounts: Dict[int, Dict] = {}
+        self._db: Optional[sqlite3.Connection] = None
+
+    def open(self, path: Optional[str] = None) -> None:
+        """Open the database and load every account into memory."""
+        if path:
+            self.path = path
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        self._db = sqlite3.connect(self.path, check_same_thread=False)
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS accounts (nation_id INTEGER PRIMARY KEY, cursor INTEGER, "
+            f"records INTEGER, updated_at REAL, {', '.join(f'{resource} REAL' for resource in BALANCE)})"
+        )
+        self._db.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)")
+
+        # Totals counted by an older version are dropped and refetched from the start
+        row = self._db.execute("SELECT value FROM meta WHERE key = 'version'").fetchone()
+        if row is None or row[0] != str(VERSION):
+            self._db.execute("DELETE FROM accounts")
+            self._db.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('version', ?)", (str(VERSION),))
+        self._db.commit()
+
+        columns = ("nation_id", "cursor", "records", "updated_at", *BALANCE)
+        cursor = self._db.execute(f"SELECT {', '.join(columns)} FROM accounts")
+        self.accounts = {row[0]: dict(zip(columns, row)) for row in cursor}
+        info(f"Loaded bank ledger with {len(self.accounts):,} accounts from {self.path}", tag="LEDGER")
+
+    def close(self) -> None:
+        """Close the database."""
+        if self._db is not None:
+            self._db.close()
+            self._db = None
+
+    def get(self, nation_id: int) -> Optional[Dict]:
+        """Get a nation's account: its cursor, record count and totals."""
+        return self.accounts.get(int(nation_id))
+
+    def ingest(self, nation_id: int, records: List[Dict]) -> Dict:
+        """Add bank records past the nation's cursor to its totals in memory."""
+        nation_id = int(nation_id)
+        account = self.accounts.get(nation_id) or {
+            "nation_id": nation_id, "cursor": 0, "records": 0, "updated_at": None,
+            **{resource: 0 for resource in BALANCE},
+        }
+        new = [record for record in records if int(record.get("id", 0)) > account["cursor"]]
+        if new:
+            account.update(calculate.balance({"id": nation_id, "bankrecs": new}, account))
+            account["cursor"] = max(int(record["id"]) for record in new)
+            account["records"] += len(new)
+        account["updated_at"] = time.time()
+        self.accounts[nation_id] = account
+        return account
+
+    def _write(self, account: Dict) -> None:
+        if self._db is None:
+            self.open()
+        columns = ("nation_id", "cursor", "records", "updated_at", *BALANCE)
+        self._db.execute(
+            f"INSERT OR REPLACE INTO accounts ({', '.join(columns)}) VALUES ({', '.join('?' for _ in columns)})",
+            tuple(account[column] for column in columns)
+        )
+        self._db.commit()
+
+    async def sync(self, nation_id: int, api_key: str) -> Tuple[Optional[Dict], Optional[Dict], int]:
+        """Fetch only a nation's new bank records and update its account.
+
+        Returns the nation header, the updated account and how many records
+        were fetched, or ``(None, None, 0)`` if the nation was not found.
+        Raises APIError if the records could not be fetched.
+        """
+        account = self.get(nation_id)
+        min_id = account["cursor"] + 1 if account else None
+        nation = await get_data.GET_BANK_RECORDS(nation_id, api_key, min_id)
+        if not nation:
+            return None, None, 0
+        records = nation.get("bankrecs") or []
+        account = self.ingest(nation_id, records)
+        # Write a copy off the event loop, a later sync may change the account meanwhile
+        await asyncio.to_thread(self._write, dict(account))
+        return nation, account, len(records)
+
+    @staticmethod
+    def balance(account: Dict) -> Dict[str, float]:
+        """Get the resource totals of an account."""
+        return {resource: account[resource] for resource in BALANCE}
+
+# Create a global ledger instance
+ledger = BankLedger()
@@ -24,6 +24,14 @@ import vars as vars
 import db as dataBase
 from handler import debug, info, success, warning, error, fatal, missing_data, latency_check
 from utils.config import config
+# Imported through the package so main and the cogs share one client instance
+from bot.api import client as api_client
+from bot.data import nation_cache
+from bot.snapshot import snapshot
+from bot.ledger import ledger
+from bot.plans import plan_memo
+from bot.audits import audit_store
+from bot.ratelimit import limiter, current_command
 
 # Constants
 BOT_TOKEN = os.getenv("BOT_TOKEN")
@@ -34,12 +42,87 @@ ALLIANCE_ID = os.getenv("ALLIANCE_ID")
 COSTS = vars.COSTS
 MILITARY_COSTS = vars.MILITARY_COSTS
 
+class CommandTree(app_commands.CommandTree):
+    """Command tree that tags API usage with the slash command being run."""
+
+    async def interaction_check(self, interaction: discord.Interaction) -> bool:
+        if interaction.command is not None:
+            current_command.set(interaction.command.qualified_name)
+        return True
+
+class Bot(commands.Bot):
+    """Bot that owns the shared API connection pool, nation snapshot, bank ledger, plan memo and audit store."""
+
+    async def setup_hook(self):
+        """Open the API connection pool and start the snapshot refresh before connecting to Discord."""
+        await api_client.start(
+            pool_size=config.API_POOL_SIZE,
+            keepalive=config.API_KEEPALIVE,
+            http2=config.API_HTTP2
+        )
+        nation_cache.ttl = config.NATION_CACHE_TTL
+        limiter.configure(config.API_RATE_PER_MINUTE, config.API_RATE_BURST)
+
+        try:
+            snapshot.open(config.SNAPSHOT_PATH)
+        except Exception as e:
+            error(f"Error loading nation snapshot: {e}", tag="SNAPSHOT")
+        self.snapshot_task = self.loop.create_task(
+            snapshot.run(config.API_KEY, config.SNAPSHOT_REFRESH_MINUTES * 60)
+        )
+        info(f"Started nation snapshot refresh every {config.SNAPSHOT_REFRESH_MINUTES:g} minutes", tag="SNAPSHOT")
+
+        try:
+            ledger.open(config.LEDGER_PATH)
+        except Exception as e:
+            error(f"Error loading bank ledger: {e}", tag="LEDGER")
+
+        try:
+            plan_memo.open(config.PLANS_PATH)
+        except Exception as e:
+            error(f"Error loading build plans: {e}", tag="PLANS")
+        self.plans_task = self.loop.create_task(
+            plan_memo.run(config.PLANS_REFRESH_MINUTES * 60, config.PLANS_TIERS)
+        )
+
+        try:
+            audit_store.open(config.AUDITS_PATH)
+        except Exception as e:
+            error(f"Error loading audit runs: {e}", tag="AUDIT")
+
+    async def close(self):
+        """Stop the background tasks and close the API connection pool on shutdown."""
+        if getattr(self, 'snapshot_task', None):
+            self.snapshot_task.cancel()
+        if getattr(self, 'plans_task', None):
+            self.plans_task.cancel()
+        snapshot.close()
+        ledger.close()
+        plan_memo.close()
+        audit_store.close()
+        try:
+            await api_client.close()
+            timing = api_client.timing_summary()
+            info(
+                f"API pool closed after {timing['calls']} calls "
+                f"(new: {timing['avg_new_ms']:,.1f}ms avg, reused: {timing['avg_reused_ms']:,.1f}ms avg)",
+                tag="API"
+            )
+        except Exception as e:
+            error(f"Error closing API connection pool: {e}", tag="API")
+        await super().close()
+
 # Initialize bot with intents
 intents = discord.Intents.default()
 intents.message_content = True
-bot = commands.Bot(command_prefix="!", intents=intents)
+bot = Bot(command_prefix="!", intents=intents, tree_cls=CommandTree)
 bot.config = config  # Add config to bot instance
 
+@bot.before_invoke
+async def track_command(ctx):
+    """Tag API usage with the prefix command being run."""
+    current_command.set(ctx.command.qualified_name)
+
 GUILD_ID = 1279582264568713308  # Provided guild/server ID
 GUILD_OBJECT = discord.Object(id=GUILD_ID)
 
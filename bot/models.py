@@ -0,0 +1,197 @@
+import copy
+from operator import attrgetter, itemgetter
+from typing import Dict, Iterable, List, Optional, Sequence, Union
+
+import numpy as np
+
+from bot.queries import BUILDINGS, MINES, RESOURCES, UNITS
+
+# Buildings kept per city, including ones not every query selects
+OPTIONAL_BUILDINGS = MINES
+CITY_BUILDINGS = (*BUILDINGS, *OPTIONAL_BUILDINGS)
+BUILDING_INDEX = {building: index for index, building in enumerate(CITY_BUILDINGS)}
+
+# Scalar fields kept per nation and their defaults when the API leaves them out
+NATION_FIELDS = {
+    "id": 0, "nation_name": "", "leader_name": "", "alliance_position": "", "discord": "",
+    "continent": "", "color": "", "flag": "", "last_active": "", "score": 0.0, "population": 0,
+    "defensive_wars_count": 0, "offensive_wars_count": 0, "spies": 0,
+    **{unit: 0 for unit in UNITS}, **{resource: 0 for resource in RESOURCES},
+}
+
+class CityTable:
+    """Cities stored column by column instead of one dict per city.
+
+    Infrastructure and land are float64 arrays and building counts share one
+    uint8 matrix with a column per building in ``CITY_BUILDINGS``. Slicing a
+    table gives a view over the same arrays, which is how a ``Roster`` hands
+    each nation its own cities without copying them.
+    """
+
+    __slots__ = ("ids", "names", "dates", "infrastructure", "land", "buildings")
+
+    def __init__(self, cities: Iterable[Dict] = ()):
+        cities = list(cities)
+
+        # Read the buildings the payload selects with one itemgetter call per city into
+        # one flat list, looking them up one by one only for cities that lack some. A
+        # flat list of ints holds no per-city containers for the garbage collector,
+        # and bytes() packs it into the uint8 matrix's buffer in one pass.
+        selected = [building for building in CITY_BUILDINGS if cities and building in cities[0]]
+        counts: List[int] = []
+        if selected:
+            read_buildings = itemgetter(*selected) if len(selected) > 1 else lambda city: (city[selected[0]],)
+            add = counts.extend
+            for city in cities:
+                try:
+                    add(read_buildings(city))
+                except KeyError:
+                    add([city.get(building) or 0 for building in selected])
+
+        # Many cities share a founding date, so keep one copy of each string
+        dates = [city.get("date", "2025-01-01") for city in cities]
+        self.ids = np.array([int(city.get("id") or 0) for city in cities], dtype=np.int64)
+        self.names = [city.get("name", "Unknown") for city in cities]
+        self.dates = list(map({date: date for date in dates}.__getitem__, dates))
+        self.infrastructure = np.array([city.get("infrastructure", 0) for city in cities], dtype=np.float64)
+        self.land = np.array([city.get("land", 0) for city in cities], dtype=np.float64)
+        self.buildings = np.zeros((len(cities), len(CITY_BUILDINGS)), dtype=np.uint8)
+        if selected:
+            self.buildings[:, [BUILDING_INDEX[building] for building in selected]] = np.frombuffer(
+                bytes(counts), dtype=np.uint8
+            ).reshape(len(cities), len(selected))
+
+    @classmethod
+    def _view(cls, table: "CityTable", start: int, stop: int) -> "CityTable":
+        view = cls.__new__(cls)
+        view.ids = table.ids[start:stop]
+        view.names = table.names[start:stop]
+        view.dates = table.dates[start:stop]
+        view.infrastructure = table.infrastructure[start:stop]
+        view.land = table.land[start:stop]
+        view.buildings = table.buildings[start:stop]
+        return view
+
+    def take(self, indices: np.ndarray) -> "CityTable":
+        """Get a new table with copies of the cities at ``indices``."""
+        table = CityTable.__new__(CityTable)
+        table.ids = self.ids[indices]
+        table.names = [self.names[index] for index in indices.tolist()]
+        table.dates = [self.dates[index] for index in indices.tolist()]
+        table.infrastructure = self.infrastructure[indices]
+        table.land = self.land[indices]
+        table.buildings = self.buildings[indices]
+        return table
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def __getitem__(self, key: Union[str, slice]) -> Union[np.ndarray, "CityTable"]:
+        """Get a column by name, or a view over a slice of the cities."""
+        if isinstance(key, slice):
+            start, stop, _ = key.indices(len(self))
+            return CityTable._view(self, start, stop)
+        if key == "infrastructure":
+            return self.infrastructure
+        if key == "land":
+            return self.land
+        return self.buildings[:, BUILDING_INDEX[key]]
+
+    def total(self, column: str) -> float:
+        """Sum a column over every city."""
+        values = self[column]
+        return float(values.sum()) if values.dtype.kind == "f" else int(values.sum(dtype=np.int64))
+
+    def count(self, index: int, building: str) -> int:
+        """Get how many of a building one city has."""
+        return int(self.buildings[index, BUILDING_INDEX[building]])
+
+    def short_of(self, requirements: Dict[str, int]) -> np.ndarray:
+        """Get the indices of cities with fewer of any building than required."""
+        columns = [BUILDING_INDEX[building] for building in requirements]
+        minimums = np.array(list(requirements.values()), dtype=np.int64)
+        return np.flatnonzero((self.buildings[:, columns] < minimums).any(axis=1))
+
+class Nation:
+    """One nation's scalar fields, with its cities in a shared ``CityTable``."""
+
+    __slots__ = (*NATION_FIELDS, "alliance_id", "alliance_name", "_table", "_start", "_stop")
+
+    def __init__(self, data: Dict, table: Optional[CityTable] = None, start: int = 0, stop: int = 0):
+        for field, default in NATION_FIELDS.items():
+            value = data.get(field)
+            setattr(self, field, default if value is None else value)
+        self.id = int(self.id)
+        alliance = data.get("alliance") or {}
+        self.alliance_id = int(data.get("alliance_id") or alliance.get("id") or 0)
+        self.alliance_name = alliance.get("name", "")
+        self._table = table
+        self._start = start
+        self._stop = stop
+
+    @property
+    def cities(self) -> CityTable:
+        """Get a view over this nation's cities."""
+        if self._table is None:
+            return CityTable()
+        return self._table[self._start:self._stop]
+
+    @property
+    def num_cities(self) -> int:
+        return self._stop - self._start
+
+class Roster:
+    """Nations parsed from one API fetch, with every city in one ``CityTable``.
+
+    Built once per fetch so calculators can read typed columns instead of
+    walking the raw JSON for each check.
+    """
+
+    __slots__ = ("nations", "cities", "offsets")
+
+    def __init__(self, nations: Iterable[Dict] = ()):
+        nations = list(nations)
+        sizes = [len(nation.get("cities") or []) for nation in nations]
+        self.cities = CityTable(city for nation in nations for city in nation.get("cities") or [])
+        self.offsets = np.concatenate(([0], np.cumsum(sizes, dtype=np.int64)))
+        self.nations: List[Nation] = [
+            Nation(nation, self.cities, int(self.offsets[index]), int(self.offsets[index + 1]))
+            for index, nation in enumerate(nations)
+        ]
+
+    def __len__(self) -> int:
+        return len(self.nations)
+
+    def __iter__(self):
+        return iter(self.nations)
+
+    def column(self, field: str) -> np.ndarray:
+        """Get a nation field for every nation as a float64 array."""
+        return np.array([getattr(nation, field) for nation in self.nations], dtype=np.float64)
+
+    def columns(self, fields: Sequence[str]) -> np.ndarray:
+        """Get several nation fields for every nation as one nations x fields float64 array."""
+        read = attrgetter(*fields)
+        return np.array([read(nation) for nation in self.nations], dtype=np.float64).reshape(len(self.nations), len(fields))
+
+    def owners(self) -> np.ndarray:
+        """Get the index of the nation owning each city."""
+        return np.repeat(np.arange(len(self.nations)), np.diff(self.offsets))
+
+    def select(self, indices: Sequence[int]) -> "Roster":
+        """Get a roster with only the nations at ``indices``, in that order."""
+        indices = np.asarray(indices, dtype=np.int64)
+        sizes = np.diff(self.offsets)[indices]
+        starts = self.offsets[:-1][indices]
+        offsets = np.concatenate(([0], np.cumsum(sizes, dtype=np.int64)))
+        cities = np.repeat(starts - offsets[:-1], sizes) + np.arange(offsets[-1])
+
+        roster = Roster.__new__(Roster)
+        roster.cities = self.cities.take(cities)
+        roster.offsets = offsets
+        roster.nations = []
+        for position, index in enumerate(indices.tolist()):
+            nation = copy.copy(self.nations[index])
+            nation._table, nation._start, nation._stop = roster.cities, int(offsets[position]), int(offsets[position + 1])
+            roster.nations.append(nation)
+        return roster
@@ -0,0 +1,283 @@
+from functools import lru_cache
+from typing import Dict, FrozenSet, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from bot import economics
+from bot import vars as vars
+from bot.models import CityTable
+
+# Improvements the solver enumerates instead of packing into the knapsack
+COMMERCE_BUILDINGS = ("supermarket", "bank", "shopping_mall", "stadium", "subway")
+MILITARY_BUILDINGS = ("barracks", "factory", "hangar", "drydock")
+
+# Inputs each manufacturing improvement uses per day, and whether its project boost scales them
+MANUFACTURING_INPUTS = {
+    "oil_refinery": ({"oil": 3}, True),
+    "steel_mill": ({"iron": 3, "coal": 3}, True),
+    "aluminum_refinery": ({"bauxite": 3}, True),
+    "munitions_factory": ({"lead": 6}, False),
+}
+# Improvements whose upkeep Green Technologies cuts by 10%
+RESOURCE_BUILDINGS = frozenset((*economics.RAW_OUTPUT.values(), *MANUFACTURING_INPUTS))
+
+# Nuclear plants power 2,000 infrastructure each and burn 2.4 uranium a day per 1,000
+NUCLEAR_CAPACITY = 2000
+NUCLEAR_URANIUM = 2.4 / 1000
+
+def upkeep(building: str, projects: FrozenSet[str]) -> float:
+    """Get the daily upkeep of one improvement."""
+    cost = vars.COSTS.get(building, vars.MINE_COSTS.get(building, 0)) * 12
+    if building in RESOURCE_BUILDINGS and "green_technologies" in projects:
+        cost *= 0.9
+    return cost
+
+def production_items(
+    land: float,
+    continent: Optional[str],
+    projects: FrozenSet[str],
+    prices: Dict[str, float]
+) -> List[Tuple[str, float, int, int]]:
+    """Get (building, net daily value, pollution, cap) for the improvements the knapsack picks.
+
+    Manufactured goods are valued net of their inputs at market price, so
+    inputs the city does not mine itself are treated as bought. Recycling
+    centers only change pollution, so they are picked here too.
+    """
+    caps = economics.caps(projects)
+    green = "green_technologies" in projects
+    items = []
+    for resource in economics.continent_resources(continent):
+        building = economics.RAW_OUTPUT[resource]
+        output = 6 if resource == "uranium" and "uranium_enrichment_program" in projects else 3
+        items.append((building, output * prices[resource] - upkeep(building, projects), economics.POLLUTION[building], caps[building]))
+
+    food = land / (400 if "mass_irrigation" in projects else 500)
+    items.append(("farm", food * prices["food"] - upkeep("farm", projects), 1 if green else 2, caps["farm"]))
+
+    for resource, (building, output, project, boost) in economics.MANUFACTURED_OUTPUT.items():
+        boost = boost if project in projects else 1
+        inputs, scaled = MANUFACTURING_INPUTS[building]
+        cost = sum(amount * prices[name] for name, amount in inputs.items()) * (boost if scaled else 1)
+        points = int(economics.MANUFACTURING_POLLUTION[building] * (0.75 if green else 1))
+        items.append((building, output * boost * prices[resource] - cost - upkeep(building, projects), points, caps[building]))
+    items = [item for item in items if item[1] > 0]
+
+    recycling = -(75 if "recycling_initiative" in projects else 70)
+    items.append(("recycling_center", -upkeep("recycling_center", projects), recycling, caps["recycling_center"]))
+    return items
+
+def knapsack(items: List[Tuple[str, float, int, int]], slots: int) -> Tuple[np.ndarray, List[np.ndarray], int]:
+    """Get the best value for each slot budget and exact pollution.
+
+    ``best[s, p - low]`` is the most value from at most ``s`` slots whose
+    pollution is exactly ``p``, where ``low`` is the lowest pollution the
+    items can reach. Each array in ``choices`` holds how many of that item
+    the best entry uses, for walking the solution back.
+    """
+    low = sum(min(points, 0) * cap for _, _, points, cap in items)
+    high = sum(max(points, 0) * cap for _, _, points, cap in items)
+    width = high - low + 1
+    best = np.full((slots + 1, width), -np.inf)
+    best[:, -low] = 0
+    choices = []
+    for _, value, points, cap in items:
+        previous = best
+        best = previous.copy()
+        chosen = np.zeros(best.shape, dtype=np.uint8)
+        for count in range(1, min(cap, slots) + 1):
+            shift = count * points
+            source = previous[:-count, max(-shift, 0):width - max(shift, 0)] + count * value
+            target = best[count:, max(shift, 0):width + min(shift, 0)]
+            better = source > target
+            target[better] = source[better]
+            chosen[count:, max(shift, 0):width + min(shift, 0)][better] = count
+        choices.append(chosen)
+    return best, choices, low
+
+def breakpoints(row: np.ndarray) -> np.ndarray:
+    """Get the indices where a row's best value first rises."""
+    running = np.maximum.accumulate(row)
+    keep = np.empty(len(row), dtype=bool)
+    keep[0] = np.isfinite(row[0])
+    keep[1:] = row[1:] > running[:-1]
+    return np.flatnonzero(keep)
+
+@lru_cache(maxsize=64)
+def combos(projects: FrozenSet[str]) -> Dict[str, np.ndarray]:
+    """Get every useful mix of commerce improvements, police and hospitals.
+
+    Commerce mixes with the same slots and capped commerce only differ in
+    pollution and upkeep, so any mix with no less of both than another is
+    dropped before pairing the rest with every police and hospital count.
+    """
+    caps = economics.caps(projects)
+    grids = np.meshgrid(*(np.arange(caps[name] + 1) for name in COMMERCE_BUILDINGS), indexing="ij")
+    counts = np.stack([grid.ravel() for grid in grids], axis=1)
+    column = {name: counts[:, index].astype(np.float64) for index, name in enumerate(COMMERCE_BUILDINGS)}
+
+    commerce = sum(column[name] * economics.COMMERCE[name] for name in COMMERCE_BUILDINGS)
+    commerce = commerce + (
+        1 * ("international_trade_center" in projects)
+        + 2 * ("telecommunications_satellite" in projects)
+        + 4 * ("specialized_police_training_program" in projects)
+    )
+    commerce = np.minimum(commerce, economics.max_commerce(projects))
+    pollution = (
+        column["shopping_mall"] * economics.POLLUTION["shopping_mall"]
+        + column["stadium"] * economics.POLLUTION["stadium"]
+        - column["subway"] * (70 if "green_technologies" in projects else 45)
+    )
+    cost = sum(column[name] * upkeep(name, projects) for name in COMMERCE_BUILDINGS)
+    slots = counts.sum(axis=1)
+
+    # Sort each group by upkeep and keep mixes that lower the group's best pollution
+    group = np.unique(np.stack((slots, commerce), axis=1), axis=0, return_inverse=True)[1].ravel()
+    order = np.lexsort((pollution, cost, group))
+    span = pollution.max() - pollution.min() + 1
+    shifted = pollution[order] - group[order] * span
+    keep = np.ones(len(order), dtype=bool)
+    keep[1:] = shifted[1:] < np.minimum.accumulate(shifted)[:-1]
+    order = order[keep]
+
+    police, hospitals = np.meshgrid(
+        np.arange(caps["police_station"] + 1), np.arange(caps["hospital"] + 1), indexing="ij"
+    )
+    police, hospitals = police.ravel(), hospitals.ravel()
+    mix, civil = np.repeat(order, len(police)), np.tile(np.arange(len(police)), len(order))
+    return {
+        "counts": counts[mix],
+        "police": police[civil],
+        "hospitals": hospitals[civil],
+        "slots": slots[mix] + police[civil] + hospitals[civil],
+        "commerce": commerce[mix],
+        "pollution": pollution[mix] + police[civil] * economics.POLLUTION["police_station"]
+                     + hospitals[civil] * economics.POLLUTION["hospital"],
+        "upkeep": cost[mix] + police[civil] * upkeep("police_station", projects)
+                  + hospitals[civil] * upkeep("hospital", projects),
+    }
+
+def solve(
+    infra: float,
+    land: float,
+    continent: Optional[str],
+    projects: Iterable[str] = (),
+    military: Optional[Dict[str, int]] = None,
+    age: float = 365,
+    prices: Optional[Dict[str, float]] = None
+) -> Optional[Tuple[Dict[str, int], float]]:
+    """Find the improvements that maximize a city's net daily revenue.
+
+    Military improvements are fixed and the city is powered by nuclear plants.
+    Production and recycling are chosen by an exact knapsack over slots and
+    pollution. Each commerce, police and hospital mix is then scored against
+    the best knapsack value at every pollution level, with pollution, disease
+    and crime costing population through the economics formulas. Returns the
+    improvement counts and the net revenue, or None if the fixed improvements
+    do not fit.
+    """
+    projects = frozenset(projects)
+    prices = prices or vars.RESOURCE_PRICES
+    caps = economics.caps(projects)
+    military = {building: max(0, min(caps[building], (military or {}).get(building, 0))) for building in MILITARY_BUILDINGS}
+    nuclear = -(-int(infra) // NUCLEAR_CAPACITY)
+    free = int(infra // 50) - nuclear - sum(military.values())
+    if free < 0:
+        return None
+
+    items = production_items(land, continent, projects, prices)
+    best, choices, low = knapsack(items, free)
+    mixes = combos(projects)
+    feasible = np.flatnonzero(mixes["slots"] <= free)
+
+    # Terms that depend only on the mix
+    base_population = infra * 100
+    density = base_population / land if land else 0
+    base_disease = (((density ** 2) * 0.01) - 25) / 100 + base_population / 100000
+    hospital_effect = 3.5 if "clinical_research_center" in projects else 2.5
+    police_effect = 3.5 if "specialized_police_training_program" in projects else 2.5
+    commerce = mixes["commerce"][feasible]
+    crime = np.clip(((103 - commerce) ** 2 + infra * 100) / 111111 - mixes["police"][feasible] * police_effect, 0, 100)
+    crime_deaths = np.maximum((crime / 10) * base_population - 25, 0)
+    rate = ((commerce / 50) * 0.725 + 0.725) * float(economics.age_modifier(age))
+    offset = base_disease - mixes["hospitals"][feasible] * hospital_effect
+    shift = mixes["pollution"][feasible]
+    fixed = rate * (base_population - crime_deaths) - mixes["upkeep"][feasible]
+
+    # Disease is flat until pollution reaches ``start``, linear up to ``stop`` where
+    # it hits 100, then flat again, so each mix only needs the best knapsack value
+    # in each of those ranges
+    start = -shift + np.maximum(-offset, 0) / 0.05
+    stop = -shift + (100 - offset) / 0.05
+    score = np.full(len(feasible), -np.inf)
+    slots = free - mixes["slots"][feasible]
+    for budget in np.unique(slots).tolist():
+        rows = np.flatnonzero(slots == budget)
+        points = breakpoints(best[budget])
+        value, pollution = best[budget, points], points + low
+        cost = rate[rows] * infra
+
+        first = np.searchsorted(pollution, start[rows], side="right")
+        flat = np.where(first > 0, value[np.maximum(first - 1, 0)], -np.inf) - cost * np.clip(offset[rows], 0, 100)
+
+        rates, group = np.unique(rate[rows], return_inverse=True)
+        tilted = value[None, :] - rates[:, None] * infra * 0.05 * pollution[None, :]
+        suffix = np.maximum.accumulate(tilted[:, ::-1], axis=1)[:, ::-1]
+        suffix = np.hstack((suffix, np.full((len(rates), 1), -np.inf)))
+        linear = suffix[group.ravel(), first] - cost * (offset[rows] + 0.05 * shift[rows])
+
+        last = np.searchsorted(pollution, stop[rows], side="left")
+        capped = np.where(last < len(points), value[-1], -np.inf) - cost * 100
+
+        score[rows] = fixed[rows] + np.maximum(np.maximum(flat, linear), capped)
+
+    winner = int(np.argmax(score))
+    if not np.isfinite(score[winner]):
+        return None
+
+    # Find the knapsack pollution the winning mix used
+    budget = int(slots[winner])
+    points = breakpoints(best[budget])
+    disease = np.clip(offset[winner] + 0.05 * np.maximum(points + low + shift[winner], 0), 0, 100)
+    index = int(points[np.argmax(best[budget, points] - rate[winner] * infra * disease)])
+
+    mix = feasible[winner]
+    plan = {building: 0 for building in economics.PLAN_BUILDINGS.values()}
+    plan.update(military)
+    plan["nuclear_power"] = nuclear
+    plan.update(zip(COMMERCE_BUILDINGS, mixes["counts"][mix].tolist()))
+    plan["police_station"] = int(mixes["police"][mix])
+    plan["hospital"] = int(mixes["hospitals"][mix])
+    for (building, _, points, _), chosen in zip(reversed(items), reversed(choices)):
+        count = int(chosen[budget, index])
+        plan[building] = count
+        budget -= count
+        index -= count * points
+    power = nuclear * upkeep("nuclear_power", projects) + infra * NUCLEAR_URANIUM * prices["uranium"]
+    return plan, float(score[winner] - power)
+
+def revenue(
+    buildings: Dict[str, int],
+    infra: float,
+    land: float,
+    projects: Iterable[str] = (),
+    age: float = 365,
+    prices: Optional[Dict[str, float]] = None
+) -> float:
+    """Get a city's net daily revenue from its improvements, valued at ``prices``."""
+    projects = frozenset(projects)
+    prices = prices or vars.RESOURCE_PRICES
+    table = CityTable([{**buildings, "infrastructure": infra, "land": land}])
+    economy = economics.evaluate(table, projects, ages=np.array([age], dtype=np.float64))
+
+    income = float(economics.gross_income(economy["commerce"], economy["population"])[0])
+    produced = sum(float(values[0]) * prices[resource] for resource, values in economy["production"].items())
+    consumed = 0.0
+    for resource, (building, _, project, boost) in economics.MANUFACTURED_OUTPUT.items():
+        inputs, scaled = MANUFACTURING_INPUTS[building]
+        scale = boost if scaled and project in projects else 1
+        consumed += buildings.get(building, 0) * scale * sum(amount * prices[name] for name, amount in inputs.items())
+    if buildings.get("nuclear_power"):
+        consumed += infra * NUCLEAR_URANIUM * prices["uranium"]
+    costs = sum(count * upkeep(building, projects) for building, count in buildings.items())
+    return income + produced - consumed - costs
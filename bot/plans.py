@@ -0,0 +1,213 @@
+import asyncio
+import json
+import os
+import sqlite3
+import time
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from bot import economics
+from bot import planner
+from bot import vars as vars
+from bot.handler import info, error
+from bot.ratelimit import current_command
+
+# Infrastructure targets solved ahead of time for every known setup
+DEFAULT_TIERS = tuple(range(1000, 4001, 250))
+
+def signature() -> str:
+    """Get a fingerprint of the prices and upkeep plans are valued with."""
+    return json.dumps([vars.RESOURCE_PRICES, vars.COSTS, vars.MINE_COSTS], sort_keys=True)
+
+def make_setup(
+    land: float,
+    continent: Optional[str],
+    projects: Iterable[str],
+    military: Dict[str, int],
+    age: float
+) -> Dict:
+    """Normalize everything but the infrastructure target that decides a plan.
+
+    Land is rounded to a whole acre and city age to whole years, so setups
+    that would get the same plan share a key.
+    """
+    return {
+        "land": int(round(land)),
+        "continent": economics.continent_code(continent),
+        "projects": sorted(set(projects) & set(economics.PROJECTS)),
+        "military": [int(military.get(building) or 0) for building in planner.MILITARY_BUILDINGS],
+        "years": int(age // 365),
+    }
+
+def slot_infra(infra: float) -> int:
+    """Round infrastructure down to a whole improvement slot, so targets with the same slots share a plan."""
+    return int(infra) // 50 * 50
+
+def setup_age(setup: Dict) -> float:
+    """Get the city age in days a setup is solved at, the middle of its year."""
+    return setup["years"] * 365 + 182
+
+def setup_key(setup: Dict) -> str:
+    """Get the key a setup is stored under."""
+    return "|".join((
+        str(setup["land"]), setup["continent"], ",".join(setup["projects"]),
+        ",".join(map(str, setup["military"])), str(setup["years"]),
+    ))
+
+class PlanMemo:
+    """Optimal build plans kept on disk in SQLite, keyed by the inputs that decide them.
+
+    A plan only depends on the infrastructure target, land, continent,
+    projects, military improvements and city age, so identical requests
+    share one entry. Every setup /build is asked about is remembered and a
+    background task solves the common infrastructure tiers for each of
+    them, so most requests are a dict lookup. Anything else is solved live
+    and saved for next time. Plans are dropped when prices or upkeep change.
+    """
+
+    def __init__(self, path: str = "data/plans.sqlite"):
+        self.path = path
+        self.plans: Dict[str, Optional[Tuple[Dict[str, int], float]]] = {}
+        self.setups: Dict[str, Dict] = {}
+        self.hits = 0
+        self.misses = 0
+        self._db: Optional[sqlite3.Connection] = None
+
+    def open(self, path: Optional[str] = None) -> None:
+        """Open the database and load every plan and setup into memory."""
+        if path:
+            self.path = path
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        self._db = sqlite3.connect(self.path, check_same_thread=False)
+        self._db.execute("CREATE TABLE IF NOT EXISTS plans (key TEXT PRIMARY KEY, plan TEXT, revenue REAL)")
+        self._db.execute("CREATE TABLE IF NOT EXISTS setups (key TEXT PRIMARY KEY, setup TEXT, seen_at REAL)")
+        self._db.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)")
+
+        row = self._db.execute("SELECT value FROM meta WHERE key = 'signature'").fetchone()
+        if row is None or row[0] != signature():
+            self._db.execute("DELETE FROM plans")
+            self._db.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('signature', ?)", (signature(),))
+        self._db.commit()
+
+        self.plans = {
+            key: (json.loads(plan), revenue) if plan is not None else None
+            for key, plan, revenue in self._db.execute("SELECT key, plan, revenue FROM plans")
+        }
+        self.setups = {key: json.loads(setup) for key, setup in self._db.execute("SELECT key, setup FROM setups")}
+        info(f"Loaded {len(self.plans):,} build plans for {len(self.setups):,} setups from {self.path}", tag="PLANS")
+
+    def close(self) -> None:
+        """Close the database."""
+        if self._db is not None:
+            self._db.close()
+            self._db = None
+
+    def get(self, infra: float, setup: Dict) -> Optional[Tuple[Dict[str, int], float]]:
+        """Get a saved plan and its revenue, or None if it was never solved or does not fit."""
+        return self.plans.get(f"{slot_infra(infra)}|{setup_key(setup)}")
+
+    def remember(self, setup: Dict) -> str:
+        """Save a setup for precomputing and get its key."""
+        if self._db is None:
+            self.open()
+        key = setup_key(setup)
+        if key not in self.setups:
+            self.setups[key] = setup
+            self._write_setup(key, setup)
+        return key
+
+    def _solve(self, infra: int, setup: Dict) -> Optional[Tuple[Dict[str, int], float]]:
+        return planner.solve(
+            infra, setup["land"], setup["continent"], setup["projects"],
+            dict(zip(planner.MILITARY_BUILDINGS, setup["military"])),
+            age=setup_age(setup)
+        )
+
+    def solve(self, infra: float, setup: Dict) -> Tuple[Optional[Tuple[Dict[str, int], float]], bool]:
+        """Get the plan for a setup, solving and saving it if needed.
+
+        Returns the plan and its revenue (None if it does not fit) and whether
+        it came from the memo. The setup is remembered for precomputing.
+        The plan is solved for ``infra`` rounded down to a whole slot.
+        """
+        infra = slot_infra(infra)
+        plan_key = f"{infra}|{self.remember(setup)}"
+        if plan_key in self.plans:
+            self.hits += 1
+            return self.plans[plan_key], True
+        self.misses += 1
+        result = self._solve(infra, setup)
+        self.plans[plan_key] = result
+        self._write([(plan_key, result)])
+        return result, False
+
+    def missing(self, tiers: Iterable[int] = DEFAULT_TIERS) -> List[Tuple[str, int, Dict]]:
+        """List every known setup and tier that has no saved plan yet."""
+        return [
+            (f"{slot_infra(infra)}|{key}", slot_infra(infra), setup)
+            for key, setup in list(self.setups.items())
+            for infra in tiers
+            if f"{slot_infra(infra)}|{key}" not in self.plans
+        ]
+
+    def _solve_missing(self, missing: List[Tuple[str, int, Dict]]) -> List[Tuple[str, Optional[Tuple[Dict[str, int], float]]]]:
+        # Only solves, so it can run off the event loop without touching shared state
+        return [(plan_key, self._solve(infra, setup)) for plan_key, infra, setup in missing]
+
+    def _save(self, solved: List[Tuple[str, Optional[Tuple[Dict[str, int], float]]]]) -> int:
+        """Keep and write solved plans that were not saved meanwhile, and get how many."""
+        solved = [(plan_key, result) for plan_key, result in solved if plan_key not in self.plans]
+        if solved:
+            self.plans.update(solved)
+            self._write(solved)
+        return len(solved)
+
+    def precompute(self, tiers: Iterable[int] = DEFAULT_TIERS) -> int:
+        """Solve every known setup at every tier that is not saved yet."""
+        if self._db is None:
+            self.open()
+        return self._save(self._solve_missing(self.missing(tiers)))
+
+    def _write(self, plans: List[Tuple[str, Optional[Tuple[Dict[str, int], float]]]]) -> None:
+        if self._db is None:
+            self.open()
+        self._db.executemany(
+            "INSERT OR REPLACE INTO plans (key, plan, revenue) VALUES (?, ?, ?)",
+            [(key, json.dumps(result[0]) if result else None, result[1] if result else None) for key, result in plans]
+        )
+        self._db.commit()
+
+    def _write_setup(self, key: str, setup: Dict) -> None:
+        if self._db is None:
+            self.open()
+        self._db.execute(
+            "INSERT OR REPLACE INTO setups (key, setup, seen_at) VALUES (?, ?, ?)",
+            (key, json.dumps(setup), time.time())
+        )
+        self._db.commit()
+
+    async def run(self, interval: float, tiers: Iterable[int] = DEFAULT_TIERS) -> None:
+        """Precompute missing plans forever, waiting ``interval`` seconds between runs."""
+        current_command.set("plans")
+        tiers = tuple(tiers)
+        while True:
+            try:
+                start = time.time()
+                if self._db is None:
+                    self.open()
+                # Solve in a thread, but read and update the plans and database on the loop only
+                missing = self.missing(tiers)
+                solved = self._save(await asyncio.to_thread(self._solve_missing, missing)) if missing else 0
+                if solved:
+                    info(
+                        f"Precomputed {solved:,} build plans in {time.time() - start:,.1f}s "
+                        f"({len(self.plans):,} saved, {len(self.setups):,} setups)",
+                        tag="PLANS"
+                    )
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                error(f"Error precomputing build plans: {e}", tag="PLANS")
+            await asyncio.sleep(interval)
+
+# Create a global plan memo instance
+plan_memo = PlanMemo()
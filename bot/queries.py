@@ -0,0 +1,91 @@
+from functools import lru_cache
+from typing import Dict, Iterable, Tuple
+
+RESOURCES = (
+    "money", "coal", "oil", "uranium", "iron", "bauxite", "lead",
+    "gasoline", "munitions", "steel", "aluminum", "food", "credits",
+)
+UNITS = ("soldiers", "tanks", "aircraft", "ships")
+BUILDINGS = (
+    "coal_power", "oil_power", "nuclear_power", "wind_power", "farm",
+    "uranium_mine", "iron_mine", "coal_mine", "oil_refinery", "steel_mill",
+    "aluminum_refinery", "munitions_factory", "police_station", "hospital",
+    "recycling_center", "subway", "supermarket", "bank", "shopping_mall",
+    "stadium", "barracks", "factory", "hangar", "drydock",
+)
+# Mines not every query selects, since only some continents can build them
+MINES = ("oil_well", "bauxite_mine", "lead_mine")
+# National projects that change city economics
+PROJECTS = (
+    "green_technologies", "mass_irrigation", "recycling_initiative", "international_trade_center",
+    "telecommunications_satellite", "specialized_police_training_program", "clinical_research_center",
+    "bauxite_works", "iron_works", "arms_stockpile", "emergency_gasoline_reserve", "uranium_enrichment_program",
+)
+
+def nested(prefix: str, fields: Iterable[str]) -> Tuple[str, ...]:
+    """Prefix fields with the path of the object they belong to."""
+    return tuple(f"{prefix}.{field}" for field in fields)
+
+WAR_SIDE = ("id", "nation_name", "leader_name", *UNITS, "alliance.id", "alliance.name")
+WAR_FIELDS = (
+    "id", "war_type", "turns_left", "att_points", "def_points", "att_peace", "def_peace",
+    "att_resistance", "def_resistance", "att_fortify", "def_fortify",
+    "ground_control", "air_superiority", "naval_blockade",
+    *nested("attacker", WAR_SIDE), *nested("defender", WAR_SIDE),
+)
+BANKREC_FIELDS = ("id", "date", "sender_id", "sender_type", "receiver_id", "receiver_type", "note", *RESOURCES[:-1])
+HEADER = ("id", "nation_name", "leader_name", "score", "population", "alliance.id", "alliance.name")
+
+# Fields each caller of GET_NATION_DATA needs, as dotted paths into nested objects
+NATION_FIELDS: Dict[str, Tuple[str, ...]] = {
+    "nation": (
+        "last_active", "flag", "id", "score", "color", "population", "nation_name", "leader_name",
+        *UNITS, *RESOURCES, "continent", "discord", "spies_today", "alliance.id", "alliance.name",
+        *nested("wars", WAR_FIELDS),
+    ),
+    "who": (*HEADER, "color", "continent", "flag", "last_active", *UNITS, *PROJECTS),
+    "income": ("id", "nation_name", "continent", *PROJECTS),
+    "warchest": (
+        "id", "nation_name", "leader_name", *UNITS, *RESOURCES,
+        *nested("cities", ("id", "date", "infrastructure", *BUILDINGS)),
+    ),
+    "chest": ("id", "nation_name", *RESOURCES),
+    "wars": (*HEADER, *UNITS, *nested("wars", WAR_FIELDS)),
+    "build": ("id", "nation_name", "continent", *PROJECTS),
+    "raid": ("id", "nation_name", "score", "alliance.id"),
+    "military": ("id", "nation_name", "leader_name", *UNITS),
+    "mmr": ("id", "nation_name"),
+    "register": ("id", "nation_name", "leader_name"),
+    "counters": ("id", "nation_name", "score"),
+    "purge": ("id", "nation_name", "score", "alliance.id"),
+    "spies": ("id", "spies", "central_intelligence_agency"),
+    "cities": ("id", *nested("cities", ("name", "id", "date", "infrastructure", "land", *BUILDINGS, *MINES))),
+}
+
+def selection(fields: Iterable[str]) -> str:
+    """Build a GraphQL selection set from dotted field paths."""
+    tree: Dict[str, dict] = {}
+    for field in fields:
+        node = tree
+        for part in field.split("."):
+            node = node.setdefault(part, {})
+
+    def render(node: Dict[str, dict]) -> str:
+        return " ".join(f"{name} {{ {render(child)} }}" if child else name for name, child in node.items())
+
+    return render(tree)
+
+@lru_cache(maxsize=None)
+def nation_query(fields: str) -> str:
+    """Get the prebuilt nations query for a registered field set."""
+    return (
+        f"query Nation($id: [Int], $first: Int) {{ nations(id: $id, first: $first) {{ "
+        f"data {{ {selection(NATION_FIELDS[fields])} }} }} }}"
+    )
+
+# Nation header with only the bank records from ``min_id`` on, for the bank ledger
+BANK_QUERY = (
+    "query Bank($id: [Int], $min_id: Int) { nations(id: $id) { data { "
+    f"{selection(HEADER)} bankrecs(min_id: $min_id) {{ {selection(BANKREC_FIELDS)} }} "
+    "} } }"
+)
@@ -0,0 +1,116 @@
+import heapq
+import itertools
+import time
+from typing import AsyncIterable, Awaitable, Callable, Dict, Iterable, List, Optional, Tuple
+
+from bot.score_index import is_open
+
+# Targets stronger than any of these are skipped
+MAX_SOLDIERS = 100000
+MAX_TANKS = 1000
+MAX_AIRCRAFT = 100
+MAX_SHIPS = 50
+
+def score_target(target: Dict) -> Optional[Dict]:
+    """Get a raid entry for a snapshot row, or None if it is not worth hitting."""
+    if not target or not target.get("num_cities"):
+        return None
+
+    soldiers = target.get("soldiers", 0)
+    tanks = target.get("tanks", 0)
+    aircraft = target.get("aircraft", 0)
+    ships = target.get("ships", 0)
+    if soldiers > MAX_SOLDIERS or tanks > MAX_TANKS or aircraft > MAX_AIRCRAFT or ships > MAX_SHIPS:
+        return None
+
+    infra = target.get("infrastructure", 0)
+    income = infra * 2  # Base income per infra
+    return {
+        "id": target.get("id"),
+        "name": target.get("nation_name"),
+        "leader": target.get("leader_name"),
+        "score": float(target.get("score", 0)),
+        "cities": target.get("num_cities"),
+        "infra": infra,
+        "income": income,
+        "profit": income * 0.1,  # 10% loot
+        "soldiers": soldiers,
+        "tanks": tanks,
+        "aircraft": aircraft,
+        "ships": ships,
+    }
+
+class TopTargets:
+    """The ``k`` most profitable raid targets seen so far.
+
+    Targets are pushed one at a time into a min-heap capped at ``k``
+    entries, so a new target only costs O(log k) and memory stays O(k) no
+    matter how many nations are scanned. Ties on profit keep the target
+    seen first, the same order a stable sort of the whole list gives.
+    """
+
+    def __init__(self, k: int = 10):
+        self.k = k
+        self.seen = 0
+        self.version = 0
+        self._heap: List[Tuple[float, int, Dict]] = []
+        self._order = itertools.count()
+
+    def __len__(self) -> int:
+        return len(self._heap)
+
+    def push(self, target: Dict) -> bool:
+        """Offer a scored target and get whether it made the top ``k``."""
+        self.seen += 1
+        entry = (target["profit"], -next(self._order), target)
+        if len(self._heap) < self.k:
+            heapq.heappush(self._heap, entry)
+        elif entry[:2] > self._heap[0][:2]:
+            heapq.heapreplace(self._heap, entry)
+        else:
+            return False
+        self.version += 1
+        return True
+
+    def extend(self, nations: Iterable[Dict], min_score: float, max_score: float) -> int:
+        """Score nations within ``[min_score, max_score]`` and get how many made the top ``k``."""
+        added = 0
+        for nation in nations:
+            if not nation or not min_score <= nation.get("score", 0) <= max_score:
+                continue
+            target = score_target(nation)
+            if target is not None:
+                added += self.push(target)
+        return added
+
+    def best(self) -> List[Dict]:
+        """Get the kept targets, most profitable first."""
+        return [target for _, _, target in sorted(self._heap, key=lambda entry: entry[:2], reverse=True)]
+
+async def stream_top_targets(
+    pages: AsyncIterable[Iterable[Dict]],
+    min_score: float,
+    max_score: float,
+    k: int = 10,
+    on_update: Optional[Callable[[List[Dict], int], Awaitable[None]]] = None,
+    interval: float = 2.0
+) -> TopTargets:
+    """Keep the top ``k`` targets over pages of open nations as they arrive.
+
+    Pages hold snapshot rows; nations that are beige, in vacation mode or out
+    of defensive slots are dropped. ``on_update`` is awaited with the current
+    best targets and the number of pages done whenever the top ``k`` changed,
+    at most once every ``interval`` seconds.
+    """
+    top = TopTargets(k)
+    done = 0
+    shown = 0
+    last_update = time.monotonic()
+    async for nations in pages:
+        top.extend((nation for nation in nations if is_open(nation)), min_score, max_score)
+        done += 1
+        if on_update and top.version != shown and time.monotonic() - last_update >= interval:
+            shown = top.version
+            last_update = time.monotonic()
+            await on_update(top.best(), done)
+    return top
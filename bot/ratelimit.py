@@ -0,0 +1,95 @@
+import asyncio
+import time
+from collections import Counter
+from contextvars import ContextVar
+from typing import Any, Dict, Optional
+
+from bot.handler import warning
+
+# Name of the command (or background task) the current API call is made for
+current_command: ContextVar[str] = ContextVar("current_command", default="background")
+
+class TokenBucket:
+    """Process-wide token bucket shared by every call made with the API key.
+
+    Tokens refill at ``rate`` per second up to ``capacity``. Callers wait in
+    FIFO order when the bucket is empty. The bucket is kept in line with the
+    quota the API reports in its rate limit headers, and is paused entirely
+    after the API rejects a call for exceeding the limit.
+    """
+
+    def __init__(self, rate: float = 2.0, capacity: float = 30.0):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+        self._lock: Optional[asyncio.Lock] = None
+        self.usage: Counter = Counter()
+        self.queued = 0
+        self.waited_ms = 0.0
+
+    def configure(self, per_minute: float, burst: float) -> None:
+        """Set the refill rate (calls per minute) and the burst size."""
+        self.rate = per_minute / 60
+        self.capacity = burst
+        self.tokens = min(self.tokens, burst)
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    async def acquire(self) -> None:
+        """Take a token, waiting in line while the budget is exhausted."""
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        start = time.monotonic()
+        async with self._lock:
+            while True:
+                self._refill()
+                paused = self._paused_until - time.monotonic()
+                if paused > 0:
+                    await asyncio.sleep(paused)
+                    continue
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    break
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+        waited = (time.monotonic() - start) * 1000
+        if waited >= 1:
+            self.queued += 1
+            self.waited_ms += waited
+        self.usage[current_command.get()] += 1
+
+    def sync(self, remaining: Optional[float], reset: Optional[float]) -> None:
+        """Align the bucket with the quota reported by the API."""
+        if remaining is None:
+            return
+        self._refill()
+        self.tokens = min(self.tokens, remaining)
+        if remaining < 1 and reset is not None:
+            self.pause(reset - time.time())
+
+    def pause(self, seconds: Optional[float]) -> None:
+        """Hold every caller for ``seconds`` after being rate limited."""
+        seconds = max(seconds or 60.0, 1.0)
+        self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+        self.tokens = 0
+        warning(f"API quota exhausted, holding calls for {seconds:,.0f}s", tag="RATELIMIT")
+
+    def stats(self) -> Dict[str, Any]:
+        """Get the current budget, queueing totals and the busiest commands."""
+        self._refill()
+        return {
+            "tokens": self.tokens,
+            "capacity": self.capacity,
+            "paused_for": max(self._paused_until - time.monotonic(), 0.0),
+            "queued": self.queued,
+            "avg_wait_ms": self.waited_ms / self.queued if self.queued else 0.0,
+            "usage": self.usage.most_common(),
+        }
+
+# Create a global limiter instance
+limiter = TokenBucket()
@@ -0,0 +1,98 @@
+import bisect
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from bot import vars as vars
+
+def is_beige(nation: Dict) -> bool:
+    """Check whether a nation is on beige protection."""
+    return nation.get("beige_turns", 0) > 0 or nation.get("color") == "beige"
+
+def is_open(nation: Dict) -> bool:
+    """Check whether a nation can be declared on: not beige, in vacation mode or out of defensive slots."""
+    return (
+        not is_beige(nation)
+        and nation.get("vacation_mode_turns", 0) == 0
+        and nation.get("defensive_wars_count", 0) < vars.MAX_DEFENSIVE_WARS
+    )
+
+class ScoreIndex:
+    """Nations sorted by score for fast war range lookups.
+
+    A range query bisects the sorted scores to find the matching slice, so it
+    costs O(log n + k) for k nations in range instead of a scan over the whole
+    game. Besides the full list, the index keeps sorted views of the nations
+    that can be declared on, of each alliance and of each color, and a query
+    walks the narrowest view its filters allow.
+    """
+
+    def __init__(self, nations: Iterable[Dict] = ()):
+        ordered = sorted(nations, key=lambda nation: nation["score"])
+        self.all = self._view(ordered)
+        self.open = self._view([nation for nation in ordered if is_open(nation)])
+
+        by_alliance: Dict[int, List[Dict]] = {}
+        by_color: Dict[str, List[Dict]] = {}
+        for nation in ordered:
+            if nation["alliance_id"]:
+                by_alliance.setdefault(nation["alliance_id"], []).append(nation)
+            by_color.setdefault(nation["color"], []).append(nation)
+        self.alliances = {alliance_id: self._view(members) for alliance_id, members in by_alliance.items()}
+        self.colors = {color: self._view(members) for color, members in by_color.items()}
+
+    @staticmethod
+    def _view(nations: List[Dict]) -> Tuple[List[float], List[Dict]]:
+        """Pair score-sorted nations with their scores for bisecting."""
+        return [nation["score"] for nation in nations], nations
+
+    def __len__(self) -> int:
+        return len(self.all[1])
+
+    def between(
+        self,
+        min_score: float,
+        max_score: float,
+        alliance_id: Optional[int] = None,
+        exclude_alliance_id: Optional[int] = None,
+        color: Optional[str] = None,
+        beige: Optional[bool] = None,
+        open_slots: bool = False,
+        vacation_mode: bool = False
+    ) -> List[Dict]:
+        """Get nations with a score in ``[min_score, max_score]`` that match the filters.
+
+        ``beige`` keeps only beige nations when True and drops them when False.
+        ``open_slots`` keeps only nations with a free defensive slot, and
+        nations in vacation mode are skipped unless ``vacation_mode`` is set.
+        """
+        color = color.lower() if color else None
+        if alliance_id:
+            scores, nations = self.alliances.get(alliance_id, ([], []))
+        elif color:
+            scores, nations = self.colors.get(color, ([], []))
+        elif beige is False and open_slots and not vacation_mode:
+            # Every nation in this view already passes these filters
+            scores, nations = self.open
+            beige, open_slots, vacation_mode = None, False, True
+        else:
+            scores, nations = self.all
+        start = bisect.bisect_left(scores, min_score)
+        end = bisect.bisect_right(scores, max_score)
+
+        return [
+            nation for nation in nations[start:end]
+            if not (exclude_alliance_id and nation["alliance_id"] == exclude_alliance_id)
+            and not (color and nation["color"] != color)
+            and not (beige is not None and is_beige(nation) != beige)
+            and not (open_slots and nation["defensive_wars_count"] >= vars.MAX_DEFENSIVE_WARS)
+            and (vacation_mode or nation["vacation_mode_turns"] == 0)
+        ]
+
+    def in_range_of(self, score: float, **filters) -> List[Dict]:
+        """Get nations a nation with ``score`` can declare war on."""
+        low, high = vars.WAR_RANGE
+        return self.between(score * low, score * high, **filters)
+
+    def can_declare_on(self, score: float, **filters) -> List[Dict]:
+        """Get nations that can declare war on a nation with ``score``."""
+        low, high = vars.WAR_RANGE
+        return self.between(score / high, score / low, **filters)
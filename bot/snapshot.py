@@ -0,0 +1,222 @@
+import asyncio
+import os
+import sqlite3
+import time
+from typing import Callable, Dict, Iterable, List, Optional
+
+from bot.crawler import NationCrawler
+from bot.handler import info, error, warning
+from bot.ratelimit import current_command
+from bot.score_index import ScoreIndex
+
+# Fields crawled for every nation in the snapshot
+SNAPSHOT_FIELDS = """
+    id
+    nation_name
+    leader_name
+    alliance_id
+    alliance {
+        name
+    }
+    alliance_position
+    score
+    color
+    vacation_mode_turns
+    beige_turns
+    last_active
+    offensive_wars_count
+    defensive_wars_count
+    soldiers
+    tanks
+    aircraft
+    ships
+    missiles
+    nukes
+    num_cities
+    cities {
+        infrastructure
+    }
+"""
+
+# Columns stored per nation, in table order
+COLUMNS = (
+    ("id", "INTEGER PRIMARY KEY"),
+    ("nation_name", "TEXT"),
+    ("leader_name", "TEXT"),
+    ("alliance_id", "INTEGER"),
+    ("alliance_name", "TEXT"),
+    ("alliance_position", "TEXT"),
+    ("score", "REAL"),
+    ("color", "TEXT"),
+    ("vacation_mode_turns", "INTEGER"),
+    ("beige_turns", "INTEGER"),
+    ("last_active", "TEXT"),
+    ("offensive_wars_count", "INTEGER"),
+    ("defensive_wars_count", "INTEGER"),
+    ("soldiers", "INTEGER"),
+    ("tanks", "INTEGER"),
+    ("aircraft", "INTEGER"),
+    ("ships", "INTEGER"),
+    ("missiles", "INTEGER"),
+    ("nukes", "INTEGER"),
+    ("num_cities", "INTEGER"),
+    ("infrastructure", "REAL"),
+)
+COLUMN_NAMES = tuple(name for name, _ in COLUMNS)
+
+def summarize(nation: Dict) -> Dict:
+    """Flatten an API nation into a snapshot row with a city summary."""
+    cities = nation.get("cities") or []
+    alliance = nation.get("alliance") or {}
+    return {
+        "id": int(nation.get("id", 0)),
+        "nation_name": nation.get("nation_name", ""),
+        "leader_name": nation.get("leader_name", ""),
+        "alliance_id": int(nation.get("alliance_id") or alliance.get("id") or 0),
+        "alliance_name": alliance.get("name", ""),
+        "alliance_position": nation.get("alliance_position", ""),
+        "score": float(nation.get("score", 0)),
+        "color": (nation.get("color") or "").lower(),
+        "vacation_mode_turns": int(nation.get("vacation_mode_turns") or 0),
+        "beige_turns": int(nation.get("beige_turns") or 0),
+        "last_active": nation.get("last_active", ""),
+        "offensive_wars_count": int(nation.get("offensive_wars_count") or 0),
+        "defensive_wars_count": int(nation.get("defensive_wars_count") or 0),
+        "soldiers": int(nation.get("soldiers") or 0),
+        "tanks": int(nation.get("tanks") or 0),
+        "aircraft": int(nation.get("aircraft") or 0),
+        "ships": int(nation.get("ships") or 0),
+        "missiles": int(nation.get("missiles") or 0),
+        "nukes": int(nation.get("nukes") or 0),
+        "num_cities": int(nation.get("num_cities") or len(cities)),
+        "infrastructure": float(sum(city.get("infrastructure", 0) for city in cities)),
+    }
+
+class NationSnapshot:
+    """Local copy of every nation in the game, kept on disk in SQLite.
+
+    All rows are mirrored in memory so cogs can query the snapshot
+    synchronously without touching the database or the API, and ``index``
+    sorts them by score for war range searches. A background task refreshes
+    it page by page; only rows that changed are written, and nations that
+    disappeared are dropped after a complete pass.
+    """
+
+    def __init__(self, path: str = "data/nations.sqlite"):
+        self.path = path
+        self.nations: Dict[int, Dict] = {}
+        self.index = ScoreIndex()
+        self.updated_at: Optional[float] = None
+        self.refreshing = False
+        self._db: Optional[sqlite3.Connection] = None
+
+    def open(self, path: Optional[str] = None) -> None:
+        """Open the database and load the last snapshot into memory."""
+        if path:
+            self.path = path
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        self._db = sqlite3.connect(self.path, check_same_thread=False)
+        self._db.execute(f"CREATE TABLE IF NOT EXISTS nations ({', '.join(f'{n} {t}' for n, t in COLUMNS)})")
+        self._db.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value REAL)")
+        self._db.commit()
+
+        cursor = self._db.execute(f"SELECT {', '.join(COLUMN_NAMES)} FROM nations")
+        self.nations = {row[0]: dict(zip(COLUMN_NAMES, row)) for row in cursor}
+        self.index = ScoreIndex(self.nations.values())
+        row = self._db.execute("SELECT value FROM meta WHERE key = 'updated_at'").fetchone()
+        self.updated_at = row[0] if row else None
+        info(f"Loaded nation snapshot with {len(self.nations):,} nations from {self.path}", tag="SNAPSHOT")
+
+    def close(self) -> None:
+        """Close the database."""
+        if self._db is not None:
+            self._db.close()
+            self._db = None
+
+    def age(self) -> Optional[float]:
+        """Get the snapshot age in seconds, or None if it was never refreshed."""
+        return time.time() - self.updated_at if self.updated_at else None
+
+    def is_fresh(self, max_age: float) -> bool:
+        """Check whether the snapshot was refreshed within ``max_age`` seconds."""
+        age = self.age()
+        return age is not None and age <= max_age
+
+    def get(self, nation_id: int) -> Optional[Dict]:
+        """Get a nation from the snapshot."""
+        return self.nations.get(int(nation_id))
+
+    def query(self, predicate: Callable[[Dict], bool]) -> List[Dict]:
+        """Get every nation matching a predicate."""
+        return [nation for nation in self.nations.values() if predicate(nation)]
+
+    def _write(self, rows: Iterable[Dict], removed: Iterable[int] = (), updated_at: Optional[float] = None) -> None:
+        """Write changed rows, removed IDs and the refresh time to disk."""
+        placeholders = ", ".join("?" for _ in COLUMN_NAMES)
+        self._db.executemany(
+            f"INSERT OR REPLACE INTO nations ({', '.join(COLUMN_NAMES)}) VALUES ({placeholders})",
+            [tuple(row[name] for name in COLUMN_NAMES) for row in rows]
+        )
+        self._db.executemany("DELETE FROM nations WHERE id = ?", [(nation_id,) for nation_id in removed])
+        if updated_at is not None:
+            self._db.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('updated_at', ?)", (updated_at,))
+        self._db.commit()
+
+    async def refresh(self, api_key: str, concurrency: int = 4) -> None:
+        """Crawl every nation and apply the changes to the snapshot."""
+        if self._db is None:
+            self.open()
+        self.refreshing = True
+        start = time.time()
+        seen = set()
+        changed_total = 0
+        crawler = NationCrawler(api_key, SNAPSHOT_FIELDS, concurrency=concurrency, tag="SNAPSHOT")
+        try:
+            async for _, page in crawler.pages():
+                changed = []
+                for nation in page:
+                    row = summarize(nation)
+                    seen.add(row["id"])
+                    if self.nations.get(row["id"]) != row:
+                        self.nations[row["id"]] = row
+                        changed.append(row)
+                if changed:
+                    await asyncio.to_thread(self._write, changed)
+                    changed_total += len(changed)
+
+            if crawler.failed_pages:
+                self.index = await asyncio.to_thread(ScoreIndex, list(self.nations.values()))
+                warning(f"Snapshot refresh incomplete, failed pages: {sorted(crawler.failed_pages)}", tag="SNAPSHOT")
+                return
+
+            removed = [nation_id for nation_id in self.nations if nation_id not in seen]
+            for nation_id in removed:
+                del self.nations[nation_id]
+            self.index = await asyncio.to_thread(ScoreIndex, list(self.nations.values()))
+            await asyncio.to_thread(self._write, [], removed, start)
+            self.updated_at = start
+            info(
+                f"Nation snapshot refreshed in {time.time() - start:,.1f}s "
+                f"({len(self.nations):,} nations, {changed_total:,} changed, {len(removed):,} removed)",
+                tag="SNAPSHOT"
+            )
+        finally:
+            self.refreshing = False
+
+    async def run(self, api_key: str, interval: float) -> None:
+        """Refresh the snapshot forever, waiting ``interval`` seconds between runs."""
+        current_command.set("snapshot")
+        while True:
+            age = self.age()
+            if age is not None and age < interval:
+                await asyncio.sleep(interval - age)
+            try:
+                await self.refresh(api_key)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                error(f"Error refreshing nation snapshot: {e}", tag="SNAPSHOT")
+            await asyncio.sleep(interval)
+
+# Create a global snapshot instance
+snapshot = NationSnapshot()
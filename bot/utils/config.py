@@ -1,5 +1,5 @@
 import os
-from typing import Optional
+from typing import List, Optional
 
 class Config:
     """Configuration class for the bot."""
@@ -15,6 +15,46 @@ class Config:
         self.DEVELOPER_ROLE_ID: int = int(os.getenv("DEVELOPER_ROLE_ID", "0"))
         self.IVY_ID: int = int(os.getenv("IVY_ID", "860564164828725299"))
         
+        # API connection pool
+        self.API_POOL_SIZE: int = int(os.getenv("API_POOL_SIZE", "10"))
+        self.API_KEEPALIVE: float = float(os.getenv("API_KEEPALIVE", "60"))
+        self.API_HTTP2: bool = os.getenv("API_HTTP2", "false").lower() == "true"
+        
+        # Client-side API budget, the API's own rate limit headers take precedence
+        self.API_RATE_PER_MINUTE: float = float(os.getenv("API_RATE_PER_MINUTE", "120"))
+        self.API_RATE_BURST: float = float(os.getenv("API_RATE_BURST", "30"))
+        
+        # Seconds a cached nation lookup stays fresh
+        self.NATION_CACHE_TTL: float = float(os.getenv("NATION_CACHE_TTL", "60"))
+        
+        # Local nation snapshot
+        self.SNAPSHOT_PATH: str = os.getenv("SNAPSHOT_PATH", "data/nations.sqlite")
+        self.SNAPSHOT_REFRESH_MINUTES: float = float(os.getenv("SNAPSHOT_REFRESH_MINUTES", "30"))
+        self.SNAPSHOT_MAX_AGE_MINUTES: float = float(os.getenv("SNAPSHOT_MAX_AGE_MINUTES", "90"))
+        
+        # Local bank ledger
+        self.LEDGER_PATH: str = os.getenv("LEDGER_PATH", "data/ledger.sqlite")
+        
+        # Build plan memo and the infrastructure tiers solved in the background
+        self.PLANS_PATH: str = os.getenv("PLANS_PATH", "data/plans.sqlite")
+        self.PLANS_REFRESH_MINUTES: float = float(os.getenv("PLANS_REFRESH_MINUTES", "10"))
+        self.PLANS_TIERS: List[int] = [
+            int(tier) for tier in os.getenv("PLANS_TIERS", "1000,1250,1500,1750,2000,2250,2500,2750,3000,3250,3500,3750,4000").split(",")
+            if tier.strip()
+        ]
+        
+        # Most per-member API lookups an audit runs at once
+        self.AUDIT_CONCURRENCY: int = int(os.getenv("AUDIT_CONCURRENCY", "8"))
+        
+        # Audit runs kept on disk and the audits run in the background
+        self.AUDITS_PATH: str = os.getenv("AUDITS_PATH", "data/audits.sqlite")
+        self.AUDIT_REFRESH_MINUTES: float = float(os.getenv("AUDIT_REFRESH_MINUTES", "60"))
+        self.AUDIT_MAX_AGE_MINUTES: float = float(os.getenv("AUDIT_MAX_AGE_MINUTES", str(self.AUDIT_REFRESH_MINUTES * 2)))
+        self.AUDIT_SCHEDULE: List[str] = [
+            type.strip().lower() for type in os.getenv("AUDIT_SCHEDULE", "all,activity,warchest,spies,mmr,deposit").split(",")
+            if type.strip()
+        ]
+        
         # Validate required environment variables
         self._validate_config()
     
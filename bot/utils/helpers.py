@@ -1,5 +1,6 @@
 from typing import Any, Dict, List, Optional
 from datetime import datetime, timezone
+import time
 import discord
 
 def create_embed(
@@ -36,4 +37,13 @@ def format_number(number: float) -> str:
 
 def truncate_text(text: str, length: int) -> str:
     """Truncate text to specified length with ellipsis."""
-    return text if len(text) <= length else text[:length-2] + ".." 
\ No newline at end of file
+    return text if len(text) <= length else text[:length-2] + ".." 
+
+def format_age(timestamp: float) -> str:
+    """Format how long ago a unix timestamp was, e.g. '42s ago'."""
+    seconds = max(int(time.time() - timestamp), 0)
+    if seconds < 60:
+        return f"{seconds}s ago"
+    if seconds < 3600:
+        return f"{seconds // 60}m ago"
+    return f"{seconds // 3600}h ago"
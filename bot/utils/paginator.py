@@ -1,4 +1,4 @@
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Tuple
 from datetime import datetime, timezone
 import discord
 from .helpers import create_embed
@@ -6,24 +6,41 @@ from discord import ui
 from math import ceil
 
 class ActivityPaginator(discord.ui.View):
-    """A paginator for displaying activity results."""
+    """A paginator for displaying activity results.
     
-    def __init__(self, results: List[str], timeout: int = 120):
+    Results can keep arriving after the paginator is shown: ``add`` extends
+    the pages and ``progress`` holds how many of the expected results are
+    done, which the footer shows until every one is in.
+    """
+    
+    def __init__(self, results: List[str], timeout: Optional[float] = 120, progress: Optional[Tuple[int, int]] = None):
         super().__init__(timeout=timeout)
-        self.results = results
+        self.results = list(results)
+        self.progress = progress
         self.current_page = 0
         self.items_per_page = 4
         self.pages = []
         self.create_pages()
     
+    @property
+    def complete(self) -> bool:
+        """Whether every expected result is in."""
+        return self.progress is None or self.progress[0] >= self.progress[1]
+    
     def create_pages(self) -> None:
         """Split results into pages."""
+        self.pages = []
         for i in range(0, len(self.results), self.items_per_page):
             page = self.results[i:i + self.items_per_page]
             self.pages.append(page)
         
         if not self.pages:
-            self.pages.append(["**All Good!** No inactive members found."])
+            self.pages.append(["**All Good!** No inactive members found." if self.complete else "Auditing..."])
+    
+    def add(self, results: List[str]) -> None:
+        """Add results that arrived after the paginator was created."""
+        self.results.extend(results)
+        self.create_pages()
     
     def get_embed(self) -> discord.Embed:
         """Get the current page's embed."""
@@ -35,6 +52,9 @@ class ActivityPaginator(discord.ui.View):
         
         fields = []
         for idx, result in enumerate(page_results, start=1):
+            # Discord rejects field values over 1024 characters
+            if len(result) > 1024:
+                result = result[:1021] + "..."
             fields.append({
                 "name": "\u200b",
                 "value": result,
@@ -46,7 +66,11 @@ class ActivityPaginator(discord.ui.View):
             description="Below is a grid view of alliance members Violating the audit ran.\nUse the buttons below to navigate through pages.",
             color=discord.Color.purple(),
             fields=fields,
-            footer=f"Page {self.current_page + 1}/{len(self.pages)} • Bot Maintained By Ivy Banana <3"
+            footer=(
+                f"Page {self.current_page + 1}/{len(self.pages)} • "
+                + (f"{self.progress[0]}/{self.progress[1]} members audited • " if self.progress is not None else "")
+                + "Bot Maintained By Ivy Banana <3"
+            )
         )
     
     @discord.ui.button(label="Previous", style=discord.ButtonStyle.primary)
@@ -21,6 +21,28 @@ COSTS = {
     "stadium": 1013             # $1013/turn
 }
 
+# Upkeep of the mines warchest does not count, used to value build plans
+MINE_COSTS = {
+    "oil_well": 50,             # $50/turn
+    "bauxite_mine": 134,        # $134/turn
+    "lead_mine": 125            # $125/turn
+}
+
+# Rough market price per ton, used to value build plans
+RESOURCE_PRICES = {
+    "food": 130,
+    "coal": 3500,
+    "oil": 3500,
+    "uranium": 3000,
+    "iron": 3500,
+    "bauxite": 3500,
+    "lead": 3500,
+    "gasoline": 3500,
+    "munitions": 2200,
+    "steel": 4000,
+    "aluminum": 2800
+}
+
 MILITARY_COSTS = {
     "soldiers": 1.88 / 12,      # per soldier per turn
     "tanks": 75 / 12,           # per tank per turn
@@ -28,6 +50,11 @@ MILITARY_COSTS = {
     "ships": 5062.5 / 12        # per ship per turn
 }
 
+# A nation can declare on scores between these fractions of its own score
+WAR_RANGE = (0.75, 1.75)
+MAX_DEFENSIVE_WARS = 3
+MAX_OFFENSIVE_WARS = 5
+
 IVY_ID = 860564164828725299
 DEVELOPER_ROLE_ID = 1357562379927293977
 SUGGESTIONS_CHANNEL_ID = 1357568104481423502